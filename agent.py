@@ -27,7 +27,7 @@ except ImportError:
     noise_cancellation = None  # Optional on cloud
 import asyncio
 import os
-from http.server import HTTPServer, BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
 from threading import Thread
 import json
 
@@ -35,101 +35,28 @@ import json
 import termux_compatibility as termux
 
 # Import your custom modules
-from vyaas_prompts import instructions_prompt, Reply_prompts
-from vyaas_google_search import google_search, get_current_datetime
-from vyaas_get_weather import get_weather
-from vyaas_system_control import (
-    system_shutdown,
-    system_restart,
-    cancel_shutdown,
-    open_chrome,
-    open_application,
-    open_file,
-    open_folder,
-    lock_computer,
-    set_volume,
-    mute_unmute,
-    take_screenshot,
-    search_web,
-    play_youtube
-)
-from vyaas_system_info import (
-    get_system_info,
-    get_cpu_usage,
-    get_ram_usage,
-    get_battery_status,
-    get_disk_usage,
-    get_running_processes,
-    get_network_info
-)
-from vyaas_clipboard import (
-    copy_to_clipboard,
-    get_clipboard_content,
-    clear_clipboard,
-    clipboard_word_count
-)
-from vyaas_music import (
-    play_spotify,
-    play_youtube_music,
-    play_pause_media,
-    next_track,
-    previous_track,
-    stop_media,
-    open_music_app,
-    search_song
-)
-from vyaas_automation import (
-    type_text,
-    type_text_unicode,
-    press_key,
-    open_notepad_and_write,
-    play_youtube_video,
-    send_email_gmail,
-    click_screen,
-    scroll,
-    wait_seconds,
-    get_screen_size,
-    focus_window,
-    send_whatsapp_to_phone,
-    send_whatsapp_message,
-    send_instagram_message,
-    send_whatsapp_file
-)
-from vyaas_file_tools import (
-    create_html_file,
-    create_text_file,
-    create_excel_file,
-    create_word_document,
-    create_powerpoint,
-    create_pdf_document,
-    create_python_file,
-    list_desktop_files
-)
-from vyaas_android import (
-    pair_android_device,
-    connect_android_device,
-    open_android_app,
-    send_android_whatsapp,
-    search_and_send_android_whatsapp,
-    make_android_call,
-    search_android_youtube
-)
-from vyaas_memory import (
-    remember_fact,
-    get_fact,
-    search_memory,
-    list_all_memories,
-    list_all_memories,
-    delete_fact
-)
+# Tool modules are imported through the registry (see vyaas_tool_registry.TOOL_MODULES)
+import vyaas_prompts
+from vyaas_prompts import build_instructions, build_reply_prompt
+from vyaas_tool_registry import load_tools
+from vyaas_android import connect_android_device
+from vyaas_maps import map_manager
+import vyaas_memory
+from vyaas_metrics_sampler import get_sampler, SAMPLE_INTERVAL
+from vyaas_metrics_history import get_history
+from vyaas_metrics_subscribers import MetricsSubscribers, IDLE_INTERVAL, CONTROL_TOPIC as METRICS_CONTROL_TOPIC
+from vyaas_loop_monitor import start_loop_monitor
+from vyaas_deadline import end_turn, start_turn
+from vyaas_telemetry import (SESSIONS_ACTIVE, count_data, snapshot as telemetry_snapshot,
+                             start_publisher as start_telemetry_publisher)
+from vyaas_process_state import publish
+from vyaas_tracing import COMMAND_TRACE_TOPIC
+import vyaas_profiler
+from vyaas_memory_audit import SessionMemoryAudit
+from vyaas_publisher import get_publisher, close_publisher, TOPIC_POLICY
+from vyaas_data_router import DataRouter
 import vyaas_iot
-from vyaas_whatsapp_listener import (
-    start_whatsapp_listener,
-    check_whatsapp_messages,
-    reply_to_whatsapp,
-    get_whatsapp_status
-)
-from vyaas_maps import map_manager, show_google_map
+import vyaas_cache
 
 # Local Commands (for remote execution on user's PC)
 import vyaas_local_commands
@@ -139,124 +66,73 @@ from memory_loop import MemoryExtractor
 
 load_dotenv()
 
+# Topics this agent publishes: echoes of them (other agents in the room) are dropped undecoded
+OUTBOUND_TOPICS = set(TOPIC_POLICY)
+
 
 class Assistant(Agent):
-    def __init__(self, chat_ctx) -> None:
+    def __init__(self, chat_ctx, instructions: str, tools: list) -> None:
         super().__init__(chat_ctx = chat_ctx,
-                        instructions=instructions_prompt,
+                        instructions=instructions,
                         llm=google.beta.realtime.RealtimeModel(
                             voice="Charon",
                             model="gemini-2.5-flash-native-audio-preview-12-2025",
                         ),
-                        tools=[
-                                google_search,
-                                get_current_datetime,
-                                get_weather,
-                                # System Control Tools (DISABLED FOR CLOUD - Use Local Commands instead)
-                                # system_shutdown,
-                                # system_restart,
-                                # cancel_shutdown,
-                                # open_chrome,
-                                # open_application,
-                                # open_file,
-                                # open_folder,
-                                # lock_computer,
-                                # set_volume,
-                                # mute_unmute,
-                                # take_screenshot,
-                                # search_web,
-                                # play_youtube,
-                                # System Info Tools
-                                get_system_info,
-                                get_cpu_usage,
-                                get_ram_usage,
-                                get_battery_status,
-                                get_disk_usage,
-                                get_running_processes,
-                                get_network_info,
-                                # Clipboard Tools
-                                copy_to_clipboard,
-                                get_clipboard_content,
-                                clear_clipboard,
-                                clipboard_word_count,
-                                # Music Tools
-                                play_spotify,
-                                play_youtube_music,
-                                play_pause_media,
-                                next_track,
-                                previous_track,
-                                stop_media,
-                                open_music_app,
-                                search_song,
-                                # Automation Tools (DISABLED FOR CLOUD - Use Local Commands)
-                                # type_text,
-                                # type_text_unicode,
-                                # press_key,
-                                # open_notepad_and_write,
-                                # play_youtube_video,
-                                # send_email_gmail,
-                                # click_screen,
-                                # scroll,
-                                # wait_seconds,
-                                # get_screen_size,
-                                # focus_window,
-                                # send_whatsapp_to_phone,
-                                # send_whatsapp_message,
-                                # send_instagram_message,
-                                # File Creation Tools
-                                create_html_file,
-                                create_text_file,
-                                create_excel_file,
-                                create_word_document,
-                                create_powerpoint,
-                                create_pdf_document,
-                                create_python_file,
-                                list_desktop_files,
-                                send_whatsapp_file,
-                                # Android Tools
-                                pair_android_device,
-                                connect_android_device,
-                                open_android_app,
-                                send_android_whatsapp,
-                                search_and_send_android_whatsapp,
-                                make_android_call,
-                                search_android_youtube,
-                                # Memory Tools
-                                remember_fact,
-                                get_fact,
-                                search_memory,
-                                list_all_memories,
-                                delete_fact,
-                                # IoT Tools
-                                vyaas_iot.scan_iot_devices,
-                                vyaas_iot.control_iot_device,
-                                vyaas_iot.set_iot_brightness,
-                                # WhatsApp Listener Tools
-                                start_whatsapp_listener,
-                                check_whatsapp_messages,
-                                reply_to_whatsapp,
-                                get_whatsapp_status,
-                                # Map Tools
-                                show_google_map,
-                                # LOCAL COMMAND TOOLS (execute on user's PC via Desktop Bridge)
-                                vyaas_local_commands.open_whatsapp_local,
-                                vyaas_local_commands.open_maps_local,
-                                vyaas_local_commands.open_notes_local,
-                                vyaas_local_commands.open_app_local,
-                                vyaas_local_commands.send_whatsapp_local,
-                                vyaas_local_commands.send_whatsapp_contact_local,
-                                vyaas_local_commands.type_text_local,
-                                vyaas_local_commands.press_key_local,
-                                vyaas_local_commands.open_url_local,
-                                vyaas_local_commands.play_youtube_local,
-                                vyaas_local_commands.take_screenshot_local,
-                                vyaas_local_commands.set_volume_local,
-                                vyaas_local_commands.lock_pc_local,
-                                vyaas_local_commands.shutdown_pc_local,
-                                vyaas_local_commands.cancel_shutdown_local,
-                        ]
+                        tools=tools,
                                 )
 
+
+# Auto-Connect to Android (User Preference)
+async def auto_connect_android():
+    if termux.is_android():
+         print("Running on Android Device: connecting to local ADB...")
+         # On Termux, connect to localhost
+         res = await connect_android_device("localhost", "5555")
+         print(f"Local Android Connect Result: {res}")
+    else:
+         print("Initiating Auto-Connection to Android Phone...")
+         res = await connect_android_device("192.168.31.220", "36165")
+         print(f"Android Auto-Connect Result: {res}")
+
+
+def _prewarm_network():
+    """Network-bound and heavy-import warmup, kept off the prewarm call so process start stays fast"""
+    try:
+        # Mem0 client (cached in vyaas_memory); imports the mem0 dependency tree
+        vyaas_memory.get_mem0_client()
+    except Exception as e:
+        print(f"Prewarm: Mem0 client init failed: {e}")
+    try:
+        vyaas_prompts.load_context()
+    except Exception as e:
+        print(f"Prewarm: prompt context load failed: {e}")
+    try:
+        asyncio.run(auto_connect_android())
+    except Exception as e:
+        print(f"Prewarm: Android auto-connect failed: {e}")
+
+
+def prewarm(proc: agents.JobProcess):
+    """
+    Runs once per worker process, before any job is assigned.
+    Everything that does not depend on the room is loaded here so that
+    entrypoint only has to bind the room and start the session.
+    """
+    # Tool schemas (imports every registered tool module, cached in the registry)
+    proc.userdata["tools"] = load_tools()
+
+    # System sampler thread (primes per-process CPU counters before the first session)
+    # and the metrics history it feeds
+    get_sampler()
+    get_history()
+
+    # Telemetry snapshots for the health server's /metrics and /ready
+    start_telemetry_publisher()
+
+    # Mem0 client, prompt context (weather) and ADB connection
+    Thread(target=_prewarm_network, daemon=True).start()
+
+
 async def entrypoint(ctx: agents.JobContext):
     session = AgentSession(
         preemptive_generation=False
@@ -264,12 +140,54 @@ async def entrypoint(ctx: agents.JobContext):
     
     # getting the current memory chat
     current_ctx = session.history.items
+
+    # Each user utterance starts a new turn deadline for the tools it triggers
+    @session.on("user_state_changed")
+    def on_user_state_changed(ev):
+        if ev.old_state == "speaking" and ev.new_state == "listening":
+            start_turn()
+
+    @session.on("agent_state_changed")
+    def on_agent_state_changed(ev):
+        # Answer spoken: tool calls from alerts, face events or text input are not bound to that turn
+        if ev.old_state == "speaking" and ev.new_state == "listening":
+            end_turn()
     
     # Wait for participant to connect
     await ctx.connect()
 
-    # Start system monitoring task immediately
-    asyncio.create_task(monitor_system(ctx.room, session))
+    # Event loop lag probe (VYAAS_LOOP_DEBUG=1 also reports which tool blocked the loop)
+    start_loop_monitor()
+
+    # Stale cache hits refresh on this loop (asyncio.run loops end before a refresh could finish)
+    vyaas_cache.set_refresh_loop(asyncio.get_running_loop())
+
+    SESSIONS_ACTIVE.inc()
+
+    def session_tag():
+        """Room plus user identity, to name profiles of this session"""
+        identities = [p.identity for p in ctx.room.remote_participants.values() if p.identity]
+        return f"{ctx.room.name}-{identities[0] if identities else 'anonymous'}"
+
+    # Sampling profiler (VYAAS_PROFILE_SECONDS, or a profile_start data message); off by default
+    vyaas_profiler.start_session_profile(session_tag())
+
+    # RSS (and with VYAAS_MEMORY_AUDIT=1, tracemalloc) accounting for this session
+    memory_audit = SessionMemoryAudit(session_tag())
+    memory_audit.start()
+
+    # Background tasks of this session, cancelled when the job shuts down
+    session_tasks = set()
+
+    def spawn(coro):
+        task = asyncio.create_task(coro)
+        session_tasks.add(task)
+        task.add_done_callback(session_tasks.discard)
+        return task
+
+    # Start system monitoring task immediately (publishes only while a frontend subscribes)
+    metrics_subscribers = MetricsSubscribers()
+    spawn(monitor_system(ctx.room, session, metrics_subscribers))
     
     # Initialize Map Manager with current room
     map_manager.set_room(ctx.room)
@@ -277,61 +195,102 @@ async def entrypoint(ctx: agents.JobContext):
     # Initialize Local Commands with room reference
     vyaas_local_commands.set_room(ctx.room)
     
-    # Auto-Connect to Android (User Preference)
-    async def auto_connect_android():
-        if termux.is_android():
-             print("Running on Android Device: connecting to local ADB...")
-             # On Termux, connect to localhost
-             res = await connect_android_device("localhost", "5555")
-             print(f"Local Android Connect Result: {res}")
-        else:
-             print("Initiating Auto-Connection to Android Phone...")
-             res = await connect_android_device("192.168.31.220", "36165")
-             print(f"Android Auto-Connect Result: {res}")
-
-    asyncio.create_task(auto_connect_android())
-
     # --- Face Intelligence Handler ---
     last_face_event = 0
     FACE_COOLDOWN = 10 # Seconds between reactions
 
-    @ctx.room.on("data_received")
-    def on_data_received(packet):
+    # Inbound packets are routed on topic and sender before they are decoded;
+    # each route has its own rate limit, so metrics traffic can't crowd out the rest
+    data_router = DataRouter(ignore_topics=OUTBOUND_TOPICS)
+
+    @data_router.route(METRICS_CONTROL_TOPIC, rate=5, burst=10)
+    def on_metrics_control(data, sender):
+        metrics_subscribers.handle_control(sender, data)
+
+    data_router.route(vyaas_local_commands.COMMAND_RESULT_TOPIC,
+                      lambda data, sender: vyaas_local_commands.handle_command_reply(data),
+                      senders=vyaas_local_commands.is_bridge_identity, rate=100, burst=200)
+    data_router.route(COMMAND_TRACE_TOPIC, lambda data, sender: vyaas_local_commands.handle_command_trace(data),
+                      senders=vyaas_local_commands.is_bridge_identity, rate=50, burst=100)
+    data_router.route(vyaas_profiler.PROFILER_TOPIC, lambda data, sender: vyaas_profiler.handle_control(data, session_tag()),
+                      senders=lambda sender: (sender in vyaas_profiler.TRUSTED_SENDERS
+                                              or vyaas_local_commands.is_bridge_identity(sender)),
+                      rate=0.2, burst=1)
+
+    # Face events arrive as legacy packets (no routed topic), dispatched on "type"
+    @data_router.route_type("face_event", rate=2, burst=4)
+    def on_face_event(data, sender):
         nonlocal last_face_event
-        try:
-            payload = packet.data.decode('utf-8')
-            data = json.loads(payload)
-            
-            if data.get("type") == "face_event":
-                current_time = asyncio.get_event_loop().time()
-                if current_time - last_face_event < FACE_COOLDOWN:
-                    return
+        current_time = asyncio.get_event_loop().time()
+        if current_time - last_face_event < FACE_COOLDOWN:
+            return
 
-                identity = data.get("identity", "Unknown")
-                emotion = data.get("emotion", "neutral")
-                
-                # Logic: Intruder Alert
-                if identity == "Unknown":
-                    print(f"⚠️ INTRUDER DETECTED! Emotion: {emotion}")
-                    last_face_event = current_time
-                    asyncio.create_task(session.generate_reply(
-                        instructions=f"WARNING: An unknown face is detected! User is not 'Bhaiya'. Ask 'Kaun ho tum?'. Be suspicious. Current emotion: {emotion}"
-                    ))
-                
-                # Logic: Empathy (Only for Bhaiya)
-                elif identity == "Bhaiya":
-                    if emotion == "sad":
-                        print(f"💙 Empathy Trigger: Bhaiya is sad.")
-                        last_face_event = current_time
-                        asyncio.create_task(session.generate_reply(
-                            instructions="Bhaiya looks sad. Stop everything. Speak in a very soft, comforting, 'Chhota Bhai' voice. Ask 'Kya hua Bhaiya? Aap pareshan lag rahe ho?'. Offer to play music."
-                        ))
-                    elif emotion == "happy":
-                         # Maybe just a log or rare compliment
-                         pass
+        identity = data.get("identity", "Unknown")
+        emotion = data.get("emotion", "neutral")
+        
+        # Logic: Intruder Alert
+        if identity == "Unknown":
+            print(f"⚠️ INTRUDER DETECTED! Emotion: {emotion}")
+            last_face_event = current_time
+            spawn(session.generate_reply(
+                instructions=f"WARNING: An unknown face is detected! User is not 'Bhaiya'. Ask 'Kaun ho tum?'. Be suspicious. Current emotion: {emotion}"
+            ))
+        
+        # Logic: Empathy (Only for Bhaiya)
+        elif identity == "Bhaiya":
+            if emotion == "sad":
+                print(f"💙 Empathy Trigger: Bhaiya is sad.")
+                last_face_event = current_time
+                spawn(session.generate_reply(
+                    instructions="Bhaiya looks sad. Stop everything. Speak in a very soft, comforting, 'Chhota Bhai' voice. Ask 'Kya hua Bhaiya? Aap pareshan lag rahe ho?'. Offer to play music."
+                ))
+            elif emotion == "happy":
+                 # Maybe just a log or rare compliment
+                 pass
 
+    @ctx.room.on("data_received")
+    def on_data_received(packet):
+        count_data("in", packet.topic, packet.data)
+        sender = packet.participant.identity if packet.participant else None
+        data_router.dispatch(packet.data, packet.topic, sender)
+
+    @ctx.room.on("participant_connected")
+    def on_participant_connected(participant):
+        metrics_subscribers.participant_joined(participant.identity)
+
+    @ctx.room.on("participant_disconnected")
+    def on_participant_disconnected(participant):
+        metrics_subscribers.remove(participant.identity)
+
+    async def on_shutdown():
+        """Release everything this session pinned, so a long-lived worker doesn't grow per session"""
+        tasks = list(session_tasks)
+        for task in tasks:
+            task.cancel()
+        ctx.room.off("data_received", on_data_received)
+        tasks += data_router.cancel_tasks()
+        ctx.room.off("participant_connected", on_participant_connected)
+        ctx.room.off("participant_disconnected", on_participant_disconnected)
+        session.off("user_state_changed", on_user_state_changed)
+        session.off("agent_state_changed", on_agent_state_changed)
+        map_manager.set_room(None)
+        vyaas_local_commands.set_room(None)
+        await close_publisher(ctx.room)
+        await vyaas_iot.clear_device_cache()
+        SESSIONS_ACTIVE.dec()
+        # Measure only after the cancelled tasks have actually unwound
+        await asyncio.gather(*tasks, return_exceptions=True)
+        try:
+            await memory_audit.finish()
         except Exception as e:
-            print(f"Data processing error: {e}")
+            print(f"Memory audit failed: {e}")
+        try:
+            # The publisher thread may not run again before the job process exits
+            publish("telemetry", telemetry_snapshot())
+        except Exception as e:
+            print(f"Telemetry publish failed: {e}")
+
+    ctx.add_shutdown_callback(on_shutdown)
 
     # Load recent history logic
     try:
@@ -362,7 +321,7 @@ async def entrypoint(ctx: agents.JobContext):
 
     await session.start(
         room=ctx.room,
-        agent=Assistant(chat_ctx=current_ctx), #sending currenet chat to llm in realtime
+        agent=Assistant(chat_ctx=current_ctx, instructions=build_instructions(), tools=ctx.proc.userdata["tools"]), #sending currenet chat to llm in realtime
         room_input_options=RoomInputOptions(
             audio_enabled=True,
             video_enabled=True,  # 🎥 Enable screen share vision!
@@ -374,7 +333,7 @@ async def entrypoint(ctx: agents.JobContext):
 
     try:
         await session.generate_reply(
-            instructions=Reply_prompts
+            instructions=build_reply_prompt()
         )
     except RuntimeError as e:
         print(f"Session not ready yet: {e}")
@@ -389,142 +348,119 @@ async def entrypoint(ctx: agents.JobContext):
     conv_ctx = MemoryExtractor()
     await conv_ctx.run(current_ctx, user_identity)
 
-async def monitor_system(room, session):
+async def monitor_system(room, session, subscribers):
     """
     Background task to broadcast system metrics to the room
     And trigger alerts if thresholds are exceeded.
+    Metrics come from the shared sampler thread; alert decisions from the rule engine.
+    Metrics go out as keyframes + deltas (see vyaas_metrics_codec) and only when something changed.
+    With no subscribed frontend nothing is published and the sampler runs at the idle cadence;
+    spoken alerts still fire since they reach the user through the voice session.
+    Until a frontend negotiates (metrics_subscribe), anyone in the room gets full v1 payloads.
     """
-    import psutil
     import json
-    import time
-    
+    from vyaas_alerts import AlertEngine, combine_alerts
+    from vyaas_metrics_codec import MetricsEncoder
+
     print("Starting system monitoring task...")
-    
-    # Thresholds
-    CPU_THRESHOLD = 90
-    RAM_THRESHOLD = 90
-    DISK_THRESHOLD = 90
-    
-    # State tracking
-    last_alert_time = 0
-    ALERT_COOLDOWN = 60  # seconds
-    
+    publisher = get_publisher(room)
+    sampler = get_sampler()
+    alert_engine = AlertEngine()
+    encoder = MetricsEncoder()
+    last_seq = 0
+
     while True:
         try:
-            # CPU & RAM
-            cpu_percent = psutil.cpu_percent(interval=None)
-            ram = psutil.virtual_memory()
-
-            if termux.is_android():
-                # Check internal storage on Android
-                disk = psutil.disk_usage('/data/data/com.termux/files/home')
-            else:
-                disk = psutil.disk_usage('C:/')
-            
-            # Top Processes
-            processes = []
-            high_usage_app = None
-            cpu_count = psutil.cpu_count() or 1
-            
-            for proc in psutil.process_iter(['pid', 'name', 'cpu_percent', 'memory_percent']):
-                try:
-                    pinfo = proc.info
-                    # Normalize CPU usage by core count to keep it under 100%
-                    raw_cpu = pinfo['cpu_percent'] or 0
-                    normalized_cpu = raw_cpu / cpu_count
-                    pinfo['cpu_percent'] = round(normalized_cpu, 1)
-                    
-                    processes.append(pinfo)
-                    
-                    # Check for individual app high usage (>80%) - INCREASED LIMIT
-                    if normalized_cpu > 80 and pinfo['name'].lower() != "python.exe" and pinfo['name'] != "System Idle Process":
-                         if high_usage_app is None or normalized_cpu > (high_usage_app['cpu_percent']):
-                             high_usage_app = pinfo
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                     pass
-            
-            # Sort by CPU and top 5
-            top_processes = sorted(processes, key=lambda x: (x['cpu_percent'] or 0), reverse=True)[:5]
-            
-            payload = {
-                "type": "system_metrics",
-                "cpu": cpu_percent,
-                "memory": ram.percent,
-                "disk": disk.percent,
-                "processes": top_processes
-            }
-            
-            # Broadcast metrics
-            try:
-                await room.local_participant.publish_data(
-                    json.dumps(payload),
-                    topic="system_metrics"
+            streaming = subscribers.streaming(room)
+            sampler.set_interval(SAMPLE_INTERVAL if streaming else IDLE_INTERVAL)
+            if subscribers.take_new_subscriber():
+                encoder.request_keyframe()
+                last_seq = 0  # Resend the current snapshot right away
+
+            snapshot = sampler.latest()
+            if snapshot is None or snapshot.seq == last_seq:
+                await subscribers.wait_changed(sampler.interval)
+                continue
+            last_seq = snapshot.seq
+
+            # Broadcast metrics: keyframes reliable, deltas lossy (the next keyframe resyncs).
+            # A queued delta is superseded by a newer one against the same keyframe.
+            encoded = encoder.encode(snapshot, deltas=subscribers.negotiated) if streaming else None
+            if encoded:
+                payload, is_keyframe = encoded
+                publisher.submit(
+                    "system_metrics",
+                    payload,
+                    reliable=is_keyframe,
+                    coalesce_key=None if is_keyframe else f"metrics_delta:{encoder.keyframe_seq}",
                 )
-            except Exception:
-                pass
 
             # --- ALERT LOGIC ---
-            current_time = time.time()
-            if current_time - last_alert_time > ALERT_COOLDOWN:
-                alert_msg = ""
+            alerts = alert_engine.evaluate(snapshot)
+            if alerts:
+                alert_msg = combine_alerts(alerts)
+                print(f"TRIGGERING ALERT: {alert_msg}")
                 
-                if cpu_percent > CPU_THRESHOLD:
-                    alert_msg += f"Arre Bhaiya! CPU {cpu_percent}% pahunch gaya hai! PC garam ho raha hai! "
-                if ram.percent > RAM_THRESHOLD:
-                    alert_msg += f"Bhaiya, RAM {ram.percent}% full ho gayi hai! Thoda load kam kigiye na. "
-                if disk.percent > DISK_THRESHOLD:
-                    alert_msg += f"Bhaiya, Disk almost full hai ({disk.percent}%)! Kuch delete karna padega. "
-                if high_usage_app:
-                    alert_msg += f"Dekho Bhaiya! Ye {high_usage_app['name']} {high_usage_app['cpu_percent']}% CPU kha raha hai! Isko band karoon kya? "
-                
-                if alert_msg:
-                    print(f"TRIGGERING ALERT: {alert_msg}")
-                    last_alert_time = current_time
-                    
-                    # 1. Send Visual Alert to Frontend
-                    try:
-                        alert_payload = {
-                            "type": "system_alert",
-                            "message": alert_msg
-                        }
-                        await room.local_participant.publish_data(
-                            json.dumps(alert_payload),
-                            topic="system_alert" # Dedicated topic
-                        )
-                    except Exception:
-                        pass
-                        
-                    # 2. Trigger AI Speech
-                    # We inject a system instruction telling the AI to speak the warning
-                    try:
-                        # Force the AI to speak this warning immediately
-                        # IMPORTANT: Explicitly forbid greeting here
-                        await session.generate_reply(
-                            instructions=f"URGENT: Speak this system warning to the user immediately in Hinglish. Do NOT say hello or introduce yourself. Just say the warning: {alert_msg}"
-                        )
-                    except Exception as e:
-                        print(f"Failed to trigger voice alert: {e}")
+                # 1. Send Visual Alert to Frontend (only if one is watching)
+                if streaming:
+                    alert_payload = {
+                        "type": "system_alert",
+                        "message": alert_msg,
+                        "alerts": [alert["rule"] for alert in alerts]
+                    }
+                    publisher.submit("system_alert", json.dumps(alert_payload))  # Dedicated topic
+
+                # 2. Trigger AI Speech (one reply for the whole batch)
+                # We inject a system instruction telling the AI to speak the warning
+                try:
+                    # Force the AI to speak this warning immediately
+                    # IMPORTANT: Explicitly forbid greeting here
+                    await session.generate_reply(
+                        instructions=f"URGENT: Speak this system warning to the user immediately in Hinglish. Do NOT say hello or introduce yourself. Just say the warning: {alert_msg}"
+                    )
+                except Exception as e:
+                    print(f"Failed to trigger voice alert: {e}")
 
         except Exception as e:
             print(f"Error in monitor_system: {e}")
             
-        await asyncio.sleep(2) # Update every 2 seconds
+        await subscribers.wait_changed(sampler.interval) # Update every sampler tick (2 s, 30 s idle)
     
 
 # Health Check Server for Render
 class HealthHandler(BaseHTTPRequestHandler):
     def do_GET(self):
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
+        from vyaas_circuit_breaker import all_breaker_states
+        import vyaas_telemetry
+
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            self._send(200, "text/plain; version=0.0.4", vyaas_telemetry.render_prometheus())
+            return
+        if path == "/ready":
+            ready, checks = vyaas_telemetry.readiness()
+            body = {"status": "ready" if ready else "not_ready", "checks": checks}
+            self._send(200 if ready else 503, "application/json", json.dumps(body))
+            return
+
+        body = {"status": "ok", "service": "VYAAS AI Agent", "circuits": all_breaker_states()}
+        self._send(200, "application/json", json.dumps(body))
+
+    def _send(self, status, content_type, text):
+        data = text.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-type', content_type)
+        self.send_header('Content-Length', str(len(data)))
         self.end_headers()
-        self.wfile.write(b'{"status": "ok", "service": "VYAAS AI Agent"}')
+        self.wfile.write(data)
     
     def log_message(self, format, *args):
         pass  # Suppress logs
 
 def start_health_server():
     port = int(os.getenv('PORT', 10000))
-    server = HTTPServer(('0.0.0.0', port), HealthHandler)
+    # Threaded, so a slow /ready probe never holds up /metrics scrapes or liveness checks
+    server = ThreadingHTTPServer(('0.0.0.0', port), HealthHandler)
     print(f"Health server running on port {port}")
     server.serve_forever()
 
@@ -541,7 +477,7 @@ if __name__ == "__main__":
     
 
     # Start LiveKit agent
-    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint))
+    agents.cli.run_app(agents.WorkerOptions(entrypoint_fnc=entrypoint, prewarm_fnc=prewarm))
 
 
     
\ No newline at end of file
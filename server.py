@@ -5,7 +5,6 @@ from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from typing import Optional, List, Dict, Any
 from datetime import timedelta
-import requests
 from dotenv import load_dotenv
 from fastapi import FastAPI, HTTPException, Request, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
@@ -13,6 +12,9 @@ from pydantic import BaseModel
 from livekit import api
 from supabase import create_client, Client
 
+import vyaas_http
+from vyaas_circuit_breaker import get_breaker, breaker_states, CircuitOpenError
+
 # Load environment variables
 load_dotenv()
 
@@ -97,7 +99,7 @@ def send_email_sync(to_email: str, subject: str, html_content: str):
 
 @app.get("/")
 def read_root():
-    return {"status": "ok", "message": "VYAAS AI Backend is running"}
+    return {"status": "ok", "message": "VYAAS AI Backend is running", "circuits": breaker_states()}
 
 @app.post("/api/connection-details")
 async def get_connection_details(request: ConnectionDetailsRequest):
@@ -256,13 +258,17 @@ async def generate_image_endpoint(request: ImageRequest):
         raise HTTPException(status_code=500, detail="Missing HF_TOKEN")
 
     try:
-        response = requests.post(
+        # Fails fast while Hugging Face keeps erroring instead of holding the request open
+        response = await get_breaker("huggingface").acall(
+            vyaas_http.post,
             "https://api-inference.huggingface.co/models/stabilityai/stable-diffusion-2",
             headers={
                 "Authorization": f"Bearer {HF_TOKEN}",
                 "Content-Type": "application/json",
             },
-            json={"inputs": request.prompt}
+            json={"inputs": request.prompt},
+            timeout=60,
+            failure_if=lambda r: r.status_code >= 500,
         )
 
         if response.status_code != 200:
@@ -273,6 +279,8 @@ async def generate_image_endpoint(request: ImageRequest):
         
         return {"imageUrl": f"data:image/png;base64,{base64_image}"}
 
+    except CircuitOpenError as e:
+        raise HTTPException(status_code=503, detail=f"Image service unavailable, retry in {e.retry_in:.0f}s")
     except Exception as e:
         print(f"❌ Image generation error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,189 @@
+"""
+VYAAS AI - System Alert Engine
+Turns sampler snapshots into spoken/visual alerts without reacting to single spikes.
+
+Each rule is plain data (see DEFAULT_RULES): which metric to watch, how to
+smooth it (EWMA or a sustained window), a fire threshold, a lower clear
+threshold (hysteresis) and its own cooldown. A rule fires once, stays silent
+while the condition holds, and re-arms only after the value drops below the
+clear threshold. Alerts that fire within COALESCE_WINDOW of each other are
+delivered as one batch so the model speaks once.
+
+To watch a new metric: add an extractor to METRIC_EXTRACTORS and a rule.
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger("vyaas_alerts")
+logger.setLevel(logging.INFO)
+
+# Alerts firing within this many seconds of each other are delivered together
+COALESCE_WINDOW = 6.0
+
+# An EWMA rule can fire only after this many samples spanning at least its window,
+# and one sample moves the average at most EWMA_MAX_ALPHA of the way (at the 30 s
+# idle cadence the time-based alpha alone would be ~0.95, i.e. no smoothing)
+EWMA_MIN_SAMPLES = 3
+EWMA_MAX_ALPHA = 0.5
+
+# Processes that are expected to be busy and never alerted on
+IGNORED_PROCESSES = {"python.exe", "python", "system idle process"}
+
+
+def _top_process(snapshot) -> Optional[Tuple[float, dict]]:
+    for proc in snapshot.top_processes:
+        if proc.name.lower() not in IGNORED_PROCESSES:
+            return proc.cpu_percent, {"name": proc.name}
+    return None
+
+
+# metric name -> snapshot -> (value, extra template fields) or None
+METRIC_EXTRACTORS: Dict[str, Callable] = {
+    "cpu": lambda s: (s.cpu_percent, {}),
+    "ram": lambda s: (s.ram_percent, {}),
+    "disk": lambda s: (s.disk_percent, {}),
+    "top_process_cpu": _top_process,
+}
+
+
+class AlertRule:
+    """
+    Declarative alert rule.
+        mode="ewma":      exponentially smoothed value, `window` is the time constant (s);
+                          fires only once warmed up (EWMA_MIN_SAMPLES spanning `window`)
+        mode="sustained": every sample covering the last `window` seconds must be >= fire_above
+    """
+
+    def __init__(self, name: str, metric: str, fire_above: float, clear_below: float,
+                 message: str, mode: str = "ewma", window: float = 10.0, cooldown: float = 300.0):
+        if clear_below > fire_above:
+            raise ValueError(f"Rule {name}: clear_below must not exceed fire_above")
+        if mode not in ("ewma", "sustained"):
+            raise ValueError(f"Rule {name}: unknown mode {mode}")
+        self.name = name
+        self.metric = metric
+        self.fire_above = fire_above
+        self.clear_below = clear_below
+        self.message = message
+        self.mode = mode
+        self.window = window
+        self.cooldown = cooldown
+
+
+DEFAULT_RULES = [
+    AlertRule(
+        name="cpu_high", metric="cpu", mode="ewma", window=10,
+        fire_above=90, clear_below=75, cooldown=300,
+        message="Arre Bhaiya! CPU {value:.0f}% pahunch gaya hai! PC garam ho raha hai!",
+    ),
+    AlertRule(
+        name="ram_high", metric="ram", mode="sustained", window=30,
+        fire_above=90, clear_below=85, cooldown=600,
+        message="Bhaiya, RAM {value:.0f}% full ho gayi hai! Thoda load kam kigiye na.",
+    ),
+    AlertRule(
+        name="disk_full", metric="disk", mode="sustained", window=60,
+        fire_above=90, clear_below=88, cooldown=3600,
+        message="Bhaiya, Disk almost full hai ({value:.0f}%)! Kuch delete karna padega.",
+    ),
+    AlertRule(
+        name="hot_process", metric="top_process_cpu", mode="sustained", window=20,
+        fire_above=80, clear_below=60, cooldown=300,
+        message="Dekho Bhaiya! Ye {name} {value:.0f}% CPU kha raha hai! Isko band karoon kya?",
+    ),
+]
+
+
+class _RuleState:
+    def __init__(self):
+        self.value: Optional[float] = None       # Smoothed value (ewma) / latest value (sustained)
+        self.last_ts: Optional[float] = None
+        self.first_ts: Optional[float] = None    # First sample (ewma warm-up)
+        self.count = 0
+        self.samples: deque = deque()            # (ts, value) for sustained rules
+        self.firing = False
+        self.last_fired = -math.inf
+
+
+class AlertEngine:
+    """Evaluates rules against successive snapshots. Not thread-safe; drive it from one loop."""
+
+    def __init__(self, rules: Optional[List[AlertRule]] = None, coalesce_window: float = COALESCE_WINDOW):
+        self.rules = list(rules if rules is not None else DEFAULT_RULES)
+        self.coalesce_window = coalesce_window
+        self._state: Dict[str, _RuleState] = {rule.name: _RuleState() for rule in self.rules}
+        self._pending: List[dict] = []
+        self._pending_since = 0.0
+
+    def evaluate(self, snapshot, now: Optional[float] = None) -> List[dict]:
+        """
+        Feed one snapshot. Returns a batch of alerts to deliver now (usually empty):
+        [{"rule": name, "value": float, "message": str}, ...]
+        """
+        now = time.monotonic() if now is None else now
+        fired = []
+        for rule in self.rules:
+            extractor = METRIC_EXTRACTORS.get(rule.metric)
+            if extractor is None:
+                continue
+            reading = extractor(snapshot)
+            if reading is None:
+                continue
+            value, fields = reading
+            state = self._state[rule.name]
+
+            condition = self._update(rule, state, value, now)
+            if state.firing:
+                if state.value < rule.clear_below:
+                    state.firing = False
+                    logger.info(f"Alert cleared: {rule.name} ({state.value:.1f})")
+            elif condition and now - state.last_fired >= rule.cooldown:
+                state.firing = True
+                state.last_fired = now
+                fired.append({
+                    "rule": rule.name,
+                    "value": state.value,
+                    "message": rule.message.format(value=state.value, **fields),
+                })
+
+        if fired:
+            if not self._pending:
+                self._pending_since = now
+            self._pending.extend(fired)
+        if self._pending and now - self._pending_since >= self.coalesce_window:
+            batch, self._pending = self._pending, []
+            return batch
+        return []
+
+    @staticmethod
+    def _update(rule: AlertRule, state: _RuleState, value: float, now: float) -> bool:
+        """Update the rule's smoothed state and return whether the fire condition holds"""
+        if rule.mode == "ewma":
+            if state.value is None:
+                state.value = value
+                state.first_ts = now
+            else:
+                alpha = min(EWMA_MAX_ALPHA, 1 - math.exp(-(now - state.last_ts) / rule.window))
+                state.value += alpha * (value - state.value)
+            state.last_ts = now
+            state.count += 1
+            warmed_up = state.count >= EWMA_MIN_SAMPLES and now - state.first_ts >= rule.window
+            return warmed_up and state.value >= rule.fire_above
+
+        # sustained: keep the newest sample at or before the window start as an anchor,
+        # so sparse (idle cadence) sampling can still cover the window
+        state.value = value
+        state.samples.append((now, value))
+        while len(state.samples) > 1 and now - state.samples[1][0] >= rule.window:
+            state.samples.popleft()
+        covered = now - state.samples[0][0]
+        return covered >= rule.window * 0.9 and all(v >= rule.fire_above for _, v in state.samples)
+
+
+def combine_alerts(alerts: List[dict]) -> str:
+    """Join a batch of alerts into one spoken/visual message"""
+    return " ".join(alert["message"] for alert in alerts)
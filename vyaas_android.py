@@ -7,8 +7,10 @@ Requires 'USB Debugging' to be enabled on the phone.
 
 import subprocess
 import logging
-import time
 from livekit.agents import function_tool
+from vyaas_executor import offload
+from vyaas_tool_scheduler import uses
+from vyaas_deadline import clamp_timeout, deadline_sleep
 
 logger = logging.getLogger("vyaas_android")
 logger.setLevel(logging.INFO)
@@ -16,18 +18,29 @@ logger.setLevel(logging.INFO)
 # Hardcoded ADB Path found on user system
 ADB_PATH = r"C:\Users\mahes\AppData\Local\Android\Sdk\platform-tools\adb.exe"
 
+# ip:port of the device connected last (commands go to ADB's default device)
+_device_serial: str = ""
+
+
+def adb_device(params: dict) -> str:
+    """Scheduler resource for the phone ADB commands currently go to"""
+    return f"adb:{_device_serial or 'default'}"
+
+
 def run_adb_command(command_list):
     """Run an ADB command and return output."""
     try:
         full_command = [ADB_PATH] + command_list
         # Increased timeout for connection attempts
-        result = subprocess.run(full_command, capture_output=True, text=True, timeout=15)
+        result = subprocess.run(full_command, capture_output=True, text=True, timeout=clamp_timeout(15))
         return result.stdout.strip()
     except Exception as e:
         logger.error(f"ADB Error: {e}")
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("adb:{ip_address}:{pairing_port}")
+@offload("subprocess")
 async def pair_android_device(ip_address: str, pairing_port: str, pairing_code: str) -> str:
     """
     Pair Android device using Wireless Debugging (Step 1).
@@ -50,6 +63,8 @@ async def pair_android_device(ip_address: str, pairing_port: str, pairing_code:
         return f"Pairing Failed: {pair_out}. Check IP, Port, and Code carefully."
 
 @function_tool()
+@uses(adb_device, "adb:{ip_address}:{port}")
+@offload("subprocess")
 async def connect_android_device(ip_address: str, port: str) -> str:
     """
     Connect to Android device via ADB Wireless (Step 2).
@@ -59,17 +74,21 @@ async def connect_android_device(ip_address: str, port: str) -> str:
     Returns:
         Status message
     """
+    global _device_serial
+
     logger.info(f"Connecting to {ip_address}:{port}")
     
     # 0. Clear stale connections first (Fixes 'offline' status)
     run_adb_command(["disconnect"])
-    time.sleep(1)
+    deadline_sleep(1)
     
     # 1. Connect
     connect_out = run_adb_command(["connect", f"{ip_address}:{port}"])
-    time.sleep(1)
+    deadline_sleep(1)
     
     if "connected to" in (connect_out or "").lower() or "already connected" in (connect_out or "").lower():
+        _device_serial = f"{ip_address}:{port}"
+
         # Verify device listing
         devices = run_adb_command(["devices"])
         if f"{ip_address}:{port}" in devices and "offline" not in devices:
@@ -84,6 +103,8 @@ async def connect_android_device(ip_address: str, port: str) -> str:
         return f"Connection Failed: {connect_out}. Ensure 'Wireless Debugging' is ON and using the MAIN port (not pairing port)."
 
 @function_tool()
+@uses(adb_device)
+@offload("subprocess")
 async def open_android_app(app_name: str) -> str:
     """
     Open an app on the connected Android phone.
@@ -124,6 +145,8 @@ async def open_android_app(app_name: str) -> str:
     return f"Done! Opened {app_name} on your phone."
 
 @function_tool()
+@uses(adb_device)
+@offload("subprocess")
 async def send_android_whatsapp(phone_number: str, message: str) -> str:
     """
     Send a WhatsApp message via Android Phone using phone number.
@@ -146,7 +169,7 @@ async def send_android_whatsapp(phone_number: str, message: str) -> str:
         run_adb_command(cmd)
         
         # Wait for WhatsApp to open and load
-        time.sleep(3)
+        deadline_sleep(3)
         
         # Click "Send" button by pressing Enter
         run_adb_command(["shell", "input", "keyevent", "66"]) # KEYCODE_ENTER
@@ -158,6 +181,8 @@ async def send_android_whatsapp(phone_number: str, message: str) -> str:
 
 
 @function_tool()
+@uses(adb_device)
+@offload("subprocess")
 async def search_and_send_android_whatsapp(contact_name: str, message: str) -> str:
     """
     Search for a contact by name in WhatsApp and send message via Android Phone.
@@ -173,7 +198,7 @@ async def search_and_send_android_whatsapp(contact_name: str, message: str) -> s
     try:
         # 1. Open WhatsApp
         run_adb_command(["shell", "monkey", "-p", "com.whatsapp", "-c", "android.intent.category.LAUNCHER", "1"])
-        time.sleep(3)  # Wait for WhatsApp to open
+        deadline_sleep(3)  # Wait for WhatsApp to open
         
         # 2. Tap on Search icon (usually top right)
         # Get screen size first
@@ -193,25 +218,25 @@ async def search_and_send_android_whatsapp(contact_name: str, message: str) -> s
         search_y = int(height * 0.06)  # 6% from top (in status bar area)
         
         run_adb_command(["shell", "input", "tap", str(search_x), str(search_y)])
-        time.sleep(1)
+        deadline_sleep(1)
         
         # 3. Type contact name
         # First clear any existing text
         run_adb_command(["shell", "input", "keyevent", "28"])  # KEYCODE_CLEAR
-        time.sleep(0.3)
+        deadline_sleep(0.3)
         
         # Type the contact name
         # ADB input text doesn't work well with spaces, so replace with %s
         safe_name = contact_name.replace(" ", "%s")
         run_adb_command(["shell", "input", "text", safe_name])
-        time.sleep(2)  # Wait for search results
+        deadline_sleep(2)  # Wait for search results
         
         # 4. Tap on first search result (usually below search bar)
         result_x = int(width * 0.5)  # Center horizontally
         result_y = int(height * 0.18)  # About 18% from top
         
         run_adb_command(["shell", "input", "tap", str(result_x), str(result_y)])
-        time.sleep(2)  # Wait for chat to open
+        deadline_sleep(2)  # Wait for chat to open
         
         # 5. Type message in the message input
         # The message input is at the bottom of the screen
@@ -220,12 +245,12 @@ async def search_and_send_android_whatsapp(contact_name: str, message: str) -> s
         msg_input_y = int(height * 0.93)  # Bottom area
         
         run_adb_command(["shell", "input", "tap", str(msg_input_x), str(msg_input_y)])
-        time.sleep(0.5)
+        deadline_sleep(0.5)
         
         # Type the message
         safe_message = message.replace(" ", "%s")
         run_adb_command(["shell", "input", "text", safe_message])
-        time.sleep(0.5)
+        deadline_sleep(0.5)
         
         # 6. Send the message (tap send button or press enter)
         # Send button is at bottom right
@@ -241,6 +266,8 @@ async def search_and_send_android_whatsapp(contact_name: str, message: str) -> s
 
 
 @function_tool()
+@uses(adb_device)
+@offload("subprocess")
 async def make_android_call(phone_number: str) -> str:
     """
     Make a phone call via Android Phone.
@@ -266,6 +293,8 @@ async def make_android_call(phone_number: str) -> str:
     return f"Done! Calling {phone_number}..."
 
 @function_tool()
+@uses(adb_device)
+@offload("subprocess")
 async def search_android_youtube(query: str) -> str:
     """
     Search and play video on Android YouTube app.
@@ -281,7 +310,7 @@ async def search_android_youtube(query: str) -> str:
     run_adb_command(cmd)
     
     # Wait and tap first video?
-    time.sleep(4)
+    deadline_sleep(4)
     # Generic Center Tap?
     # run_adb_command(["shell", "input", "tap", "500", "500"]) 
     
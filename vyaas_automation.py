@@ -8,6 +8,7 @@ import os
 import time
 import logging
 from livekit.agents import function_tool
+from vyaas_tool_scheduler import uses
 
 logger = logging.getLogger("vyaas_automation")
 logger.setLevel(logging.INFO)
@@ -530,6 +531,7 @@ async def send_instagram_message(username: str, message: str) -> str:
 
 
 @function_tool()
+@uses("desktop-gui")
 async def send_whatsapp_file(phone_number: str, file_path: str, caption: str = "") -> str:
     """
     Send a file via WhatsApp Desktop App.
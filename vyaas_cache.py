@@ -0,0 +1,282 @@
+"""
+VYAAS AI - Tool Result Cache
+TTL cache with stale-while-revalidate and single-flight for idempotent tools.
+
+    @function_tool()
+    @cached(ttl=300, stale_ttl=600, cache_if=lambda r: r.startswith("Weather in"))
+    async def get_weather(city: str = "") -> str:
+
+    age < ttl                  served from cache (hit)
+    age < ttl + stale_ttl      served from cache immediately, refreshed in the background (stale hit)
+    otherwise                  recomputed; concurrent callers for the same key share one
+                               computation (single-flight, counted as "coalesced")
+
+Exceptions are never cached; `cache_if` can also reject results such as error
+strings. Keys are the call's bound arguments (after defaults), or `key(params)`.
+All entries share one LRU bounded by MAX_BYTES (estimated). invalidate(func)
+drops a function's entries, e.g. after a write. Counters per function are
+available from get_cache_stats() for tuning TTLs.
+
+Works from any event loop or thread (the agent loop and executor workers).
+Background refreshes run on the long-lived loop registered with
+set_refresh_loop() (the job's loop): a refresh started from a short-lived
+loop (asyncio.run in prewarm or an executor worker) would be cancelled when
+that loop ends. Without a registered loop, stale entries are served without
+a refresh.
+"""
+
+import asyncio
+import concurrent.futures
+import functools
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger("vyaas_cache")
+logger.setLevel(logging.INFO)
+
+MAX_BYTES = int(os.getenv("VYAAS_CACHE_MAX_BYTES", str(2 * 1024 * 1024)))
+
+
+def _estimate_size(value) -> int:
+    if isinstance(value, (str, bytes)):
+        return sys.getsizeof(value)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(_estimate_size(k) + _estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(_estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _Entry:
+    __slots__ = ("value", "stored_at", "size")
+
+    def __init__(self, value, stored_at: float, size: int):
+        self.value = value
+        self.stored_at = stored_at
+        self.size = size
+
+
+class _FuncStats:
+    def __init__(self):
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.refreshes = 0
+        self.rejected = 0   # Results not stored (cache_if said no)
+        self.generation = 0  # Bumped by invalidate(); in-flight loads from older generations are not stored
+
+
+class ResultCache:
+    """Shared LRU store with a byte budget. Thread-safe."""
+
+    def __init__(self, max_bytes: int = MAX_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[tuple, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._inflight: Dict[tuple, concurrent.futures.Future] = {}
+        self._stats: Dict[str, _FuncStats] = {}
+        self._lock = threading.Lock()
+        self._background = set()
+        self.evictions = 0
+
+    def stats_for(self, name: str) -> _FuncStats:
+        """Per-function stats (call with _lock held)"""
+        stats = self._stats.get(name)
+        if stats is None:
+            stats = self._stats[name] = _FuncStats()
+        return stats
+
+    def count(self, name: str, counter: str):
+        with self._lock:
+            stats = self.stats_for(name)
+            setattr(stats, counter, getattr(stats, counter) + 1)
+
+    # ============== STORE ==============
+
+    def lookup(self, key: tuple) -> Optional[_Entry]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def store(self, key: tuple, value, generation: int):
+        size = _estimate_size(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if self.stats_for(key[0]).generation != generation:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._entries[key] = _Entry(value, time.monotonic(), size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted.size
+                self.evictions += 1
+
+    def invalidate(self, name: str):
+        with self._lock:
+            self.stats_for(name).generation += 1
+            for key in [k for k in self._entries if k[0] == name]:
+                self._bytes -= self._entries.pop(key).size
+
+    # ============== LOADING ==============
+
+    async def load(self, key: tuple, compute: Callable, cache_if: Optional[Callable]):
+        """Single-flight: the first caller computes, concurrent callers await its result"""
+        while True:
+            with self._lock:
+                stats = self.stats_for(key[0])
+                future = self._inflight.get(key)
+                leader = future is None
+                if leader:
+                    future = self._inflight[key] = concurrent.futures.Future()
+                    generation = stats.generation
+                else:
+                    stats.coalesced += 1
+            if leader:
+                break
+            try:
+                # shield: a follower timing out must not cancel the shared computation
+                return await asyncio.shield(asyncio.wrap_future(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The computing caller was cancelled (e.g. its deadline); take over
+
+        try:
+            value = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            if cache_if is None or cache_if(value):
+                self.store(key, value, generation)
+            else:
+                self.count(key[0], "rejected")
+            future.set_result(value)
+            return value
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def refresh_in_background(self, key: tuple, compute: Callable, cache_if: Optional[Callable]):
+        loop = _refresh_loop
+        if loop is None or loop.is_closed():
+            return  # No long-lived loop: the next miss after the stale window recomputes
+        with self._lock:
+            if key in self._inflight:
+                return
+            self.stats_for(key[0]).refreshes += 1
+
+        async def refresh():
+            try:
+                await self.load(key, compute, cache_if)
+            except Exception as e:
+                logger.warning(f"Background refresh of {key[0]} failed: {e}")
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            task = loop.create_task(refresh())
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        else:
+            asyncio.run_coroutine_threadsafe(refresh(), loop)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "evictions": self.evictions,
+                "functions": [
+                    {
+                        "name": name,
+                        "hits": s.hits,
+                        "stale_hits": s.stale_hits,
+                        "misses": s.misses,
+                        "coalesced": s.coalesced,
+                        "refreshes": s.refreshes,
+                        "rejected": s.rejected,
+                    }
+                    for name, s in sorted(self._stats.items())
+                ],
+            }
+
+
+_cache = ResultCache()
+
+# Loop that outlives single calls (the job's loop), for background refreshes
+_refresh_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+def set_refresh_loop(loop: Optional[asyncio.AbstractEventLoop]):
+    global _refresh_loop
+    _refresh_loop = loop
+
+
+def _call_key(signature: inspect.Signature, args: tuple, kwargs: dict, key: Optional[Callable]):
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    if key is not None:
+        return key(dict(bound.arguments))
+    return repr(tuple(bound.arguments.items()))
+
+
+def cached(ttl: float, stale_ttl: float = 0.0, key: Optional[Callable] = None,
+           cache_if: Optional[Callable] = None):
+    """Cache an async function's results (see module docstring)"""
+
+    def decorator(func):
+        name = f"{func.__module__}.{func.__qualname__}"
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            call_key = (name, _call_key(signature, args, kwargs, key))
+            compute = functools.partial(func, *args, **kwargs)
+
+            entry = _cache.lookup(call_key)
+            if entry is not None:
+                age = time.monotonic() - entry.stored_at
+                if age < ttl:
+                    _cache.count(name, "hits")
+                    return entry.value
+                if age < ttl + stale_ttl:
+                    _cache.count(name, "stale_hits")
+                    _cache.refresh_in_background(call_key, compute, cache_if)
+                    return entry.value
+
+            _cache.count(name, "misses")
+            return await _cache.load(call_key, compute, cache_if)
+
+        wrapper.__vyaas_cache_name__ = name
+        return wrapper
+
+    return decorator
+
+
+def invalidate(func):
+    """Drop every cached result of a @cached function"""
+    _cache.invalidate(func.__vyaas_cache_name__)
+
+
+def get_cache_stats() -> dict:
+    return _cache.stats()
@@ -0,0 +1,320 @@
+"""
+VYAAS AI - Circuit Breakers
+Fail fast when an external service (Mem0, OpenWeather, Hugging Face, the
+WhatsApp service) is down, instead of paying its full timeout on every call.
+
+    closed     calls go through; outcomes are kept for the last `window` seconds
+    open       failure rate >= threshold (over at least `min_calls` calls):
+               calls raise CircuitOpenError immediately for `open_seconds`
+    half-open  after open_seconds one probe call is let through; success
+               closes the circuit, failure opens it again
+
+    breaker = get_breaker("openweather")
+    response = await breaker.acall(vyaas_http.get, url, timeout=10,
+                                   failure_if=lambda r: r.status_code >= 500)
+
+Idempotent reads can be hedged: if the first attempt has not answered after
+`hedge_after` seconds, a second one is started and the first result wins
+(call_hedged for blocking functions, acall_hedged for coroutines).
+
+Breakers are thread-safe (blocking calls run on executor threads). States are
+published through vyaas_process_state on every transition and every telemetry
+interval (the open -> half-open step happens lazily, on the next read), so the
+health endpoint in the main process sees breakers of every job process
+(all_breaker_states()). A cancelled half-open probe (e.g. cut off by its tool
+deadline) frees the probe slot, so the next call probes again.
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import logging
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from vyaas_process_state import collect, publish
+
+logger = logging.getLogger("vyaas_circuit_breaker")
+logger.setLevel(logging.INFO)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+# Threads for hedged blocking reads (separate from the executor pools, which
+# may be the callers and must not wait on themselves)
+_hedge_pool = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="vyaas-hedge")
+
+
+class CircuitOpenError(ConnectionError):
+    """Raised without calling the service while its circuit is open"""
+
+    def __init__(self, name: str, retry_in: float):
+        super().__init__(f"{name} circuit open (retry in {retry_in:.0f}s)")
+        self.name = name
+        self.retry_in = retry_in
+
+
+class CircuitBreaker:
+    def __init__(self, name: str, failure_rate: float = 0.5, min_calls: int = 4,
+                 window: float = 60.0, open_seconds: float = 30.0):
+        self.name = name
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.window = window
+        self.open_seconds = open_seconds
+
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._outcomes: deque = deque()  # (monotonic ts, ok)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.rejected = 0
+        self.last_error: Optional[str] = None
+
+    # ============== STATE ==============
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def before_call(self):
+        """Raise CircuitOpenError if the call must not go out (microseconds when open)"""
+        with self._lock:
+            now = time.monotonic()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                logger.info(f"{self.name}: half-open, probing")
+                return
+            self.rejected += 1
+            retry_in = max(0.0, self.open_seconds - (now - self._opened_at))
+        raise CircuitOpenError(self.name, retry_in)
+
+    def record_cancelled(self):
+        """The call was cancelled before it answered: no outcome, but free the half-open probe slot"""
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._probe_in_flight = False
+
+    def record_success(self):
+        with self._lock:
+            changed = self._state == HALF_OPEN
+            if changed:
+                logger.info(f"{self.name}: probe succeeded, circuit closed")
+                self._state = CLOSED
+                self._outcomes.clear()
+                self._probe_in_flight = False
+            self._add_outcome(True)
+        if changed:
+            publish_states()
+
+    def record_failure(self, error: Optional[BaseException] = None):
+        with self._lock:
+            now = time.monotonic()
+            self.last_error = f"{type(error).__name__}: {error}" if error else "failure"
+            changed = False
+            if self._state == HALF_OPEN:
+                self._open(now, "probe failed")
+                changed = True
+            else:
+                self._add_outcome(False)
+                calls = len(self._outcomes)
+                failures = sum(1 for _, ok in self._outcomes if not ok)
+                if self._state == CLOSED and calls >= self.min_calls and failures / calls >= self.failure_rate:
+                    self._open(now, f"{failures}/{calls} calls failed")
+                    changed = True
+        if changed:
+            publish_states()
+
+    def reset(self):
+        """Force the circuit closed (e.g. after (re)starting a local service)"""
+        with self._lock:
+            changed = self._state != CLOSED
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._probe_in_flight = False
+        if changed:
+            logger.info(f"{self.name}: circuit reset")
+            publish_states()
+
+    def _add_outcome(self, ok: bool):
+        now = time.monotonic()
+        self._outcomes.append((now, ok))
+        while self._outcomes and now - self._outcomes[0][0] > self.window:
+            self._outcomes.popleft()
+
+    def _open(self, now: float, reason: str):
+        self._state = OPEN
+        self._opened_at = now
+        self._probe_in_flight = False
+        logger.warning(f"{self.name}: circuit opened ({reason}) for {self.open_seconds:.0f}s")
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            calls = len(self._outcomes)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "name": self.name,
+                "state": self._current_state(now),
+                "calls_in_window": calls,
+                "failure_rate": round(failures / calls, 2) if calls else 0.0,
+                "rejected": self.rejected,
+                "last_error": self.last_error,
+            }
+
+    # ============== CALL HELPERS ==============
+
+    def call(self, func: Callable, *args, failure_if: Optional[Callable] = None, **kwargs):
+        """Call a blocking function through the breaker"""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        if failure_if is not None and failure_if(result):
+            self.record_failure(RuntimeError(f"bad result: {result!r}"[:200]))
+        else:
+            self.record_success()
+        return result
+
+    async def acall(self, coro_func: Callable, *args, failure_if: Optional[Callable] = None, **kwargs):
+        """Await a coroutine function through the breaker"""
+        self.before_call()
+        try:
+            result = await coro_func(*args, **kwargs)
+        except asyncio.CancelledError:
+            self.record_cancelled()
+            raise
+        except Exception as e:
+            self.record_failure(e)
+            raise
+        if failure_if is not None and failure_if(result):
+            self.record_failure(RuntimeError(f"bad result: {result!r}"[:200]))
+        else:
+            self.record_success()
+        return result
+
+    def call_hedged(self, func: Callable, *args, hedge_after: float = 1.0,
+                    failure_if: Optional[Callable] = None, **kwargs):
+        """Idempotent blocking read: start a second attempt if the first is slow; first success wins"""
+        self.before_call()
+
+        def attempt():
+            # Each attempt gets its own context copy (deadline etc.); a context can't be entered twice
+            return _hedge_pool.submit(contextvars.copy_context().run, func, *args, **kwargs)
+
+        attempts = [attempt()]
+        done, _ = concurrent.futures.wait(attempts, timeout=hedge_after)
+        if not done:
+            attempts.append(attempt())
+
+        error = None
+        bad_result = None
+        pending = set(attempts)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                result = future.result()
+                if failure_if is not None and failure_if(result):
+                    bad_result = (result,)
+                    continue
+                self.record_success()
+                return result
+
+        if bad_result is not None:
+            # Every attempt answered badly (e.g. HTTP 5xx): count it, let the caller see the response
+            self.record_failure(RuntimeError(f"bad result: {bad_result[0]!r}"[:200]))
+            return bad_result[0]
+        self.record_failure(error)
+        raise error
+
+    async def acall_hedged(self, coro_func: Callable, *args, hedge_after: float = 1.0,
+                           failure_if: Optional[Callable] = None, **kwargs):
+        """Idempotent async read: start a second attempt if the first is slow; first success wins"""
+        self.before_call()
+        attempts = [asyncio.ensure_future(coro_func(*args, **kwargs))]
+        try:
+            done, _ = await asyncio.wait(attempts, timeout=hedge_after)
+            if not done:
+                attempts.append(asyncio.ensure_future(coro_func(*args, **kwargs)))
+
+            error = None
+            bad_result = None
+            pending = set(attempts)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = task.exception()
+                        continue
+                    result = task.result()
+                    if failure_if is not None and failure_if(result):
+                        bad_result = (result,)
+                        continue
+                    self.record_success()
+                    return result
+
+            if bad_result is not None:
+                self.record_failure(RuntimeError(f"bad result: {bad_result[0]!r}"[:200]))
+                return bad_result[0]
+            self.record_failure(error)
+            raise error
+        except asyncio.CancelledError:
+            self.record_cancelled()
+            raise
+        finally:
+            for task in attempts:
+                task.cancel()
+
+
+# Shared breakers, one per external service (per process)
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str, **options) -> CircuitBreaker:
+    """Return the named breaker, creating it with `options` on first use"""
+    breaker = _breakers.get(name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(name)
+            if breaker is None:
+                breaker = _breakers[name] = CircuitBreaker(name, **options)
+        publish_states()
+    return breaker
+
+
+def breaker_states() -> List[dict]:
+    """Breakers of this process"""
+    return [breaker.snapshot() for breaker in _breakers.values()]
+
+
+def publish_states():
+    """Publish this process's breakers (on transitions, and periodically by vyaas_telemetry)"""
+    publish("breakers", breaker_states())
+
+
+def all_breaker_states() -> List[dict]:
+    """Breakers of every live VYAAS process (for the health endpoint), tagged with their pid"""
+    states = []
+    for pid, breakers in sorted(collect("breakers").items()):
+        for state in breakers:
+            states.append({"pid": pid, **state})
+    return states
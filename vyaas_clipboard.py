@@ -5,11 +5,15 @@ Copy, paste, and manage clipboard content
 
 import logging
 from livekit.agents import function_tool
+from vyaas_executor import offload
+from vyaas_tool_scheduler import uses
 
 logger = logging.getLogger("vyaas_clipboard")
 logger.setLevel(logging.INFO)
 
 @function_tool()
+@uses("clipboard")
+@offload("subprocess")
 async def copy_to_clipboard(text: str) -> str:
     """
     Copy text to clipboard.
@@ -40,6 +44,8 @@ async def copy_to_clipboard(text: str) -> str:
         return f"Error copying to clipboard: {str(e)}"
 
 @function_tool()
+@uses("clipboard")
+@offload("subprocess")
 async def get_clipboard_content() -> str:
     """
     Read current clipboard content.
@@ -74,6 +80,8 @@ async def get_clipboard_content() -> str:
         return f"Error reading clipboard: {str(e)}"
 
 @function_tool()
+@uses("clipboard")
+@offload("subprocess")
 async def clear_clipboard() -> str:
     """
     Clear the clipboard contents.
@@ -100,6 +108,8 @@ async def clear_clipboard() -> str:
         return f"Error clearing clipboard: {str(e)}"
 
 @function_tool()
+@uses("clipboard")
+@offload("subprocess")
 async def clipboard_word_count() -> str:
     """
     Count words in clipboard content.
@@ -0,0 +1,184 @@
+"""
+VYAAS AI - Inbound Data Router
+Dispatches data packets on topic and sender before decoding them.
+
+Shared by the agent and the desktop bridge (standard library only, so the
+bridge stays a single-script install):
+
+    router = DataRouter(ignore_topics={"system_metrics"}, ignore_senders={"vyaas_desktop_bridge"})
+
+    @router.route("metrics_control", rate=5, burst=10)
+    def on_control(message, sender): ...
+
+    @router.route_type("face_event", rate=1, burst=3)      # legacy packets without a routed topic
+    def on_face(message, sender): ...
+
+    room.on("data_received", lambda packet: router.dispatch(
+        packet.data, packet.topic, packet.participant.identity if packet.participant else None))
+
+Order of checks, cheapest first: ignored sender, ignored topic, route lookup,
+the route's sender filter and rate limit. Only then is the payload decoded
+(JSON by default, or passed raw). Packets on a topic without a route are
+decoded once and dispatched on their "type" field to route_type handlers;
+anything else is dropped. Each route has its own token bucket, so a burst on
+one topic cannot starve another. Coroutine handlers are scheduled as tasks.
+"""
+
+import asyncio
+import json
+import logging
+import time
+from collections import Counter
+from typing import Callable, Dict, Iterable, Optional, Set
+
+logger = logging.getLogger("vyaas_data_router")
+logger.setLevel(logging.INFO)
+
+
+class _RateLimit:
+    """Token bucket: `rate` packets per second, bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.burst
+        self._at = time.monotonic()
+
+    def allow(self) -> bool:
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._at) * self.rate)
+        self._at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return True
+        return False
+
+
+class _Route:
+    def __init__(self, name: str, handler: Callable, senders, rate: Optional[float],
+                 burst: Optional[float], decode: str):
+        self.name = name
+        self.handler = handler
+        self.senders = senders
+        self.limit = _RateLimit(rate, burst) if rate else None
+        self.decode = decode
+
+    def accepts(self, sender: Optional[str]) -> bool:
+        if self.senders is None:
+            return True
+        if callable(self.senders):
+            return bool(self.senders(sender))
+        return sender in self.senders
+
+
+class DataRouter:
+    def __init__(self, ignore_topics: Iterable[str] = (), ignore_senders: Iterable[str] = ()):
+        self.ignore_topics: Set[str] = set(ignore_topics)
+        self.ignore_senders: Set[str] = set(ignore_senders)
+        self._topics: Dict[str, _Route] = {}
+        self._types: Dict[str, _Route] = {}
+        self._tasks = set()
+        self.counts: Counter = Counter()  # (route or topic, outcome) -> packets
+
+    # ============== REGISTRATION ==============
+
+    def route(self, topic: str, handler: Optional[Callable] = None, *, senders=None,
+              rate: Optional[float] = None, burst: Optional[float] = None, decode: str = "json"):
+        """
+        Handle packets on `topic`: handler(message, sender_identity).
+        senders: None (anyone), a set of identities, or a predicate on the identity.
+        decode: "json" (dict), "text" (str) or "raw" (bytes).
+        Usable as a decorator when `handler` is omitted.
+        """
+        def register(func):
+            self._topics[topic] = _Route(topic, func, senders, rate, burst, decode)
+            return func
+        return register(handler) if handler is not None else register
+
+    def route_type(self, message_type: str, handler: Optional[Callable] = None, *, senders=None,
+                   rate: Optional[float] = None, burst: Optional[float] = None):
+        """Handle JSON packets with {"type": message_type} that arrive on a topic without a route"""
+        def register(func):
+            self._types[message_type] = _Route(message_type, func, senders, rate, burst, "json")
+            return func
+        return register(handler) if handler is not None else register
+
+    # ============== DISPATCH ==============
+
+    def dispatch(self, data: bytes, topic: Optional[str], sender: Optional[str]) -> bool:
+        """Route one packet; True if a handler ran"""
+        topic = topic or ""
+        if sender in self.ignore_senders:
+            self.counts[(topic, "ignored_sender")] += 1
+            return False
+        if topic in self.ignore_topics:
+            self.counts[(topic, "ignored_topic")] += 1
+            return False
+
+        route = self._topics.get(topic)
+        if route is not None:
+            if not self._admit(route, sender):
+                return False
+            message = self._decode(route, data)
+            return message is not None and self._call(route, message, sender)
+
+        if not self._types:
+            self.counts[(topic, "unrouted")] += 1
+            return False
+        try:
+            message = json.loads(data)
+        except (UnicodeDecodeError, ValueError):
+            self.counts[(topic, "decode_error")] += 1
+            return False
+        route = self._types.get(message.get("type")) if isinstance(message, dict) else None
+        if route is None:
+            self.counts[(topic, "unrouted")] += 1
+            return False
+        return self._admit(route, sender) and self._call(route, message, sender)
+
+    def _admit(self, route: _Route, sender: Optional[str]) -> bool:
+        if not route.accepts(sender):
+            self.counts[(route.name, "rejected_sender")] += 1
+            return False
+        if route.limit is not None and not route.limit.allow():
+            self.counts[(route.name, "rate_limited")] += 1
+            return False
+        return True
+
+    def _decode(self, route: _Route, data: bytes):
+        try:
+            if route.decode == "raw":
+                return data
+            if route.decode == "text":
+                return data.decode("utf-8")
+            return json.loads(data)
+        except (UnicodeDecodeError, ValueError):
+            self.counts[(route.name, "decode_error")] += 1
+            return None
+
+    def _call(self, route: _Route, message, sender: Optional[str]) -> bool:
+        try:
+            result = route.handler(message, sender)
+            if asyncio.iscoroutine(result):
+                task = asyncio.get_running_loop().create_task(result)
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+        except Exception as e:
+            self.counts[(route.name, "handler_error")] += 1
+            logger.error(f"Data handler for {route.name} failed: {e}")
+            return False
+        self.counts[(route.name, "delivered")] += 1
+        return True
+
+    def cancel_tasks(self) -> list:
+        """Cancel handler tasks still running (e.g. at session end); returns them to await"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        return tasks
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        out: Dict[str, Dict[str, int]] = {}
+        for (name, outcome), count in self.counts.items():
+            out.setdefault(name, {})[outcome] = count
+        return out
@@ -0,0 +1,196 @@
+"""
+VYAAS AI - Deadlines & Tool Budgets
+Bounds how long one voice turn can spend inside tools.
+
+Every tool call runs under a deadline: the tool's budget (TOOL_BUDGETS, or
+VYAAS_TOOL_BUDGET_<TOOL_NAME> in seconds), capped by the turn deadline that
+starts when the user stops speaking (TURN_BUDGET) and ends when the agent has
+answered (end_turn). Calls outside a spoken turn (alerts, face events, text
+input) only have their own budget. Tools whose budget exceeds TURN_BUDGET are
+long actions the user asked for (sends, macros) and are not capped by the
+turn. The deadline lives in a
+contextvar, so it follows the call into vyaas_executor worker threads, and
+blocking code clamps its own timeouts to what is left:
+
+    await vyaas_http.get(url, timeout=10)        # vyaas_http clamps for you
+    subprocess.run(cmd, timeout=clamp_timeout(15))
+    deadline_sleep(2)          # raises DeadlineExceeded instead of oversleeping
+
+When a tool runs past its deadline the registry wrapper (with_budget) stops
+waiting and returns a short partial answer to the model, so the turn keeps
+moving. Work already handed to a thread finishes on its own, but its clamped
+timeouts and deadline_sleep() checks make it stop soon after. Since the
+outcome is then unknown, the answer for SIDE_EFFECT_TOOLS tells the model not
+to retry (a retry could send a message or place a call twice).
+"""
+
+import asyncio
+import contextvars
+import functools
+import logging
+import os
+import time
+from typing import Optional
+
+logger = logging.getLogger("vyaas_deadline")
+logger.setLevel(logging.INFO)
+
+# Seconds from end of user speech until tools should have answered
+TURN_BUDGET = float(os.getenv("VYAAS_TURN_BUDGET", "20"))
+
+# Even late in a turn, a tool gets at least this long
+MIN_TOOL_TIME = 2.0
+
+DEFAULT_TOOL_BUDGET = 8.0
+
+# Per-tool budgets in seconds (override with VYAAS_TOOL_BUDGET_<TOOL_NAME>)
+TOOL_BUDGETS = {
+    "get_weather": 6.0,
+    "google_search": 8.0,
+    "search_memory": 5.0,
+    "get_fact": 5.0,
+    "list_all_memories": 5.0,
+    "pair_android_device": 15.0,
+    "connect_android_device": 15.0,
+    "send_android_whatsapp": 15.0,
+    "search_and_send_android_whatsapp": 25.0,
+    "search_android_youtube": 12.0,
+    "start_whatsapp_listener": 20.0,
+    "scan_iot_devices": 10.0,
+    "create_excel_file": 15.0,
+    "create_word_document": 15.0,
+    "create_powerpoint": 15.0,
+    "create_pdf_document": 15.0,
+    # Desktop bridge tools wait for the PC's result (vyaas_local_commands)
+    "send_whatsapp_local": 15.0,
+    "send_whatsapp_contact_local": 20.0,
+    "play_youtube_local": 12.0,
+    "run_desktop_macro": 30.0,
+}
+
+# Tools that send, call or change something: a timed-out call may still have happened
+SIDE_EFFECT_TOOLS = {
+    "send_android_whatsapp",
+    "search_and_send_android_whatsapp",
+    "make_android_call",
+    "reply_to_whatsapp",
+    "remember_fact",
+    "delete_fact",
+    "send_whatsapp_message",
+    "send_whatsapp_to_phone",
+    "send_whatsapp_file",
+    "send_email_gmail",
+    "send_instagram_message",
+    "run_desktop_macro",
+}
+
+
+def has_side_effects(tool_name: str) -> bool:
+    # Desktop bridge commands (*_local) may already be running on the PC
+    return tool_name in SIDE_EFFECT_TOOLS or tool_name.endswith("_local")
+
+
+# Absolute time.monotonic() deadline of the current tool call
+_deadline: contextvars.ContextVar = contextvars.ContextVar("vyaas_deadline", default=None)
+
+# Turn deadline for this worker process (one session per job process); None outside a spoken turn
+_turn_deadline: Optional[float] = None
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised by deadline_sleep()/check_deadline() once the deadline has passed"""
+
+
+def tool_budget(tool_name: str) -> float:
+    override = os.getenv(f"VYAAS_TOOL_BUDGET_{tool_name.upper()}")
+    if override:
+        try:
+            return float(override)
+        except ValueError:
+            logger.error(f"Ignoring invalid budget override for {tool_name}: {override}")
+    return TOOL_BUDGETS.get(tool_name, DEFAULT_TOOL_BUDGET)
+
+
+def start_turn(budget: float = TURN_BUDGET):
+    """Begin a new turn deadline (call when the user stops speaking)"""
+    global _turn_deadline
+    _turn_deadline = time.monotonic() + budget
+
+
+def end_turn():
+    """The agent has answered: later tool calls are not part of the spoken turn"""
+    global _turn_deadline
+    _turn_deadline = None
+
+
+def remaining() -> Optional[float]:
+    """Seconds left before the current deadline, or None outside a deadline"""
+    deadline = _deadline.get()
+    if deadline is None:
+        return None
+    return deadline - time.monotonic()
+
+
+def clamp_timeout(timeout: float, minimum: float = 0.1) -> float:
+    """Shrink a timeout to the time left (never below `minimum`, so calls fail fast instead of erroring)"""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(minimum, min(timeout, left))
+
+
+def check_deadline():
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("deadline exceeded")
+
+
+def deadline_sleep(seconds: float):
+    """time.sleep() that stops at the deadline (for fixed waits between UI steps)"""
+    left = remaining()
+    if left is not None and left < seconds:
+        time.sleep(max(0.0, left))
+        raise DeadlineExceeded("deadline exceeded")
+    time.sleep(seconds)
+
+
+def _call_deadline(budget: float) -> float:
+    now = time.monotonic()
+    deadline = now + budget
+    if _turn_deadline is not None and now > _turn_deadline + TURN_BUDGET:
+        end_turn()  # Long past and never answered (end_turn missed): not this call's turn
+    if _turn_deadline is not None and budget <= TURN_BUDGET:
+        deadline = min(deadline, max(_turn_deadline, now + MIN_TOOL_TIME))
+    outer = _deadline.get()
+    if outer is not None:
+        deadline = min(deadline, outer)
+    return deadline
+
+
+def partial_answer(tool_name: str, budget: float) -> str:
+    if has_side_effects(tool_name):
+        return (f"{tool_name} ko {budget:.0f} second se zyada lag gaye, isliye jawab ka intezaar rok diya. "
+                f"Pata nahi ki kaam hua ya nahi - ho sakta hai abhi bhi chal raha ho. "
+                f"Isko dobara MAT chalao (message/call do baar ja sakta hai); Bhaiya ko batao ki check kar lein.")
+    return (f"{tool_name} ko {budget:.0f} second se zyada lag raha tha, isliye abhi ke liye rok diya. "
+            f"Bhaiya ko batao ki ye kaam abhi poora nahi hua, thodi der baad dobara try kar sakte hain.")
+
+
+def with_budget(tool):
+    """Wrap a function tool so each call runs under its budget and the turn deadline"""
+    name = tool.__name__
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        budget = tool_budget(name)
+        deadline = _call_deadline(budget)
+        token = _deadline.set(deadline)
+        try:
+            return await asyncio.wait_for(tool(*args, **kwargs), max(0.0, deadline - time.monotonic()))
+        except (asyncio.TimeoutError, DeadlineExceeded):
+            logger.warning(f"{name} exceeded its deadline ({budget:.0f}s budget)")
+            return partial_answer(name, budget)
+        finally:
+            _deadline.reset(token)
+
+    return wrapper
@@ -4,8 +4,12 @@ Run this script on your PC to receive and execute commands from the cloud AI age
 
 This lightweight bridge:
 1. Connects to LiveKit as a hidden participant
-2. Listens for 'local_command' data messages from the AI agent
+2. Listens for 'local_command' data messages from the AI agent (vyaas_data_router)
 3. Executes commands locally using subprocess, pyautogui, etc.
+4. Acknowledges each command on receipt and reports its result (topic 'command_result')
+   Commands run one at a time; a 'macro' command runs an ordered list of steps
+   (with waits between them) without other commands interleaving
+5. Answers traced commands with its stage timings (topic 'command_trace')
 
 Usage:
     python vyaas_desktop_bridge.py
@@ -25,6 +29,8 @@ import urllib.parse
 from datetime import datetime
 from dotenv import load_dotenv
 
+from vyaas_data_router import DataRouter
+
 # Optional imports (graceful fallback)
 try:
     import pyautogui
@@ -58,6 +64,33 @@ logger = logging.getLogger("vyaas_bridge")
 # Configuration
 LIVEKIT_URL = os.getenv("LIVEKIT_URL", "wss://vyass-sxwzn7ti.livekit.cloud")
 BRIDGE_IDENTITY = "vyaas_desktop_bridge"
+# Advertised so the agent addresses commands to this participant (vyaas_local_commands)
+ROLE_ATTRIBUTE = "vyaas.role"
+BRIDGE_ROLE = "desktop_bridge"
+COMMAND_TOPIC = "local_commands"
+COMMAND_RESULT_TOPIC = "command_result"
+COMMAND_TRACE_TOPIC = "command_trace"
+# Room traffic not meant for the bridge
+IGNORED_TOPICS = {"system_metrics", "system_alert", "map_events", "metrics_control", "profiler_control", COMMAND_TRACE_TOPIC}
+COMMAND_RATE = 10   # commands per second
+COMMAND_BURST = 20
+MAX_MACRO_STEPS = 20
+MAX_STEP_WAIT = 30.0     # seconds, for "wait" and "wait_for_window"
+WINDOW_WAIT_TIMEOUT = 10.0
+
+
+def _run_checked(args: list):
+    """subprocess.run that raises with the command's own error output"""
+    result = subprocess.run(args, capture_output=True, text=True)
+    if result.returncode != 0:
+        output = (result.stderr or result.stdout or "").strip()
+        raise RuntimeError(f"{args[0]} exited with {result.returncode}" + (f": {output[:200]}" if output else ""))
+
+
+def _open_browser(url: str):
+    import webbrowser
+    if not webbrowser.open(url):
+        raise RuntimeError("No browser available")
 
 
 class DesktopBridge:
@@ -66,6 +99,14 @@ class DesktopBridge:
     def __init__(self):
         self.room = rtc.Room()
         self.running = False
+
+        # Commands on COMMAND_TOPIC; older agents sent them without a topic
+        self.router = DataRouter(ignore_topics=IGNORED_TOPICS, ignore_senders={BRIDGE_IDENTITY})
+        self.router.route(COMMAND_TOPIC, self.handle_command, rate=COMMAND_RATE, burst=COMMAND_BURST)
+        self.router.route_type("local_command", self.handle_command, rate=COMMAND_RATE, burst=COMMAND_BURST)
+
+        # Held while a command (or a whole macro) drives the desktop
+        self.command_lock = asyncio.Lock()
         
         # App mappings for Windows
         self.app_mappings = {
@@ -116,87 +157,183 @@ class DesktopBridge:
             await self.room.connect(LIVEKIT_URL, token)
             logger.info(f"[OK] Connected to LiveKit as {BRIDGE_IDENTITY}")
             self.running = True
+
+            try:
+                await self.room.local_participant.set_attributes({ROLE_ATTRIBUTE: BRIDGE_ROLE})
+            except Exception as e:
+                # Still reachable through BRIDGE_IDENTITY
+                logger.warning(f"Could not set bridge role attribute: {e}")
             
-            # Register data handler
+            # Register data handler: only command packets are decoded, the rest
+            # of the room's traffic (metrics, map events, ...) is dropped on topic
             @self.room.on("data_received")
-            def on_data(data: rtc.DataPacket):
-                asyncio.create_task(self.handle_data(data))
+            def on_data(packet: rtc.DataPacket):
+                sender = packet.participant.identity if packet.participant else None
+                self.router.dispatch(packet.data, packet.topic, sender)
             
             return True
         except Exception as e:
             logger.error(f"[ERR] Failed to connect: {e}")
             return False
     
-    async def handle_data(self, packet: rtc.DataPacket):
-        """Handle incoming data messages"""
+    async def handle_command(self, data: dict, sender: str):
+        """Handle a local_command message (routed by self.router)"""
+        received = time.perf_counter()
         try:
-            payload = packet.data.decode('utf-8')
-            data = json.loads(payload)
+            command = data.get("command")
+            params = data.get("params", {})
+            command_id = data.get("id")  # Older agents send none and expect no replies
             
-            if data.get("type") == "local_command":
-                command = data.get("command")
-                params = data.get("params", {})
-                
-                logger.info(f"[IN] Received command: {command}")
-                await self.execute_command(command, params)
+            logger.info(f"[IN] Received command: {command}")
+            if command_id:
+                await self.send_reply(sender, {"type": "command_ack", "id": command_id})
+            error = None
+            async with self.command_lock:
+                started = time.perf_counter()
+                try:
+                    await self.execute_command(command, params)
+                except Exception as e:
+                    error = str(e) or type(e).__name__
+                    logger.error(f"Error executing {command}: {error}")
+                finished = time.perf_counter()
+            ok = error is None
+            if command_id:
+                await self.send_reply(sender, {"type": "command_result", "id": command_id, "ok": ok, "error": error})
+
+            if data.get("trace"):
+                await self.send_trace(sender, data["trace"], ok, [
+                    ("bridge.dispatch", started - received, "ok"),
+                    ("bridge.execute", finished - started, "ok" if ok else "error"),
+                ])
                 
         except Exception as e:
             logger.error(f"Error handling data: {e}")
-    
-    async def execute_command(self, command: str, params: dict):
-        """Execute a local command"""
+
+    async def send_reply(self, sender: str, reply: dict):
+        """Ack or result of a command, to the agent that sent it"""
         try:
-            if command == "open_app":
-                await self.open_app(params.get("app", ""))
-            
-            elif command == "open_maps":
-                await self.open_maps(params.get("query", ""))
-            
-            elif command == "open_notes":
-                await self.open_notes(params.get("content", ""))
-            
-            elif command == "send_whatsapp":
-                await self.send_whatsapp(params.get("phone", ""), params.get("message", ""))
-            
-            elif command == "send_whatsapp_contact":
-                await self.send_whatsapp_contact(params.get("contact", ""), params.get("message", ""))
-            
-            elif command == "type_text":
-                await self.type_text(params.get("text", ""))
-            
-            elif command == "press_key":
-                await self.press_key(params.get("key", ""))
-            
-            elif command == "open_url":
-                await self.open_url(params.get("url", ""))
-            
-            elif command == "play_youtube":
-                await self.play_youtube(params.get("query", ""))
-            
-            elif command == "screenshot":
-                await self.take_screenshot()
-            
-            elif command == "set_volume":
-                await self.set_volume(params.get("level", 50))
-            
-            elif command == "lock_pc":
-                await self.lock_pc()
-            
-            elif command == "shutdown":
-                await self.shutdown(params.get("delay", 60))
-            
-            elif command == "cancel_shutdown":
-                await self.cancel_shutdown()
-            
-            else:
-                logger.warning(f"Unknown command: {command}")
-                
+            await self.room.local_participant.publish_data(
+                json.dumps(reply),
+                topic=COMMAND_RESULT_TOPIC,
+                destination_identities=[sender] if sender else [],
+            )
+        except Exception as e:
+            logger.error(f"Could not send {reply['type']}: {e}")
+
+    async def send_trace(self, sender: str, trace: dict, ok: bool, stages: list):
+        """Report stage durations of a traced command back to the agent that sent it"""
+        reply = {
+            "type": "command_trace",
+            "trace_id": trace.get("trace_id"),
+            "span_id": trace.get("span_id"),
+            "ok": ok,
+            "spans": [{"name": name, "ms": round(seconds * 1000, 3), "status": status}
+                      for name, seconds, status in stages],
+        }
+        destinations = [sender] if sender else []
+        try:
+            await self.room.local_participant.publish_data(
+                json.dumps(reply),
+                topic=COMMAND_TRACE_TOPIC,
+                destination_identities=destinations,
+            )
         except Exception as e:
-            logger.error(f"Error executing {command}: {e}")
+            logger.error(f"Could not send trace reply: {e}")
+    
+    async def execute_command(self, command: str, params: dict):
+        """Execute a local command. Raises if it failed or is unknown."""
+        if command == "open_app":
+            await asyncio.to_thread(self.open_app, params.get("app", ""))
+        
+        elif command == "open_maps":
+            await asyncio.to_thread(self.open_maps, params.get("query", ""))
+        
+        elif command == "open_notes":
+            await asyncio.to_thread(self.open_notes, params.get("content", ""))
+        
+        elif command == "send_whatsapp":
+            await asyncio.to_thread(self.send_whatsapp, params.get("phone", ""), params.get("message", ""))
+        
+        elif command == "send_whatsapp_contact":
+            await asyncio.to_thread(self.send_whatsapp_contact, params.get("contact", ""), params.get("message", ""))
+        
+        elif command == "type_text":
+            await asyncio.to_thread(self.type_text, params.get("text", ""))
+        
+        elif command == "press_key":
+            await asyncio.to_thread(self.press_key, params.get("key", ""))
+        
+        elif command == "open_url":
+            await asyncio.to_thread(self.open_url, params.get("url", ""))
+        
+        elif command == "play_youtube":
+            await asyncio.to_thread(self.play_youtube, params.get("query", ""))
+        
+        elif command == "screenshot":
+            await asyncio.to_thread(self.take_screenshot)
+        
+        elif command == "set_volume":
+            await asyncio.to_thread(self.set_volume, params.get("level", 50))
+        
+        elif command == "lock_pc":
+            await asyncio.to_thread(self.lock_pc)
+        
+        elif command == "shutdown":
+            await asyncio.to_thread(self.shutdown, params.get("delay", 60))
+        
+        elif command == "cancel_shutdown":
+            await asyncio.to_thread(self.cancel_shutdown)
+        
+        elif command == "macro":
+            await self.run_macro(params.get("steps", []))
+        
+        else:
+            raise ValueError(f"Unknown command: {command}")
+    
+    # ============== MACROS ==============
+    
+    async def run_macro(self, steps: list):
+        """Run steps in order (caller holds command_lock); stops at the first failing step"""
+        if not isinstance(steps, list) or not steps:
+            raise ValueError("Macro has no steps")
+        if len(steps) > MAX_MACRO_STEPS:
+            raise ValueError(f"Macro has {len(steps)} steps, max is {MAX_MACRO_STEPS}")
+        
+        logger.info(f"[MAC] Running macro with {len(steps)} steps")
+        for number, step in enumerate(steps, 1):
+            command = step.get("command") if isinstance(step, dict) else None
+            try:
+                if not command or command == "macro":
+                    raise ValueError(f"invalid step: {step}")
+                await self.execute_command(command, step.get("params") or {})
+                if step.get("wait_for_window"):
+                    await self.wait_for_window(step["wait_for_window"],
+                                               float(step.get("timeout", WINDOW_WAIT_TIMEOUT)))
+                if step.get("wait"):
+                    await asyncio.sleep(min(float(step["wait"]), MAX_STEP_WAIT))
+            except Exception as e:
+                raise RuntimeError(f"Step {number}/{len(steps)} ({command}) failed: {e}") from e
+        logger.info("[OK] Macro finished")
+    
+    async def wait_for_window(self, title: str, timeout: float):
+        """Wait until the foreground window's title contains `title`"""
+        get_title = getattr(pyautogui, "getActiveWindowTitle", None) if pyautogui else None
+        if get_title is None:
+            raise RuntimeError("pyautogui (with pygetwindow) required for window waits")
+        
+        deadline = time.monotonic() + min(timeout, MAX_STEP_WAIT)
+        while True:
+            if title.lower() in (get_title() or "").lower():
+                return
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"window '{title}' did not appear within {timeout:g}s")
+            await asyncio.sleep(0.2)
     
     # ============== COMMAND IMPLEMENTATIONS ==============
+    # Blocking (subprocess, pyautogui, fixed UI waits): execute_command runs them in a
+    # worker thread, so the event loop keeps sending acks and answering the room
     
-    async def open_app(self, app_name: str):
+    def open_app(self, app_name: str):
         """Open an application by name"""
         app_lower = app_name.lower().strip()
         command = self.app_mappings.get(app_lower, app_name)
@@ -212,20 +349,19 @@ class DesktopBridge:
             logger.info(f"[OK] Opened {app_name}")
         except Exception as e:
             logger.error(f"Failed to open {app_name}: {e}")
+            raise
     
-    async def open_maps(self, query: str = ""):
+    def open_maps(self, query: str = ""):
         """Open Google Maps with optional search"""
-        import webbrowser
-        
         if query:
             url = f"https://www.google.com/maps/search/{urllib.parse.quote(query)}"
         else:
             url = "https://www.google.com/maps"
         
         logger.info(f"[MAP] Opening Maps: {query if query else 'home'}")
-        webbrowser.open(url)
+        _open_browser(url)
     
-    async def open_notes(self, content: str = ""):
+    def open_notes(self, content: str = ""):
         """Open Notepad and optionally write content"""
         subprocess.Popen("notepad", shell=True)
         
@@ -237,13 +373,12 @@ class DesktopBridge:
         else:
             logger.info("[NOTE] Opened Notepad")
     
-    async def send_whatsapp(self, phone: str, message: str):
+    def send_whatsapp(self, phone: str, message: str):
         """Send WhatsApp message via Desktop app"""
         logger.info(f"[WA] Sending WhatsApp to {phone}")
         
         if not pyautogui:
-            logger.error("pyautogui required for WhatsApp automation")
-            return
+            raise RuntimeError("pyautogui required for WhatsApp automation")
         
         # Use WhatsApp Desktop URI scheme
         encoded_message = urllib.parse.quote(message)
@@ -261,13 +396,12 @@ class DesktopBridge:
         
         logger.info(f"[ok] WhatsApp message sent to {phone}")
     
-    async def send_whatsapp_contact(self, contact: str, message: str):
+    def send_whatsapp_contact(self, contact: str, message: str):
         """Send WhatsApp message by searching contact name"""
         logger.info(f"[WA] Sending WhatsApp to contact: {contact}")
         
         if not pyautogui or not pyperclip:
-            logger.error("pyautogui and pyperclip required")
-            return
+            raise RuntimeError("pyautogui and pyperclip required")
         
         # Open WhatsApp
         subprocess.Popen('start whatsapp:', shell=True)
@@ -304,11 +438,10 @@ class DesktopBridge:
         
         logger.info(f"[OK] WhatsApp sent to {contact}")
     
-    async def type_text(self, text: str):
+    def type_text(self, text: str):
         """Type text using keyboard automation"""
         if not pyautogui:
-            logger.error("pyautogui required for typing")
-            return
+            raise RuntimeError("pyautogui required for typing")
         
         logger.info(f"[KBD] Typing text...")
         
@@ -322,11 +455,10 @@ class DesktopBridge:
         
         logger.info("[OK] Text typed")
     
-    async def press_key(self, key: str):
+    def press_key(self, key: str):
         """Press a keyboard key or combination"""
         if not pyautogui:
-            logger.error("pyautogui required")
-            return
+            raise RuntimeError("pyautogui required")
         
         logger.info(f"[KBD] Pressing: {key}")
         
@@ -338,19 +470,16 @@ class DesktopBridge:
         
         logger.info(f"[OK] Pressed {key}")
     
-    async def open_url(self, url: str):
+    def open_url(self, url: str):
         """Open URL in default browser"""
-        import webbrowser
         logger.info(f"[WEB] Opening URL: {url}")
-        webbrowser.open(url)
+        _open_browser(url)
     
-    async def play_youtube(self, query: str):
+    def play_youtube(self, query: str):
         """Search and play YouTube video"""
-        import webbrowser
-        
         url = f"https://www.youtube.com/results?search_query={urllib.parse.quote(query)}"
         logger.info(f"[YT] Playing YouTube: {query}")
-        webbrowser.open(url)
+        _open_browser(url)
         
         # Click on first video after page loads
         if pyautogui:
@@ -360,7 +489,7 @@ class DesktopBridge:
             click_y = int(screen_height * 0.45)
             pyautogui.click(click_x, click_y)
     
-    async def take_screenshot(self):
+    def take_screenshot(self):
         """Take a screenshot"""
         pictures = os.path.expanduser("~/Pictures")
         filename = f"screenshot_{datetime.now().strftime('%Y%m%d_%H%M%S')}.png"
@@ -377,11 +506,11 @@ class DesktopBridge:
         $graphics.CopyFromScreen($screen.Location, [System.Drawing.Point]::Empty, $screen.Size)
         $bitmap.Save("{filepath}")
         '''
-        subprocess.run(["powershell", "-Command", ps_command], capture_output=True)
+        _run_checked(["powershell", "-Command", ps_command])
         
         logger.info(f"[OK] Screenshot saved: {filepath}")
     
-    async def set_volume(self, level: int):
+    def set_volume(self, level: int):
         """Set system volume"""
         level = max(0, min(100, level))
         logger.info(f"[VOL] Setting volume to {level}%")
@@ -391,26 +520,26 @@ class DesktopBridge:
         1..50 | ForEach-Object {{ $obj.SendKeys([char]174) }}
         1..{level // 2} | ForEach-Object {{ $obj.SendKeys([char]175) }}
         '''
-        subprocess.run(["powershell", "-Command", ps_command], capture_output=True)
+        _run_checked(["powershell", "-Command", ps_command])
         
         logger.info(f"[OK] Volume set to ~{level}%")
     
-    async def lock_pc(self):
+    def lock_pc(self):
         """Lock the computer"""
         logger.info("[LCK] Locking PC...")
-        subprocess.run(["rundll32.exe", "user32.dll,LockWorkStation"])
+        _run_checked(["rundll32.exe", "user32.dll,LockWorkStation"])
         logger.info("[OK] PC locked")
     
-    async def shutdown(self, delay: int):
+    def shutdown(self, delay: int):
         """Schedule PC shutdown"""
         logger.info(f"[PWR] Scheduling shutdown in {delay}s...")
-        subprocess.run(["shutdown", "/s", "/t", str(delay)])
+        _run_checked(["shutdown", "/s", "/t", str(delay)])
         logger.info(f"[OK] Shutdown scheduled")
     
-    async def cancel_shutdown(self):
+    def cancel_shutdown(self):
         """Cancel scheduled shutdown"""
         logger.info("[CAN] Cancelling shutdown...")
-        subprocess.run(["shutdown", "/a"])
+        _run_checked(["shutdown", "/a"])
         logger.info("[OK] Shutdown cancelled")
     
     async def run(self, token: str):
@@ -455,6 +584,7 @@ async def get_bridge_token():
             room=room_name,
             can_subscribe=True,
             can_publish_data=True,
+            can_update_own_metadata=True,  # vyaas.role attribute
         ))
     
     return token.to_jwt()
@@ -0,0 +1,201 @@
+"""
+VYAAS AI - Blocking Work Executor
+Bounded thread pools for the blocking parts of tools, one pool per resource class.
+
+Most tools are `async def` but do synchronous subprocess/HTTP/file work. Run
+on the event loop, one slow ADB call freezes speech for the whole session.
+Tools opt in declaratively:
+
+    @function_tool()
+    @offload("subprocess")
+    async def open_android_app(app_name: str) -> str:
+        ...  # body runs on the subprocess pool, not the event loop
+
+or hand a single blocking call to a pool:
+
+    data = await run_blocking("network", fetch_weather, city)
+
+Pools are sized per resource so a burst of one kind of work (e.g. ADB) cannot
+starve another (e.g. HTTP). contextvars are copied into the worker. Queue depth
+and wait time per pool are available from get_executor_stats().
+
+Note: a cancelled caller does not interrupt the worker; the blocking call runs
+to completion (subprocess/HTTP timeouts still apply).
+"""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("vyaas_executor")
+logger.setLevel(logging.INFO)
+
+# Resource class -> max worker threads
+POOL_SIZES = {
+    "network": 8,       # HTTP calls, mostly waiting on sockets
+    "subprocess": 4,    # adb, powershell, am/input on Termux
+    "disk": 4,          # File creation (openpyxl, docx, pptx, reportlab)
+    "cpu": min(4, os.cpu_count() or 1),
+}
+
+# Set on pool worker threads, so nested offloaded calls run inline instead of
+# waiting on a second worker (which could deadlock a saturated pool)
+_worker = threading.local()
+
+
+class ResourcePool:
+    """A lazily created ThreadPoolExecutor with queue/wait accounting"""
+
+    def __init__(self, name: str, max_workers: int):
+        self.name = name
+        self.max_workers = max_workers
+        self._executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        self.submitted = 0
+        self.started = 0
+        self.completed = 0
+        self.failed = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._recent_waits: deque = deque(maxlen=256)
+
+    @property
+    def queue_depth(self) -> int:
+        """Calls waiting for a free worker"""
+        return self.submitted - self.started
+
+    @property
+    def active(self) -> int:
+        """Calls currently running"""
+        return self.started - self.completed
+
+    def _get_executor(self) -> concurrent.futures.ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.max_workers,
+                        thread_name_prefix=f"vyaas-{self.name}",
+                    )
+        return self._executor
+
+    def submit(self, func, *args, **kwargs) -> concurrent.futures.Future:
+        submitted_at = time.monotonic()
+        context = contextvars.copy_context()
+
+        def task():
+            wait = time.monotonic() - submitted_at
+            with self._lock:
+                self.started += 1
+                self.wait_total += wait
+                self.wait_max = max(self.wait_max, wait)
+                self._recent_waits.append(wait)
+            if wait > 1.0:
+                logger.warning(f"{self.name} pool: call waited {wait:.1f}s for a worker")
+
+            _worker.pool = self.name
+            try:
+                return context.run(func, *args, **kwargs)
+            except BaseException:
+                with self._lock:
+                    self.failed += 1
+                raise
+            finally:
+                _worker.pool = None
+                with self._lock:
+                    self.completed += 1
+
+        with self._lock:
+            self.submitted += 1
+        return self._get_executor().submit(task)
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._recent_waits)
+            return {
+                "pool": self.name,
+                "max_workers": self.max_workers,
+                "active": self.active,
+                "queue_depth": self.queue_depth,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "wait_avg_ms": (self.wait_total / self.started * 1000) if self.started else 0.0,
+                "wait_p95_ms": (waits[int(0.95 * (len(waits) - 1))] * 1000) if waits else 0.0,
+                "wait_max_ms": self.wait_max * 1000,
+            }
+
+
+_pools: Dict[str, ResourcePool] = {name: ResourcePool(name, size) for name, size in POOL_SIZES.items()}
+
+
+def get_pool(resource: str) -> ResourcePool:
+    pool = _pools.get(resource)
+    if pool is None:
+        raise ValueError(f"Unknown resource class '{resource}' (expected one of {', '.join(_pools)})")
+    return pool
+
+
+def in_worker() -> bool:
+    """True on a pool worker thread"""
+    return getattr(_worker, "pool", None) is not None
+
+
+async def run_blocking(resource: str, func, *args, **kwargs):
+    """Run a blocking callable on the resource's pool and await its result"""
+    pool = get_pool(resource)
+    if in_worker():
+        return func(*args, **kwargs)
+    return await asyncio.wrap_future(pool.submit(func, *args, **kwargs))
+
+
+def _run_async(func, args: tuple, kwargs: dict):
+    # The coroutine is created on the worker: one that is never started (caller
+    # cancelled while queued) would otherwise be left unawaited on the caller's loop
+    return asyncio.run(func(*args, **kwargs))
+
+
+def offload(resource: str):
+    """
+    Run an async tool's (blocking) body on the resource's pool.
+    Place it under @function_tool(); the wrapper keeps the tool's signature and docstring.
+    The body gets its own short-lived event loop on the worker thread, so it may
+    await other tools but must not touch room/session objects of the main loop.
+    """
+    get_pool(resource)  # Fail at import time on a typo
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if in_worker():
+                # A tool awaiting another tool: already off the main loop
+                return await func(*args, **kwargs)
+            return await run_blocking(resource, _run_async, func, args, kwargs)
+
+        wrapper.__vyaas_resource__ = resource
+        return wrapper
+
+    return decorator
+
+
+def get_executor_stats() -> List[dict]:
+    return [pool.stats() for pool in _pools.values()]
+
+
+def format_executor_stats() -> str:
+    lines = ["Executor pools:"]
+    for s in get_executor_stats():
+        lines.append(
+            f"  {s['pool']:<11} {s['active']}/{s['max_workers']} busy, {s['queue_depth']} queued, "
+            f"{s['completed']} done ({s['failed']} failed), wait avg {s['wait_avg_ms']:.1f} ms "
+            f"p95 {s['wait_p95_ms']:.1f} ms max {s['wait_max_ms']:.1f} ms"
+        )
+    return "\n".join(lines)
@@ -7,6 +7,8 @@ import os
 import logging
 from datetime import datetime
 from livekit.agents import function_tool
+from vyaas_executor import offload
+from vyaas_tool_scheduler import uses
 
 logger = logging.getLogger("vyaas_file_tools")
 logger.setLevel(logging.INFO)
@@ -36,6 +38,8 @@ def get_safe_filename(name: str, extension: str) -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_html_file(filename: str, content: str) -> str:
     """
     Create an HTML file and save it to the Desktop.
@@ -72,6 +76,8 @@ async def create_html_file(filename: str, content: str) -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_text_file(filename: str, content: str) -> str:
     """
     Create a text file (.txt) and save it to the Desktop.
@@ -98,6 +104,8 @@ async def create_text_file(filename: str, content: str) -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_excel_file(filename: str, data: str, headers: str = "") -> str:
     """
     Create an Excel (.xlsx) file and save it to the Desktop.
@@ -172,6 +180,8 @@ async def create_excel_file(filename: str, data: str, headers: str = "") -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_word_document(filename: str, title: str, content: str) -> str:
     """
     Create a Word document (.docx) and save it to the Desktop.
@@ -227,6 +237,8 @@ async def create_word_document(filename: str, title: str, content: str) -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_powerpoint(filename: str, title: str, slides: str) -> str:
     """
     Create a PowerPoint presentation (.pptx) and save it to the Desktop.
@@ -295,6 +307,8 @@ async def create_powerpoint(filename: str, title: str, slides: str) -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_pdf_document(filename: str, title: str, content: str) -> str:
     """
     Create a PDF document and save it to the Desktop.
@@ -339,6 +353,8 @@ async def create_pdf_document(filename: str, title: str, content: str) -> str:
 
 
 @function_tool()
+@uses("file:{filename}")
+@offload("disk")
 async def create_python_file(filename: str, code: str) -> str:
     """
     Create a Python (.py) file and save it to the Desktop.
@@ -365,6 +381,7 @@ async def create_python_file(filename: str, code: str) -> str:
 
 
 @function_tool()
+@offload("disk")
 async def list_desktop_files() -> str:
     """
     List all files on the user's Desktop.
@@ -1,21 +1,30 @@
 import os
-import requests
 import logging
 from dotenv import load_dotenv
 from livekit.agents import function_tool  # ✅ Correct decorator
+import vyaas_http
+from vyaas_tool_scheduler import uses
+from vyaas_circuit_breaker import get_breaker, CircuitOpenError
+from vyaas_cache import cached
 
 load_dotenv()
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-def detect_city_by_ip() -> str:
+@cached(ttl=6 * 3600)
+async def _lookup_ip_info() -> dict:
+    # Raises on failure, so the Kaushambi fallback below is never cached
+    response = await get_breaker("ipinfo").acall(vyaas_http.get, "https://ipinfo.io", timeout=5)
+    return response.json()
+
+
+async def detect_city_by_ip() -> str:
     """
     Detect city using IP. Fallback to Kaushambi if detection fails or gives Kanpur.
     """
     try:
-        response = requests.get("https://ipinfo.io", timeout=5)
-        data = response.json()
+        data = await _lookup_ip_info()
         city = data.get("city", "Kaushambi")
         if not city or city.lower() == "kanpur":
             city = "Kaushambi"
@@ -24,15 +33,18 @@ def detect_city_by_ip() -> str:
         return "Kaushambi"
 
 
-@function_tool()
-async def get_weather(city: str = "") -> str:
-    """
-    Gives current weather information for a given city.
+def is_weather_report(result: str) -> bool:
+    """True for a real report; fetch_weather returns error strings (no key, HTTP error, circuit open) otherwise"""
+    return result.startswith("Weather in")
 
-    Use this tool when the user asks about weather, rain, temperature, humidity, or wind.
-    If no city is given, it defaults to Kaushambi.
-    """
 
+# Only real reports are cached; error strings are recomputed next time
+@cached(ttl=600, stale_ttl=1800, key=lambda p: p["city"].strip().lower(),
+        cache_if=is_weather_report)
+async def fetch_weather(city: str = "") -> str:
+    """
+    OpenWeather lookup shared by the `get_weather` tool and the prompt builder.
+    """
     api_key = os.getenv("OPENWEATHER_API_KEY")
 
     if not api_key:
@@ -41,7 +53,7 @@ async def get_weather(city: str = "") -> str:
 
     # ✅ Force city = Kaushambi by default
     if not city:
-        city = detect_city_by_ip()
+        city = await detect_city_by_ip()
 
     logger.info(f"City के लिए weather fetch किया जा रहा है: {city}")
     url = "https://api.openweathermap.org/data/2.5/weather"
@@ -52,7 +64,11 @@ async def get_weather(city: str = "") -> str:
     }
 
     try:
-        response = requests.get(url, params=params)
+        # Idempotent read: hedge a slow first attempt; 5xx responses count against the circuit
+        response = await get_breaker("openweather").acall_hedged(
+            vyaas_http.get, url, params=params, timeout=10,
+            hedge_after=1.5, failure_if=lambda r: r.status_code >= 500,
+        )
         if response.status_code != 200:
             logger.error(f"OpenWeather API में error आया: {response.status_code} - {response.text}")
             return f"Error: {city} के लिए weather fetch नहीं कर पाए। कृपया city name चेक करें।"
@@ -72,6 +88,21 @@ async def get_weather(city: str = "") -> str:
         logger.debug(f"Weather result:\n{result}")
         return result
 
+    except CircuitOpenError as e:
+        logger.warning(f"Weather skipped: {e}")
+        return "Weather service अभी जवाब नहीं दे रही है, थोड़ी देर बाद फिर try करें।"
     except Exception as e:
         logger.exception(f"Weather fetch करते समय exception आया: {e}")
         return "Weather fetch करते समय एक error आया"
+
+
+@function_tool()
+@uses("network")
+async def get_weather(city: str = "") -> str:
+    """
+    Gives current weather information for a given city.
+
+    Use this tool when the user asks about weather, rain, temperature, humidity, or wind.
+    If no city is given, it defaults to Kaushambi.
+    """
+    return await fetch_weather(city)
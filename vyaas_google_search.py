@@ -1,6 +1,10 @@
 
 import logging
 from datetime import datetime
+from livekit.agents import function_tool
+from vyaas_executor import offload
+from vyaas_cache import cached
+from vyaas_tool_scheduler import uses
 try:
     from googlesearch import search
 except ImportError:
@@ -14,6 +18,11 @@ def get_current_datetime():
     now = datetime.now()
     return now.strftime("%A, %B %d, %Y %I:%M %p")
 
+@function_tool()
+@uses("network")
+@cached(ttl=300, stale_ttl=900, key=lambda p: " ".join(p["query"].lower().split()),
+        cache_if=lambda result: result.startswith("Title:"))
+@offload("network")
 async def google_search(query: str):
     """
     Performs a Google search for the given query.
@@ -0,0 +1,240 @@
+"""
+VYAAS AI - HTTP Client
+One process-wide aiohttp client for every outbound HTTP call.
+
+The ClientSession lives on a dedicated IO thread with its own event loop, so
+it can be shared by the agent's job loop, executor worker threads (which run
+tool bodies on short-lived loops) and plain threads alike. Connections are
+kept alive and pooled per host (LIMIT_PER_HOST), so repeated weather lookups
+or WhatsApp service polls skip TCP/TLS setup. aiohttp speaks HTTP/1.1 only;
+keep-alive pooling is what we get instead of HTTP/2 multiplexing.
+
+    response = await get(url, params={...}, timeout=10)      # from any event loop
+    response = request_sync("GET", url, timeout=2)           # legacy sync callers
+    response.status_code, response.json(), response.text
+
+Timeouts are clamped to the caller's deadline (vyaas_deadline). Failures
+raise HttpConnectionError / HttpTimeoutError. Per-host timing, error counts
+and connection reuse are reported by get_http_stats().
+"""
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+from urllib.parse import urlsplit
+
+from vyaas_deadline import clamp_timeout
+
+logger = logging.getLogger("vyaas_http")
+logger.setLevel(logging.INFO)
+
+LIMIT = 64             # Open connections in total
+LIMIT_PER_HOST = 8     # Open connections per host
+KEEPALIVE = 60.0       # Seconds an idle connection stays in the pool
+DEFAULT_TIMEOUT = 10.0
+
+
+class HttpError(IOError):
+    """Base class for transport-level HTTP failures"""
+
+
+class HttpConnectionError(HttpError, ConnectionError):
+    """Could not connect / connection dropped"""
+
+
+class HttpTimeoutError(HttpError, TimeoutError):
+    """No complete response within the timeout"""
+
+
+class HttpResponse:
+    """Fully read response (body is read on the IO loop before returning)"""
+
+    def __init__(self, url: str, status: int, reason: str, headers: dict, body: bytes, elapsed: float):
+        self.url = url
+        self.status_code = status
+        self.reason = reason
+        self.headers = headers
+        self.content = body
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+    def __repr__(self):
+        return f"<HttpResponse {self.status_code} {self.url}>"
+
+
+class _HostStats:
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+        self.total_seconds = 0.0
+        self.recent: deque = deque(maxlen=256)
+
+
+class HttpClient:
+    """Owns the IO thread, its loop and the shared ClientSession"""
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._session = None
+        self._ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._start_error: Optional[BaseException] = None
+        self._stats: Dict[str, _HostStats] = {}
+        self._stats_lock = threading.Lock()
+
+    # ============== IO THREAD ==============
+
+    def _ensure_started(self):
+        if not self._ready.is_set():
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="vyaas-http", daemon=True)
+                    self._thread.start()
+            self._ready.wait()
+        if self._start_error is not None:
+            raise HttpConnectionError(f"HTTP client failed to start: {self._start_error}") from self._start_error
+
+    def _run(self):
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._loop = loop
+        try:
+            loop.run_until_complete(self._open_session())
+        except Exception as e:
+            # e.g. aiohttp missing; every request fails fast with HttpConnectionError instead of hanging
+            self._start_error = e
+            logger.error(f"HTTP client failed to start: {e}")
+            loop.close()
+            return
+        finally:
+            self._ready.set()
+        loop.run_forever()
+
+    async def _open_session(self):
+        import aiohttp
+
+        trace = aiohttp.TraceConfig()
+        trace.on_connection_create_end.append(self._on_new_connection)
+        trace.on_connection_reuseconn.append(self._on_reused_connection)
+        connector = aiohttp.TCPConnector(
+            limit=LIMIT,
+            limit_per_host=LIMIT_PER_HOST,
+            keepalive_timeout=KEEPALIVE,
+            ttl_dns_cache=300,
+        )
+        self._session = aiohttp.ClientSession(connector=connector, trace_configs=[trace])
+
+    def _host_stats(self, host: str) -> _HostStats:
+        with self._stats_lock:
+            stats = self._stats.get(host)
+            if stats is None:
+                stats = self._stats[host] = _HostStats()
+            return stats
+
+    async def _on_new_connection(self, session, ctx, params):
+        self._host_stats(ctx.trace_request_ctx["host"]).new_connections += 1
+
+    async def _on_reused_connection(self, session, ctx, params):
+        self._host_stats(ctx.trace_request_ctx["host"]).reused_connections += 1
+
+    # ============== REQUESTS ==============
+
+    async def _request(self, method: str, url: str, timeout: float, **kwargs) -> HttpResponse:
+        """Runs on the IO loop"""
+        import aiohttp
+
+        host = urlsplit(url).netloc
+        stats = self._host_stats(host)
+        start = time.perf_counter()
+        try:
+            async with self._session.request(
+                method, url,
+                timeout=aiohttp.ClientTimeout(total=timeout),
+                trace_request_ctx={"host": host},
+                **kwargs,
+            ) as resp:
+                body = await resp.read()
+                response = HttpResponse(str(resp.url), resp.status, resp.reason or "",
+                                        dict(resp.headers), body, time.perf_counter() - start)
+        except asyncio.TimeoutError as e:
+            stats.errors += 1
+            raise HttpTimeoutError(f"{method} {host} timed out after {timeout:.1f}s") from e
+        except aiohttp.ClientError as e:
+            stats.errors += 1
+            raise HttpConnectionError(f"{method} {host} failed: {e}") from e
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._stats_lock:
+                stats.requests += 1
+                stats.total_seconds += elapsed
+                stats.recent.append(elapsed)
+        return response
+
+    def submit(self, method: str, url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs):
+        """Schedule a request on the IO loop; returns a concurrent.futures.Future"""
+        self._ensure_started()
+        # Clamp here, in the caller's context, where the deadline contextvar is set
+        timeout = clamp_timeout(timeout)
+        return asyncio.run_coroutine_threadsafe(self._request(method, url, timeout, **kwargs), self._loop)
+
+    def stats(self) -> List[dict]:
+        rows = []
+        with self._stats_lock:
+            for host, s in sorted(self._stats.items()):
+                recent = sorted(s.recent)
+                rows.append({
+                    "host": host,
+                    "requests": s.requests,
+                    "errors": s.errors,
+                    "new_connections": s.new_connections,
+                    "reused_connections": s.reused_connections,
+                    "avg_ms": (s.total_seconds / s.requests * 1000) if s.requests else 0.0,
+                    "p95_ms": (recent[int(0.95 * (len(recent) - 1))] * 1000) if recent else 0.0,
+                })
+        return rows
+
+
+# Global client (one IO thread per process)
+_client = HttpClient()
+
+
+async def request(method: str, url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> HttpResponse:
+    """
+    Async request from any event loop. kwargs go to aiohttp (params, json, data, headers).
+    """
+    return await asyncio.wrap_future(_client.submit(method, url, timeout, **kwargs))
+
+
+async def get(url: str, **kwargs) -> HttpResponse:
+    return await request("GET", url, **kwargs)
+
+
+async def post(url: str, **kwargs) -> HttpResponse:
+    return await request("POST", url, **kwargs)
+
+
+def request_sync(method: str, url: str, timeout: float = DEFAULT_TIMEOUT, **kwargs) -> HttpResponse:
+    """Blocking shim for sync callers (threads only: never call it on an event loop)"""
+    future = _client.submit(method, url, timeout, **kwargs)
+    return future.result()
+
+
+def get_http_stats() -> List[dict]:
+    return _client.stats()
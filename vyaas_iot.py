@@ -5,15 +5,19 @@ import warnings
 # Suppress kasa deprecation warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 
-from typing import Dict, List, Optional
-from kasa import Discover, SmartDevice, SmartBulb, SmartPlug, SmartStrip
+from typing import TYPE_CHECKING, Dict, List, Optional
 from livekit.agents.llm import function_tool
+from vyaas_tool_scheduler import uses
+
+if TYPE_CHECKING:
+    # kasa is imported lazily on first scan to keep worker startup cheap
+    from kasa import SmartDevice
 
 logger = logging.getLogger("vyaas_iot")
 
 # Cache discovered devices to avoid re-scanning every time
 # Map: alias -> SmartDevice
-CACHED_DEVICES: Dict[str, SmartDevice] = {}
+CACHED_DEVICES: Dict[str, "SmartDevice"] = {}
 
 # Mock devices for demonstration if no real devices found
 MOCK_DEVICES = {
@@ -23,7 +27,20 @@ MOCK_DEVICES = {
 }
 USE_MOCK = False
 
-async def _get_device(alias: str) -> Optional[SmartDevice]:
+async def clear_device_cache():
+    """Disconnect and drop cached device handles at session end; the next lookup rescans"""
+    devices = list(CACHED_DEVICES.values())
+    CACHED_DEVICES.clear()
+    for dev in devices:
+        disconnect = getattr(dev, "disconnect", None)  # python-kasa >= 0.6
+        if disconnect is None:
+            continue
+        try:
+            await disconnect()
+        except Exception as e:
+            logger.warning(f"Disconnecting {getattr(dev, 'alias', dev)} failed: {e}")
+
+async def _get_device(alias: str) -> Optional["SmartDevice"]:
     """Helper to find a device by alias (case-insensitive)"""
     global CACHED_DEVICES
     
@@ -47,6 +64,7 @@ async def scan_iot_devices() -> str:
     
     logger.info("Scanning for Kasa devices...")
     try:
+        from kasa import Discover
         found = await Discover.discover(timeout=3)
         
         if not found:
@@ -76,6 +94,7 @@ async def scan_iot_devices() -> str:
         return f"Error scanning network ({e}). Using MOCK mode.\nMock Devices available."
 
 @function_tool()
+@uses("iot:{device_name}")
 async def control_iot_device(device_name: str, action: str) -> str:
     """
     Turn a smart home device on or off.
@@ -123,6 +142,7 @@ async def control_iot_device(device_name: str, action: str) -> str:
         return f"Failed to control {device_name}: {e}"
 
 @function_tool()
+@uses("iot:{device_name}")
 async def set_iot_brightness(device_name: str, brightness: int) -> str:
     """
     Set brightness of a smart bulb.
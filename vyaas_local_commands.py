@@ -5,55 +5,306 @@ Sends commands to Local Desktop Bridge via LiveKit Data Channel
 These tools run on the cloud server and send commands to the user's PC
 via LiveKit's data channel. The Desktop Bridge running locally receives
 and executes these commands.
+
+Commands are addressed only to bridge participants (identity BRIDGE_IDENTITY
+or attribute ROLE_ATTRIBUTE=BRIDGE_ROLE), tracked from the room's participant
+events; with no bridge online a command fails without being published.
+
+Every command carries an id. The bridge answers on COMMAND_RESULT_TOPIC with
+a command_ack as soon as it has the command, and a command_result once it has
+run it ({"id", "ok", "error"}). _send_local_command waits for both (ACK_TIMEOUT,
+then the command's timeout, both clamped to the tool's deadline), so tools
+report what actually happened on the PC.
+Round trips go to vyaas_bridge_command_seconds{command, phase} on /metrics.
 """
 
+import asyncio
 import json
 import logging
-from typing import Optional
+import os
+import time
+import uuid
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from livekit.agents import function_tool
+from vyaas_tool_scheduler import uses
+from vyaas_deadline import clamp_timeout, remaining, tool_budget
+from vyaas_publisher import get_publisher
+from vyaas_telemetry import Counter, Histogram, register
+from vyaas_tracing import record_span, span
 
 logger = logging.getLogger("vyaas_local_commands")
 logger.setLevel(logging.INFO)
 
+# Must match vyaas_desktop_bridge
+BRIDGE_IDENTITY = "vyaas_desktop_bridge"
+ROLE_ATTRIBUTE = "vyaas.role"
+BRIDGE_ROLE = "desktop_bridge"
+COMMAND_RESULT_TOPIC = "command_result"
+
+ACK_TIMEOUT = float(os.getenv("VYAAS_COMMAND_ACK_TIMEOUT", "3"))
+RESULT_TIMEOUT = float(os.getenv("VYAAS_COMMAND_TIMEOUT", "20"))
+# Commands that wait on the PC's UI (see DesktopBridge) get longer
+COMMAND_TIMEOUTS = {
+    "send_whatsapp": 30.0,
+    "send_whatsapp_contact": 40.0,
+    "play_youtube": 30.0,
+}
+# Waits end this long before the tool's deadline, so the tool's own outcome
+# (no_ack / timeout) is returned instead of with_budget's generic cut-off
+DEADLINE_HEADROOM = 1.0
+
+# Commands a macro step may run (DesktopBridge.execute_command)
+MACRO_COMMANDS = {
+    "open_app", "open_maps", "open_notes", "send_whatsapp", "send_whatsapp_contact", "type_text",
+    "press_key", "open_url", "play_youtube", "screenshot", "set_volume", "lock_pc",
+}
+MAX_MACRO_STEPS = 20
+MAX_STEP_WAIT = 30.0
+WINDOW_WAIT_TIMEOUT = 10.0
+# Typical seconds a step takes on the bridge (its fixed UI waits), to reject plans
+# that cannot finish within the tool's budget; type_text adds TYPE_SECONDS_PER_CHAR
+MACRO_STEP_SECONDS = {
+    "open_notes": 2.0,
+    "send_whatsapp": 5.0,
+    "send_whatsapp_contact": 10.0,
+    "play_youtube": 6.0,
+    "screenshot": 2.0,
+    "set_volume": 2.0,
+}
+DEFAULT_STEP_SECONDS = 1.0
+TYPE_SECONDS_PER_CHAR = 0.05
+
+COMMAND_RTT = register(Histogram("vyaas_bridge_command_seconds",
+                                 "Desktop bridge command round trip (phase ack: receipt, result: execution done)",
+                                 ("command", "phase"),
+                                 buckets=(0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 40.0)))
+COMMAND_OUTCOMES = register(Counter("vyaas_bridge_commands_total", "Desktop bridge commands by outcome", ("command", "outcome")))
+
 # Global reference to the room for sending data
 _current_room = None
 
+# Identities of the bridges currently in the room
+_bridges = set()
+
+# Traced commands awaiting the bridge's trace reply: send span id -> (trace id, sent at, command)
+_pending_traces: "OrderedDict[str, tuple]" = OrderedDict()
+MAX_PENDING_TRACES = 256
+
+
+class CommandResult:
+    """Outcome of a bridge command; truthy if the bridge ran it successfully"""
+    __slots__ = ("ok", "outcome", "error")
+
+    def __init__(self, ok: bool, outcome: str, error: Optional[str] = None):
+        self.ok = ok
+        self.outcome = outcome  # ok, no_room, no_bridge, send_failed, no_ack, timeout, failed
+        self.error = error
+
+    def __bool__(self):
+        return self.ok
+
+
+class _PendingCommand:
+    __slots__ = ("command", "sent_at", "acked", "done")
+
+    def __init__(self, command: str):
+        loop = asyncio.get_running_loop()
+        self.command = command
+        self.sent_at = time.monotonic()
+        self.acked = loop.create_future()
+        self.done = loop.create_future()
+
+
+# Commands awaiting the bridge's ack/result: command id -> pending
+_pending_commands: Dict[str, _PendingCommand] = {}
+
+def is_bridge(participant) -> bool:
+    attributes = getattr(participant, "attributes", None) or {}
+    return participant.identity == BRIDGE_IDENTITY or attributes.get(ROLE_ATTRIBUTE) == BRIDGE_ROLE
+
+
+def is_bridge_identity(identity: Optional[str]) -> bool:
+    """Sender filter for packets only bridges should send"""
+    return identity == BRIDGE_IDENTITY or identity in _bridges
+
+
+def bridge_identities() -> List[str]:
+    return sorted(_bridges)
+
+
+def _update_bridge(participant):
+    if is_bridge(participant):
+        if participant.identity not in _bridges:
+            logger.info(f"Desktop bridge online: {participant.identity}")
+        _bridges.add(participant.identity)
+    else:
+        _bridges.discard(participant.identity)
+
+
+def _on_participant_disconnected(participant):
+    if participant.identity in _bridges:
+        _bridges.discard(participant.identity)
+        logger.info(f"Desktop bridge offline: {participant.identity}")
+
+
+def _on_attributes_changed(changed_attributes: dict, participant):
+    _update_bridge(participant)
+
+
 def set_room(room):
-    """Set the LiveKit room reference for data channel communication"""
+    """Set the LiveKit room reference for data channel communication (None detaches)"""
     global _current_room
+    if _current_room is not None:
+        _current_room.off("participant_connected", _update_bridge)
+        _current_room.off("participant_disconnected", _on_participant_disconnected)
+        _current_room.off("participant_attributes_changed", _on_attributes_changed)
+    _bridges.clear()
+    for pending in _pending_commands.values():
+        for future in (pending.acked, pending.done):
+            if not future.done():
+                future.cancel()
     _current_room = room
-    logger.info("Room set for local commands")
+    if room is None:
+        return
+
+    room.on("participant_connected", _update_bridge)
+    room.on("participant_disconnected", _on_participant_disconnected)
+    room.on("participant_attributes_changed", _on_attributes_changed)
+    for participant in room.remote_participants.values():
+        _update_bridge(participant)
+    logger.info(f"Room set for local commands ({len(_bridges)} bridge(s) online)")
 
-async def _send_local_command(command_type: str, params: dict) -> bool:
+def _wait_timeout(timeout: float) -> float:
+    """`timeout`, ending DEADLINE_HEADROOM before the tool's deadline (if it has one)"""
+    return max(0.1, clamp_timeout(timeout + DEADLINE_HEADROOM) - DEADLINE_HEADROOM)
+
+async def _send_local_command(command_type: str, params: dict, timeout: Optional[float] = None) -> CommandResult:
     """
-    Send a command to the local desktop bridge via data channel.
-    Returns True if command was sent successfully.
+    Send a command to the local desktop bridge via data channel and wait for its result.
+    timeout: seconds the bridge may take to run it (default per COMMAND_TIMEOUTS / RESULT_TIMEOUT).
     """
     global _current_room
     
     if not _current_room:
         logger.error("No room available for sending local commands")
-        return False
-    
+        return _finish(command_type, CommandResult(False, "no_room"))
+    if not _bridges:
+        # Fail fast: nobody would receive it
+        logger.warning(f"No bridge online, not sending {command_type}")
+        return _finish(command_type, CommandResult(False, "no_bridge"))
+
+    command_id = uuid.uuid4().hex
+    pending = _pending_commands[command_id] = _PendingCommand(command_type)
     try:
-        payload = {
-            "type": "local_command",
-            "command": command_type,
-            "params": params
-        }
-        
-        await _current_room.local_participant.publish_data(
-            json.dumps(payload),
-            topic="local_commands"
-        )
+        with span("local_command.send", command=command_type) as send_span:
+            payload = {
+                "type": "local_command",
+                "id": command_id,
+                "command": command_type,
+                "params": params
+            }
+            if send_span:
+                # The bridge echoes these ids in its trace reply
+                payload["trace"] = {"trace_id": send_span.trace_id, "span_id": send_span.span_id}
+
+            # Control lane: never waits behind queued telemetry; bridges only, not the frontend
+            try:
+                await get_publisher(_current_room).send("local_commands", json.dumps(payload),
+                                                        destination_identities=bridge_identities())
+            except Exception as e:
+                logger.error(f"Failed to send local command: {e}")
+                return _finish(command_type, CommandResult(False, "send_failed", str(e)))
+
+            if send_span:
+                _pending_traces[send_span.span_id] = (send_span.trace_id, time.time(), command_type)
+                while len(_pending_traces) > MAX_PENDING_TRACES:
+                    _pending_traces.popitem(last=False)
         logger.info(f"Sent local command: {command_type}")
-        return True
-    except Exception as e:
-        logger.error(f"Failed to send local command: {e}")
-        return False
+
+        try:
+            # The result can overtake a lost ack; either means the bridge has it
+            await asyncio.wait_for(asyncio.wait({pending.acked, pending.done},
+                                                return_when=asyncio.FIRST_COMPLETED), _wait_timeout(ACK_TIMEOUT))
+        except asyncio.TimeoutError:
+            pass
+        if not pending.acked.done() and not pending.done.done():
+            logger.warning(f"Bridge did not acknowledge {command_type} within {ACK_TIMEOUT:g}s")
+            return _finish(command_type, CommandResult(False, "no_ack"))
+
+        timeout = _wait_timeout(timeout or COMMAND_TIMEOUTS.get(command_type, RESULT_TIMEOUT))
+        try:
+            ok, error = await asyncio.wait_for(asyncio.shield(pending.done), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"No result for {command_type} within {timeout:g}s")
+            return _finish(command_type, CommandResult(False, "timeout"))
+        return _finish(command_type, CommandResult(True, "ok") if ok else CommandResult(False, "failed", error))
+    finally:
+        _pending_commands.pop(command_id, None)
+
+
+def _finish(command: str, result: CommandResult) -> CommandResult:
+    COMMAND_OUTCOMES.inc(command=command, outcome=result.outcome)
+    return result
+
+
+def handle_command_reply(data: dict):
+    """command_ack / command_result packet from the bridge"""
+    pending = _pending_commands.get(data.get("id"))
+    if pending is None:
+        return  # Already timed out, or from an earlier session
+    elapsed = time.monotonic() - pending.sent_at
+    if data.get("type") == "command_ack":
+        if not pending.acked.done():
+            pending.acked.set_result(True)
+            COMMAND_RTT.observe(elapsed, command=pending.command, phase="ack")
+    elif data.get("type") == "command_result":
+        if not pending.done.done():
+            pending.done.set_result((bool(data.get("ok")), data.get("error")))
+            COMMAND_RTT.observe(elapsed, command=pending.command, phase="result")
+
+
+def _failure(result: CommandResult) -> str:
+    """Tool reply for a command that did not succeed"""
+    if result.outcome in ("no_room", "no_bridge"):
+        return "Error: Desktop bridge online nahi hai. Please check if bridge is running."
+    if result.outcome == "send_failed":
+        return "Error: Desktop bridge tak command nahi pahunch paya."
+    if result.outcome == "no_ack":
+        return "Error: Desktop bridge ne command confirm nahi kiya. Bridge restart/update karke dekho."
+    if result.outcome == "timeout":
+        return "Error: Desktop bridge ne time par result nahi bheja, PC par check karo ki command chala ya nahi."
+    return f"Error: PC par command fail ho gaya: {result.error or 'unknown error'}"
+
+
+def handle_command_trace(data: dict):
+    """
+    Record the bridge's trace reply under the send span: the round trip from publish to
+    reply, and the bridge's stages (placed by duration, since the PC clock is not trusted).
+    """
+    pending = _pending_traces.pop(data.get("span_id"), None)
+    if pending is None:
+        return
+    trace_id, sent_at, command = pending
+    roundtrip_ms = (time.time() - sent_at) * 1000
+    stages = data.get("spans", [])
+    bridge_ms = sum(stage.get("ms", 0.0) for stage in stages)
+    transit_ms = max(0.0, roundtrip_ms - bridge_ms)
+
+    roundtrip_id = record_span("bridge.roundtrip", trace_id, data.get("span_id"), sent_at, roundtrip_ms,
+                               status="ok" if data.get("ok", True) else "error",
+                               command=command, transit_ms=round(transit_ms, 3))
+    stage_start = sent_at + transit_ms / 2000  # Assume symmetric transit
+    for stage in stages:
+        record_span(stage.get("name", "bridge.stage"), trace_id, roundtrip_id, stage_start, stage.get("ms", 0.0),
+                    status=stage.get("status", "ok"))
+        stage_start += stage.get("ms", 0.0) / 1000
 
 
 # ============== LOCAL APP OPENING TOOLS ==============
 
+@function_tool()
+@uses("desktop-gui")
 async def open_whatsapp_local() -> str:
     """
     Open WhatsApp Desktop app on the user's PC.
@@ -61,12 +312,14 @@ async def open_whatsapp_local() -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("open_app", {"app": "whatsapp"})
-    if success:
-        return "Done! WhatsApp open karne ka command bhej diya hai Bhaiya!"
-    return "Error: Desktop bridge se connection nahi hai. Please check if bridge is running."
+    result = await _send_local_command("open_app", {"app": "whatsapp"})
+    if result:
+        return "Done! WhatsApp open kar diya Bhaiya!"
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def open_maps_local(query: str = "") -> str:
     """
     Open Google Maps on the user's PC, optionally with a search query.
@@ -75,12 +328,14 @@ async def open_maps_local(query: str = "") -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("open_maps", {"query": query})
-    if success:
+    result = await _send_local_command("open_maps", {"query": query})
+    if result:
         return f"Done! Google Maps {'with ' + query if query else ''} open kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def open_notes_local(content: str = "") -> str:
     """
     Open Notepad/Notes app on user's PC, optionally with content to write.
@@ -89,12 +344,14 @@ async def open_notes_local(content: str = "") -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("open_notes", {"content": content})
-    if success:
+    result = await _send_local_command("open_notes", {"content": content})
+    if result:
         return "Done! Notes app open kar diya Bhaiya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def open_app_local(app_name: str) -> str:
     """
     Open any application on the user's PC by name.
@@ -105,12 +362,14 @@ async def open_app_local(app_name: str) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("open_app", {"app": app_name})
-    if success:
-        return f"Done! {app_name} open karne ka command bhej diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    result = await _send_local_command("open_app", {"app": app_name})
+    if result:
+        return f"Done! {app_name} open kar diya!"
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def send_whatsapp_local(phone_number: str, message: str) -> str:
     """
     Send a WhatsApp message to a phone number via local desktop automation.
@@ -125,15 +384,17 @@ async def send_whatsapp_local(phone_number: str, message: str) -> str:
     # Clean phone number
     clean_phone = ''.join(filter(str.isdigit, phone_number))
     
-    success = await _send_local_command("send_whatsapp", {
+    result = await _send_local_command("send_whatsapp", {
         "phone": clean_phone,
         "message": message
     })
-    if success:
-        return f"Done! WhatsApp message {phone_number} ko bhejne ka command diya Bhaiya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    if result:
+        return f"Done! WhatsApp message {phone_number} ko bhej diya Bhaiya!"
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def send_whatsapp_contact_local(contact_name: str, message: str) -> str:
     """
     Send a WhatsApp message to a contact by searching their name.
@@ -144,15 +405,17 @@ async def send_whatsapp_contact_local(contact_name: str, message: str) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("send_whatsapp_contact", {
+    result = await _send_local_command("send_whatsapp_contact", {
         "contact": contact_name,
         "message": message
     })
-    if success:
+    if result:
         return f"Done! {contact_name} ko WhatsApp message bhej diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def type_text_local(text: str) -> str:
     """
     Type text on the user's PC using keyboard automation.
@@ -162,12 +425,14 @@ async def type_text_local(text: str) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("type_text", {"text": text})
-    if success:
+    result = await _send_local_command("type_text", {"text": text})
+    if result:
         return "Done! Text type kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def press_key_local(key: str) -> str:
     """
     Press a keyboard key or combination on user's PC.
@@ -176,12 +441,14 @@ async def press_key_local(key: str) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("press_key", {"key": key})
-    if success:
+    result = await _send_local_command("press_key", {"key": key})
+    if result:
         return f"Done! {key} press kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def open_url_local(url: str) -> str:
     """
     Open a URL in the default browser on user's PC.
@@ -190,12 +457,14 @@ async def open_url_local(url: str) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("open_url", {"url": url})
-    if success:
+    result = await _send_local_command("open_url", {"url": url})
+    if result:
         return f"Done! Browser mein {url} open kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def play_youtube_local(query: str) -> str:
     """
     Search and play a YouTube video on user's PC.
@@ -204,24 +473,28 @@ async def play_youtube_local(query: str) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("play_youtube", {"query": query})
-    if success:
-        return f"Done! YouTube pe {query} search kar raha hoon!"
-    return "Error: Desktop bridge se connection nahi hai."
+    result = await _send_local_command("play_youtube", {"query": query})
+    if result:
+        return f"Done! YouTube pe {query} chala diya!"
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def take_screenshot_local() -> str:
     """
     Take a screenshot on the user's PC and save it to Pictures folder.
     Returns:
         Status message
     """
-    success = await _send_local_command("screenshot", {})
-    if success:
+    result = await _send_local_command("screenshot", {})
+    if result:
         return "Done! Screenshot le liya aur Pictures folder mein save kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
+@function_tool()
+@uses("desktop-gui")
 async def set_volume_local(level: int) -> str:
     """
     Set system volume level on user's PC.
@@ -230,23 +503,24 @@ async def set_volume_local(level: int) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("set_volume", {"level": level})
-    if success:
+    result = await _send_local_command("set_volume", {"level": level})
+    if result:
         return f"Done! Volume {level}% kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
 @function_tool()
+@uses("desktop-gui")
 async def lock_pc_local() -> str:
     """
     Lock the user's PC screen.
     Returns:
         Status message
     """
-    success = await _send_local_command("lock_pc", {})
-    if success:
+    result = await _send_local_command("lock_pc", {})
+    if result:
         return "Done! PC lock kar diya Bhaiya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
 @function_tool()
@@ -258,10 +532,10 @@ async def shutdown_pc_local(delay_seconds: int = 60) -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("shutdown", {"delay": delay_seconds})
-    if success:
+    result = await _send_local_command("shutdown", {"delay": delay_seconds})
+    if result:
         return f"Done! PC {delay_seconds} seconds mein shutdown ho jayega. Cancel karne ke liye bolo."
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
 
 
 @function_tool()
@@ -271,7 +545,104 @@ async def cancel_shutdown_local() -> str:
     Returns:
         Status message
     """
-    success = await _send_local_command("cancel_shutdown", {})
-    if success:
+    result = await _send_local_command("cancel_shutdown", {})
+    if result:
         return "Done! Shutdown cancel kar diya!"
-    return "Error: Desktop bridge se connection nahi hai."
+    return _failure(result)
+
+
+# ============== MACROS ==============
+
+def _parse_macro(steps: str):
+    """(steps, None) for a valid macro plan, else (None, error message)"""
+    try:
+        plan = json.loads(steps)
+    except ValueError as e:
+        return None, f"steps valid JSON list nahi hai ({e})"
+    if not isinstance(plan, list) or not plan:
+        return None, "steps ek non-empty JSON list honi chahiye"
+    if len(plan) > MAX_MACRO_STEPS:
+        return None, f"ek macro mein max {MAX_MACRO_STEPS} steps ho sakte hain"
+    for number, step in enumerate(plan, 1):
+        if not isinstance(step, dict) or step.get("command") not in MACRO_COMMANDS:
+            return None, f"step {number} ka command galat hai (allowed: {', '.join(sorted(MACRO_COMMANDS))})"
+        if not isinstance(step.get("params", {}), dict):
+            return None, f"step {number} ke params JSON object hone chahiye"
+        if "wait" in step and not _is_seconds(step["wait"], 0):
+            return None, f"step {number} ka wait 0 se {MAX_STEP_WAIT:g} seconds ke beech number hona chahiye"
+        window = step.get("wait_for_window")
+        if window is not None and (not isinstance(window, str) or not window.strip()):
+            return None, f"step {number} ka wait_for_window window title ka text hona chahiye"
+        if "timeout" in step:
+            if window is None:
+                return None, f"step {number} mein timeout sirf wait_for_window ke saath chalta hai"
+            if not _is_seconds(step["timeout"], 0.1):
+                return None, f"step {number} ka timeout 0.1 se {MAX_STEP_WAIT:g} seconds ke beech hona chahiye"
+    return plan, None
+
+
+def _is_seconds(value, minimum: float) -> bool:
+    return (isinstance(value, (int, float)) and not isinstance(value, bool)
+            and minimum <= value <= MAX_STEP_WAIT)
+
+
+def _step_waits(step: dict) -> float:
+    waits = step.get("wait", 0)
+    if step.get("wait_for_window"):
+        waits += step.get("timeout", WINDOW_WAIT_TIMEOUT)
+    return waits
+
+
+def _macro_estimate(plan: list) -> float:
+    """Seconds the plan typically takes on the bridge, counting window waits at their timeout"""
+    total = 0.0
+    for step in plan:
+        total += MACRO_STEP_SECONDS.get(step["command"], DEFAULT_STEP_SECONDS) + _step_waits(step)
+        if step["command"] == "type_text":
+            total += len(str(step.get("params", {}).get("text", ""))) * TYPE_SECONDS_PER_CHAR
+    return total
+
+
+def _macro_timeout(plan: list) -> float:
+    """Every step's own timeout plus its waits"""
+    return sum(COMMAND_TIMEOUTS.get(step["command"], 5.0) + _step_waits(step) for step in plan)
+
+
+@function_tool()
+@uses("desktop-gui")
+async def run_desktop_macro(steps: str) -> str:
+    """
+    Run several actions on the user's PC in one go, in order, without other commands in between.
+    Use this for multi-step tasks (e.g. "Notepad kholo, ye likho aur save karo") instead of
+    calling open_notes_local, type_text_local and press_key_local one by one.
+    Args:
+        steps: JSON list of steps, each {"command": ..., "params": {...}} with optional
+               "wait" (seconds to pause after the step) and "wait_for_window" (text of a window
+               title to wait for after the step, up to "timeout" seconds, default 10).
+               Waits are at most 30 seconds each, and the whole macro must fit in about
+               30 seconds; split longer tasks into several macros.
+               Commands and params: open_app {app}, open_notes {content}, type_text {text},
+               press_key {key}, open_url {url}, open_maps {query}, play_youtube {query},
+               screenshot {}, set_volume {level}, send_whatsapp {phone, message},
+               send_whatsapp_contact {contact, message}, lock_pc {}
+               Example: [{"command": "open_app", "params": {"app": "notepad"}, "wait_for_window": "Notepad"},
+                         {"command": "type_text", "params": {"text": "Hello Bhaiya"}},
+                         {"command": "press_key", "params": {"key": "ctrl+s"}}]
+    Returns:
+        Status message
+    """
+    plan, error = _parse_macro(steps)
+    if error:
+        return f"Error: {error}"
+    # Within a spoken turn the deadline may be shorter than the tool's own budget
+    left = remaining()
+    budget = (left if left is not None else tool_budget("run_desktop_macro")) - DEADLINE_HEADROOM
+    estimate = _macro_estimate(plan)
+    if estimate > budget:
+        return (f"Error: ye macro lagbhag {estimate:.0f}s lega, par sirf {max(budget, 0):.0f}s hain. "
+                f"Waits kam karo ya ise chhote macros mein baanto.")
+
+    result = await _send_local_command("macro", {"steps": plan}, timeout=_macro_timeout(plan))
+    if result:
+        return f"Done! Saare {len(plan)} steps PC par ho gaye Bhaiya!"
+    return _failure(result)
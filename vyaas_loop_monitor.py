@@ -0,0 +1,208 @@
+"""
+VYAAS AI - Event Loop Monitor
+Measures event-loop lag in the agent worker and finds the code that blocks it.
+
+Lag probe (always on, ~free): a task sleeps PROBE_INTERVAL and records how
+late it woke up. p50/p95/p99/max over the recent window are logged every
+REPORT_INTERVAL and available through stats(); a warning is logged when p99
+crosses the stall threshold, so an audio-latency regression shows up in logs.
+
+Debug mode (VYAAS_LOOP_DEBUG=1): a watchdog thread pings the loop with
+call_soon_threadsafe. If the ping is not answered within the threshold, the
+loop thread's stack is captured with sys._current_frames() while it is still
+blocked, and the stall is attributed to the innermost registered tool on that
+stack (e.g. get_weather blocked in requests.get).
+
+Usage (inside the running loop):
+    monitor = start_loop_monitor()
+    print(monitor.format_report())
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import Counter, deque
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("vyaas_loop_monitor")
+logger.setLevel(logging.INFO)
+
+PROBE_INTERVAL = 0.25  # seconds between lag probes
+REPORT_INTERVAL = 60.0  # seconds between lag summaries in the log
+LAG_WINDOW = 1200  # probe results kept for percentiles (~5 min)
+STALL_THRESHOLD = float(os.getenv("VYAAS_LOOP_LAG_THRESHOLD_MS", "100")) / 1000
+DEBUG = os.getenv("VYAAS_LOOP_DEBUG", "").lower() in ("1", "true", "yes")
+STACK_DEPTH = 12  # frames kept per captured stall
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def _tool_codes() -> Dict[object, str]:
+    """code object -> tool name for every registered tool (unwrapping decorators)"""
+    from vyaas_tool_registry import load_tools
+
+    codes = {}
+    for tool in load_tools():
+        func = inspect.unwrap(tool)
+        code = getattr(func, "__code__", None)
+        if code is not None:
+            codes[code] = func.__name__
+    return codes
+
+
+class LoopMonitor:
+    """Lag probe + optional blocking-call watchdog for one event loop."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, threshold: float = STALL_THRESHOLD, debug: bool = DEBUG):
+        self.loop = loop
+        self.threshold = threshold
+        self.debug = debug
+        self._lags: deque = deque(maxlen=LAG_WINDOW)
+        self._probe_task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop_event = threading.Event()
+        self._loop_thread_id = threading.get_ident()
+
+        self.stalls: deque = deque(maxlen=50)  # Most recent captured stalls (debug mode)
+        self.stalls_by_tool: Counter = Counter()
+        self._tool_codes: Dict[object, str] = {}
+
+    # ============== CONTROL ==============
+
+    def start(self):
+        """Start the probe (and watchdog in debug mode). Call from the loop thread."""
+        self._loop_thread_id = threading.get_ident()
+        self._probe_task = self.loop.create_task(self._probe())
+        if self.debug:
+            try:
+                self._tool_codes = _tool_codes()
+            except Exception as e:
+                logger.error(f"Could not load tools for stall attribution: {e}")
+            self._watchdog = threading.Thread(target=self._watch, name="vyaas-loop-watchdog", daemon=True)
+            self._watchdog.start()
+        logger.info(f"Loop monitor started (threshold {self.threshold * 1000:.0f} ms, debug={self.debug})")
+
+    def stop(self):
+        self._stop_event.set()
+        if self._probe_task:
+            self._probe_task.cancel()
+
+    # ============== LAG PROBE ==============
+
+    async def _probe(self):
+        next_report = self.loop.time() + REPORT_INTERVAL
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(PROBE_INTERVAL)
+            now = self.loop.time()
+            self._lags.append(max(0.0, now - start - PROBE_INTERVAL))
+
+            if now >= next_report:
+                next_report = now + REPORT_INTERVAL
+                stats = self.stats()
+                if stats["p99_ms"] >= self.threshold * 1000:
+                    logger.warning(f"Event loop lag high: {self.format_stats(stats)}")
+                else:
+                    logger.info(f"Event loop lag: {self.format_stats(stats)}")
+
+    def stats(self) -> dict:
+        """Lag percentiles (ms) over the recent window"""
+        lags = sorted(self._lags)
+        return {
+            "samples": len(lags),
+            "p50_ms": _percentile(lags, 50) * 1000,
+            "p95_ms": _percentile(lags, 95) * 1000,
+            "p99_ms": _percentile(lags, 99) * 1000,
+            "max_ms": (lags[-1] if lags else 0.0) * 1000,
+            "stalls": sum(self.stalls_by_tool.values()),
+        }
+
+    @staticmethod
+    def format_stats(stats: dict) -> str:
+        return (f"p50 {stats['p50_ms']:.1f} ms, p95 {stats['p95_ms']:.1f} ms, "
+                f"p99 {stats['p99_ms']:.1f} ms, max {stats['max_ms']:.1f} ms ({stats['samples']} samples)")
+
+    # ============== WATCHDOG (debug mode) ==============
+
+    def _watch(self):
+        while not self._stop_event.is_set():
+            answered = threading.Event()
+            sent = time.monotonic()
+            try:
+                self.loop.call_soon_threadsafe(answered.set)
+            except RuntimeError:
+                return  # Loop closed
+
+            if not answered.wait(self.threshold):
+                frame = sys._current_frames().get(self._loop_thread_id)
+                stack = traceback.extract_stack(frame)[-STACK_DEPTH:] if frame else []
+                tool = self._attribute(frame)
+                del frame
+                while not answered.wait(1.0):
+                    if self._stop_event.is_set():
+                        return
+                self._record_stall(time.monotonic() - sent, tool, stack)
+
+            # Ping often so the measured stall (ping -> answer) undercounts by at most threshold/2
+            self._stop_event.wait(self.threshold / 2)
+
+    def _attribute(self, frame) -> str:
+        """Innermost registered tool on the stack, else the innermost vyaas module frame"""
+        fallback = "unknown"
+        while frame is not None:
+            tool = self._tool_codes.get(frame.f_code)
+            if tool:
+                return tool
+            if fallback == "unknown":
+                module = os.path.basename(frame.f_code.co_filename)
+                if module.startswith("vyaas_") or module == "agent.py":
+                    fallback = f"{module}:{frame.f_code.co_name}"
+            frame = frame.f_back
+        return fallback
+
+    def _record_stall(self, duration: float, tool: str, stack):
+        self.stalls_by_tool[tool] += 1
+        self.stalls.append({"tool": tool, "ms": duration * 1000, "at": time.time(),
+                            "stack": traceback.format_list(stack)})
+        logger.warning(
+            f"Event loop blocked >= {duration * 1000:.0f} ms by {tool}\n" + "".join(traceback.format_list(stack))
+        )
+
+    def format_report(self) -> str:
+        lines = [f"Event loop lag: {self.format_stats(self.stats())}"]
+        for tool, count in self.stalls_by_tool.most_common():
+            worst = max((s["ms"] for s in self.stalls if s["tool"] == tool), default=0.0)
+            lines.append(f"  {tool:<32} {count:4d} stalls, worst {worst:.0f} ms")
+        return "\n".join(lines)
+
+
+# One monitor per worker process (one loop per job process)
+_monitor: Optional[LoopMonitor] = None
+
+
+def start_loop_monitor(threshold: float = STALL_THRESHOLD, debug: bool = DEBUG) -> LoopMonitor:
+    """Start monitoring the running loop (no-op if it is already monitored)"""
+    global _monitor
+
+    loop = asyncio.get_running_loop()
+    if _monitor is not None and _monitor.loop is loop:
+        return _monitor
+    if _monitor is not None:
+        _monitor.stop()
+    _monitor = LoopMonitor(loop, threshold=threshold, debug=debug)
+    _monitor.start()
+    return _monitor
+
+
+def get_loop_monitor() -> Optional[LoopMonitor]:
+    return _monitor
@@ -1,6 +1,7 @@
 import json
 from livekit.agents import function_tool
 import logging
+from vyaas_publisher import get_publisher
 
 logger = logging.getLogger("vyaas-maps")
 
@@ -27,10 +28,7 @@ class MapManager:
                 "query_type": query_type
             }
             try:
-                await self._current_room.local_participant.publish_data(
-                    json.dumps(payload),
-                    topic="map_events"
-                )
+                await get_publisher(self._current_room).send("map_events", json.dumps(payload))
                 return f"Map of {location} is now being displayed on the screen."
             except Exception as e:
                 logger.error(f"Failed to publish map event: {e}")
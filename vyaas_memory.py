@@ -9,7 +9,9 @@ import logging
 import asyncio
 from typing import Dict, List, Optional
 from livekit.agents import function_tool
-from mem0 import AsyncMemoryClient
+from vyaas_tool_scheduler import uses
+from vyaas_circuit_breaker import get_breaker, CircuitOpenError
+from vyaas_cache import cached, invalidate
 
 # Configure logging
 logger = logging.getLogger("vyaas_memory")
@@ -18,15 +20,29 @@ logger.setLevel(logging.INFO)
 # User ID for memory segmentation
 USER_ID = "vyaas_user_main"
 
+# Message while the Mem0 circuit is open (service failing, calls skipped)
+MEM0_DOWN = "Memory service (Mem0) abhi respond nahi kar rahi, thodi der baad try karenge."
+
+# Process-wide client, created once (worker prewarm or first use) and reused by every tool call
+_mem0_client = None
+
 def get_mem0_client():
-    """Initialize Mem0 Client"""
+    """Initialize Mem0 Client (cached for the lifetime of the process)"""
+    global _mem0_client
+
+    if _mem0_client is not None:
+        return _mem0_client
+
     api_key = os.getenv("MEM0_API_KEY")
     if not api_key:
         logger.error("MEM0_API_KEY not found in environment variables")
         return None
-    return AsyncMemoryClient(api_key=api_key)
+    from mem0 import AsyncMemoryClient  # Deferred: mem0 pulls in a large dependency tree
+    _mem0_client = AsyncMemoryClient(api_key=api_key)
+    return _mem0_client
 
 @function_tool()
+@uses("network")
 async def remember_fact(text: str) -> str:
     """
     Store a specific fact about the user or preference using Mem0.
@@ -42,15 +58,21 @@ async def remember_fact(text: str) -> str:
             return "Error: Mem0 API Key missing"
             
         # Add to memory
-        result = await client.add(messages=[{"role": "user", "content": text}], user_id=USER_ID)
+        result = await get_breaker("mem0").acall(
+            client.add, messages=[{"role": "user", "content": text}], user_id=USER_ID
+        )
         logger.info(f"Mem0 add result: {result}")
+        invalidate(list_all_memories)
         
         return f"Done! Remembered: {text}"
+    except CircuitOpenError:
+        return MEM0_DOWN
     except Exception as e:
         logger.error(f"Mem0 save error: {e}")
         return f"Error saving to Mem0: {str(e)}"
 
 @function_tool()
+@uses("network")
 async def get_fact(query: str) -> str:
     """
     Retrieve specific info using semantic search.
@@ -62,6 +84,7 @@ async def get_fact(query: str) -> str:
     return await search_memory(query)
 
 @function_tool()
+@uses("network")
 async def search_memory(query: str) -> str:
     """
     Search through memory semantically using Mem0.
@@ -79,7 +102,10 @@ async def search_memory(query: str) -> str:
         # FIX 1: Use filters={"user_id": ...} as identified by test script to avoid 400 Bad Request
         # FIX 2: Handle dict response format {'results': [...]}
         logger.info(f"DEBUG: Calling client.search('{query}', filters={{'user_id': '{USER_ID}'}})")
-        response = await client.search(query, filters={"user_id": USER_ID})
+        # Idempotent read: hedged, so one slow request does not hold up the answer
+        response = await get_breaker("mem0").acall_hedged(
+            client.search, query, filters={"user_id": USER_ID}, hedge_after=1.5
+        )
         logger.info(f"DEBUG: Mem0 search raw response: {response}")
         
         # Extract list from dict if needed
@@ -99,11 +125,16 @@ async def search_memory(query: str) -> str:
         else:
             return "No relevant memory found."
             
+    except CircuitOpenError:
+        return MEM0_DOWN
     except Exception as e:
         logger.error(f"Mem0 search error: {e}")
         return f"Error searching Mem0: {str(e)}"
 
 @function_tool()
+@uses("network")
+@cached(ttl=60, stale_ttl=300,
+        cache_if=lambda result: result.startswith(("Recent memories", "Memory is empty")))
 async def list_all_memories() -> str:
     """
     List recent memories.
@@ -115,7 +146,7 @@ async def list_all_memories() -> str:
         if not client:
             return "Error: Mem0 API Key missing"
             
-        response = await client.get_all(user_id=USER_ID, limit=10)
+        response = await get_breaker("mem0").acall(client.get_all, user_id=USER_ID, limit=10)
         all_memories = response.get("results", []) if isinstance(response, dict) else response
         
         formatted = []
@@ -126,10 +157,13 @@ async def list_all_memories() -> str:
         if formatted:
             return "Recent memories:\n" + "\n".join(formatted)
         return "Memory is empty."
+    except CircuitOpenError:
+        return MEM0_DOWN
     except Exception as e:
         return f"Error listing memories: {str(e)}"
 
 @function_tool()
+@uses("network")
 async def delete_fact(memory_id: str) -> str:
     """
     Delete a specific memory by ID (Advanced use only).
@@ -142,6 +176,7 @@ async def delete_fact(memory_id: str) -> str:
             client = get_mem0_client()
             if client:
                 await client.delete_all(user_id=USER_ID)
+                invalidate(list_all_memories)
                 return "All memories cleared."
         except Exception as e:
             return f"Error clearing: {e}"
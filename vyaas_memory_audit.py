@@ -0,0 +1,126 @@
+"""
+VYAAS AI - Session Memory Audit
+Per-session memory accounting for long-lived worker processes.
+
+Every session records the process RSS at start and end (after a full GC);
+the delta goes to the vyaas_session_rss_delta_bytes histogram on /metrics and
+to the log, together with the growth since the first session of the process,
+so slow leaks show up as a steady climb across sessions.
+
+With VYAAS_MEMORY_AUDIT=1, tracemalloc is also started (TRACE_FRAMES deep)
+and a snapshot is taken at session start and end. The end-of-session report
+lists the TOP_N source lines whose allocations grew the most. tracemalloc
+slows allocation noticeably, so this part is opt-in.
+
+    audit = SessionMemoryAudit(tag)
+    audit.start()
+    ...
+    report = await audit.finish()
+"""
+
+import gc
+import logging
+import os
+import time
+from typing import Optional
+
+from vyaas_executor import run_blocking
+from vyaas_telemetry import Gauge, Histogram, register
+
+logger = logging.getLogger("vyaas_memory_audit")
+logger.setLevel(logging.INFO)
+
+TRACEMALLOC = os.getenv("VYAAS_MEMORY_AUDIT", "").lower() in ("1", "true", "yes")
+TRACE_FRAMES = 10
+TOP_N = 15
+
+MB = 1024 * 1024
+RSS_BUCKETS = (-64 * MB, -16 * MB, -4 * MB, -MB, 0, MB, 4 * MB, 16 * MB, 64 * MB, 256 * MB)
+
+SESSION_RSS_DELTA = register(Histogram("vyaas_session_rss_delta_bytes",
+                                       "Process RSS change over one session (after GC)", buckets=RSS_BUCKETS))
+PROCESS_RSS = register(Gauge("vyaas_process_rss_bytes", "Worker process RSS at the last session end"))
+
+# First session's starting RSS and the number of sessions audited since, for this process
+_baseline_rss: Optional[int] = None
+_sessions = 0
+
+
+def _rss() -> int:
+    import psutil
+    return psutil.Process().memory_info().rss
+
+
+class SessionMemoryAudit:
+    def __init__(self, tag: str):
+        self.tag = tag
+        self.start_rss = 0
+        self.started_at = 0.0
+        self._snapshot = None
+
+    def start(self):
+        global _baseline_rss
+
+        self.started_at = time.monotonic()
+        self.start_rss = _rss()
+        if _baseline_rss is None:
+            _baseline_rss = self.start_rss
+        if TRACEMALLOC:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(TRACE_FRAMES)
+            self._snapshot = tracemalloc.take_snapshot()
+
+    def _measure(self) -> dict:
+        """GC, RSS and the tracemalloc diff (CPU-heavy; runs on a worker thread)"""
+        gc.collect()
+        end_rss = _rss()
+        top_growth = []
+        if self._snapshot is not None:
+            import tracemalloc
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            ))
+            for stat in snapshot.compare_to(self._snapshot, "lineno")[:TOP_N]:
+                if stat.size_diff <= 0:
+                    break
+                frame = stat.traceback[0]
+                top_growth.append({"site": f"{frame.filename}:{frame.lineno}",
+                                   "size_diff": stat.size_diff, "count_diff": stat.count_diff})
+            self._snapshot = None
+        return {"end_rss": end_rss, "top_growth": top_growth}
+
+    async def finish(self) -> dict:
+        global _sessions
+
+        measured = await run_blocking("cpu", self._measure)
+        _sessions += 1
+        delta = measured["end_rss"] - self.start_rss
+        report = {
+            "session": self.tag,
+            "seconds": time.monotonic() - self.started_at,
+            "start_rss": self.start_rss,
+            "end_rss": measured["end_rss"],
+            "rss_delta": delta,
+            "since_first_session": measured["end_rss"] - (_baseline_rss or self.start_rss),
+            "sessions": _sessions,
+            "top_growth": measured["top_growth"],
+        }
+        SESSION_RSS_DELTA.observe(delta)
+        PROCESS_RSS.set(measured["end_rss"])
+        logger.info(format_report(report))
+        return report
+
+
+def format_report(report: dict) -> str:
+    lines = [
+        f"Session {report['session']} memory: RSS {report['start_rss'] / MB:.1f} -> {report['end_rss'] / MB:.1f} MB "
+        f"({report['rss_delta'] / MB:+.1f} MB over {report['seconds']:.0f}s); "
+        f"{report['since_first_session'] / MB:+.1f} MB since first of {report['sessions']} sessions"
+    ]
+    if report["top_growth"]:
+        lines.append("Top allocation growth:")
+        for row in report["top_growth"]:
+            lines.append(f"  {row['size_diff'] / 1024:+10.1f} KiB {row['count_diff']:+7d} blocks  {row['site']}")
+    return "\n".join(lines)
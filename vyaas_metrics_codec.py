@@ -0,0 +1,126 @@
+"""
+VYAAS AI - System Metrics Wire Format (v2)
+Keyframe + delta encoding for `system_metrics` data packets.
+
+Keyframe (reliable delivery, every KEYFRAME_INTERVAL seconds or on demand):
+    {"type": "system_metrics", "v": 2, "kf": 1, "seq": 41,
+     "cpu": 12.5, "memory": 61.2, "disk": 70.1,
+     "processes": [{"pid": 4, "name": "chrome.exe", "cpu_percent": 8.1, "memory_percent": 3.2}, ...]}
+
+    A keyframe carries every field of the v1 payload, so v1 clients keep working on keyframes.
+
+Delta (lossy delivery):
+    {"type": "system_metrics_delta", "v": 2, "seq": 44, "base": 41, "cpu": 35.0}
+
+    Deltas have their own type: v1 clients render every "system_metrics"
+    packet as a full payload, so they must not see partial ones.
+
+    Only fields that differ from keyframe `base` by more than epsilon are present
+    ("processes" is sent whole when the top list changed). Deltas are relative to
+    the keyframe, not to the previous delta, so a dropped delta never corrupts
+    state: clients apply delta over keyframe `base` and ignore deltas whose base
+    they have not seen (the next keyframe resyncs them).
+
+Nothing is published while all values stay within epsilon of what was last sent.
+"""
+
+import json
+import os
+import time
+from typing import Optional, Tuple
+
+WIRE_VERSION = 2
+KEYFRAME_TYPE = "system_metrics"
+DELTA_TYPE = "system_metrics_delta"
+KEYFRAME_INTERVAL = 30.0  # seconds
+EPSILON = float(os.getenv("VYAAS_METRICS_EPSILON", "0.5"))          # percentage points
+PROCESS_EPSILON = float(os.getenv("VYAAS_PROCESS_EPSILON", "1.0"))  # percentage points
+
+_SCALAR_FIELDS = ("cpu", "memory", "disk")
+
+
+def _compact(payload: dict) -> str:
+    return json.dumps(payload, separators=(",", ":"))
+
+
+def snapshot_fields(snapshot, top_n: int = 5) -> dict:
+    """Rounded wire fields for a SystemSnapshot"""
+    return {
+        "cpu": round(snapshot.cpu_percent, 1),
+        "memory": round(snapshot.ram_percent, 1),
+        "disk": round(snapshot.disk_percent, 1),
+        "processes": [proc._asdict() for proc in snapshot.top_processes[:top_n]],
+    }
+
+
+def _processes_changed(old: list, new: list, epsilon: float) -> bool:
+    if [p["pid"] for p in old] != [p["pid"] for p in new]:
+        return True
+    return any(
+        abs(a["cpu_percent"] - b["cpu_percent"]) > epsilon or abs(a["memory_percent"] - b["memory_percent"]) > epsilon
+        for a, b in zip(old, new)
+    )
+
+
+class MetricsEncoder:
+    """Stateful encoder for one publisher (one room)."""
+
+    def __init__(self, epsilon: float = EPSILON, process_epsilon: float = PROCESS_EPSILON,
+                 keyframe_interval: float = KEYFRAME_INTERVAL):
+        self.epsilon = epsilon
+        self.process_epsilon = process_epsilon
+        self.keyframe_interval = keyframe_interval
+        self._seq = 0
+        self._keyframe: Optional[dict] = None      # Fields of the last keyframe
+        self._keyframe_seq = 0
+        self._keyframe_at = 0.0
+        self._last_sent: Optional[dict] = None     # Fields as the client currently sees them
+
+    @property
+    def keyframe_seq(self) -> int:
+        """seq of the keyframe that current deltas are based on"""
+        return self._keyframe_seq
+
+    def request_keyframe(self):
+        """Force the next encode() to emit a keyframe (e.g. a new subscriber joined)"""
+        self._keyframe = None
+
+    def encode(self, snapshot, now: Optional[float] = None, deltas: bool = True) -> Optional[Tuple[str, bool]]:
+        """
+        Encode a snapshot. Returns (json payload, is_keyframe), or None when
+        nothing moved beyond epsilon and no keyframe is due.
+        deltas=False sends every change as a keyframe (full v1 payload, for legacy clients).
+        """
+        now = time.monotonic() if now is None else now
+        fields = snapshot_fields(snapshot)
+
+        keyframe_due = self._keyframe is None or now - self._keyframe_at >= self.keyframe_interval
+        if not keyframe_due:
+            if not self._changed(self._last_sent, fields):
+                return None
+            keyframe_due = not deltas
+
+        if keyframe_due:
+            self._seq += 1
+            self._keyframe = fields
+            self._keyframe_seq = self._seq
+            self._keyframe_at = now
+            self._last_sent = fields
+            return _compact({"type": KEYFRAME_TYPE, "v": WIRE_VERSION, "kf": 1, "seq": self._seq, **fields}), True
+
+        delta = {
+            key: fields[key] for key in _SCALAR_FIELDS
+            if abs(fields[key] - self._keyframe[key]) > self.epsilon
+        }
+        if _processes_changed(self._keyframe["processes"], fields["processes"], self.process_epsilon):
+            delta["processes"] = fields["processes"]
+
+        self._seq += 1
+        self._last_sent = fields
+        return _compact({"type": DELTA_TYPE, "v": WIRE_VERSION, "seq": self._seq,
+                         "base": self._keyframe_seq, **delta}), False
+
+    def _changed(self, old: dict, new: dict) -> bool:
+        if any(abs(new[key] - old[key]) > self.epsilon for key in _SCALAR_FIELDS):
+            return True
+        return _processes_changed(old["processes"], new["processes"], self.process_epsilon)
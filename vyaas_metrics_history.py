@@ -0,0 +1,236 @@
+"""
+VYAAS AI - Metrics History
+Bounded, array-backed history of CPU/RAM/disk/network samples.
+
+Three ring buffers are kept, each a fixed set of typed arrays (no per-sample
+dicts), so memory stays constant regardless of uptime (~200 KB total):
+
+    raw   2 s samples      x 1800  (last hour)
+    1m    1 min min/avg/max x 1440 (last day)
+    15m   15 min min/avg/max x 672 (last week)
+
+The sampler thread feeds record(); queries pick the finest tier that still
+covers the requested window.
+"""
+
+import logging
+import math
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger("vyaas_metrics_history")
+logger.setLevel(logging.INFO)
+
+# Metric name -> unit. Network values are rates derived from the byte counters.
+METRICS = {
+    "cpu": "%",
+    "ram": "%",
+    "disk": "%",
+    "net_sent": "KB/s",
+    "net_recv": "KB/s",
+}
+
+# (name, bucket seconds, capacity)
+TIERS = (
+    ("raw", 2, 1800),
+    ("1m", 60, 1440),
+    ("15m", 900, 672),
+)
+
+
+class _Tier:
+    """One resolution level: a ring of buckets with min/avg/max per metric"""
+
+    def __init__(self, name: str, resolution: int, capacity: int):
+        self.name = name
+        self.resolution = resolution
+        self.capacity = capacity
+        self.head = 0   # Next write position
+        self.size = 0
+
+        self.ts = array('d', bytes(8 * capacity))
+        self.avg = {m: array('f', bytes(4 * capacity)) for m in METRICS}
+        if name == "raw":
+            # Raw samples: min == avg == max, share the arrays
+            self.min = self.max = self.avg
+        else:
+            self.min = {m: array('f', bytes(4 * capacity)) for m in METRICS}
+            self.max = {m: array('f', bytes(4 * capacity)) for m in METRICS}
+
+        # Open bucket being accumulated: [count, sum, min, max] per metric
+        self._bucket_id: Optional[int] = None
+        self._acc: Dict[str, list] = {}
+
+    @property
+    def span(self) -> int:
+        """Seconds of history this tier can hold"""
+        return self.resolution * self.capacity
+
+    def nbytes(self) -> int:
+        arrays = [self.ts, *self.avg.values()]
+        if self.min is not self.avg:
+            arrays += [*self.min.values(), *self.max.values()]
+        return sum(a.itemsize * len(a) for a in arrays)
+
+    def add(self, ts: float, values: Dict[str, float]):
+        if self.min is self.avg:
+            self._write(ts, {m: (v, v, v) for m, v in values.items()})
+            return
+
+        bucket_id = int(ts // self.resolution)
+        if self._bucket_id is not None and bucket_id != self._bucket_id:
+            self.flush()
+        self._bucket_id = bucket_id
+        for m, v in values.items():
+            acc = self._acc.get(m)
+            if acc is None:
+                self._acc[m] = [1, v, v, v]
+            else:
+                acc[0] += 1
+                acc[1] += v
+                acc[2] = min(acc[2], v)
+                acc[3] = max(acc[3], v)
+
+    def flush(self):
+        """Close the open bucket and write it to the ring"""
+        if self._bucket_id is None or not self._acc:
+            return
+        ts = (self._bucket_id + 1) * self.resolution
+        self._write(ts, {m: (acc[2], acc[1] / acc[0], acc[3]) for m, acc in self._acc.items()})
+        self._acc = {}
+        self._bucket_id = None
+
+    def _write(self, ts: float, rows: Dict[str, Tuple[float, float, float]]):
+        i = self.head
+        self.ts[i] = ts
+        for m, (lo, avg, hi) in rows.items():
+            self.avg[m][i] = avg
+            if self.min is not self.avg:
+                self.min[m][i] = lo
+                self.max[m][i] = hi
+        self.head = (i + 1) % self.capacity
+        self.size = min(self.size + 1, self.capacity)
+
+    def rows(self, metric: str, since: float) -> List[Tuple[float, float, float, float]]:
+        """(ts, min, avg, max) rows newer than `since`, oldest first"""
+        out = []
+        start = (self.head - self.size) % self.capacity
+        for k in range(self.size):
+            i = (start + k) % self.capacity
+            ts = self.ts[i]
+            if ts >= since:
+                out.append((ts, self.min[metric][i], self.avg[metric][i], self.max[metric][i]))
+        return out
+
+
+class MetricsHistory:
+    """Multi-resolution metrics history. Thread-safe: written by the sampler, read by tools."""
+
+    def __init__(self):
+        self._tiers = [_Tier(name, resolution, capacity) for name, resolution, capacity in TIERS]
+        self._lock = threading.Lock()
+        self._last_net: Optional[Tuple[float, int, int]] = None
+
+    def nbytes(self) -> int:
+        return sum(tier.nbytes() for tier in self._tiers)
+
+    def record(self, snapshot):
+        """Sampler listener: append one SystemSnapshot"""
+        ts = snapshot.timestamp
+        sent_rate = recv_rate = 0.0
+        if self._last_net:
+            last_ts, last_sent, last_recv = self._last_net
+            dt = ts - last_ts
+            if dt > 0:
+                # Counters can reset (interface restart); clamp negative deltas to 0
+                sent_rate = max(0, snapshot.net_bytes_sent - last_sent) / dt / 1024
+                recv_rate = max(0, snapshot.net_bytes_recv - last_recv) / dt / 1024
+        self._last_net = (ts, snapshot.net_bytes_sent, snapshot.net_bytes_recv)
+
+        values = {
+            "cpu": snapshot.cpu_percent,
+            "ram": snapshot.ram_percent,
+            "disk": snapshot.disk_percent,
+            "net_sent": sent_rate,
+            "net_recv": recv_rate,
+        }
+        with self._lock:
+            for tier in self._tiers:
+                tier.add(ts, values)
+
+    def query(self, metric: str, window_seconds: float) -> Tuple[str, List[Tuple[float, float, float, float]]]:
+        """
+        Rows covering the last `window_seconds` from the finest tier that spans it.
+        Returns (tier name, [(ts, min, avg, max), ...]).
+        """
+        if metric not in METRICS:
+            raise KeyError(metric)
+        since = time.time() - window_seconds
+        with self._lock:
+            tier = next((t for t in self._tiers if t.span >= window_seconds), self._tiers[-1])
+            return tier.name, tier.rows(metric, since)
+
+    def summary(self, metric: str, window_seconds: float) -> Optional[dict]:
+        """min/avg/max, percentiles and linear trend over the window, or None without data"""
+        tier, rows = self.query(metric, window_seconds)
+        if not rows:
+            return None
+
+        avgs = sorted(r[2] for r in rows)
+        first_ts = rows[0][0]
+        slope = _slope([r[0] - first_ts for r in rows], [r[2] for r in rows])
+        return {
+            "metric": metric,
+            "unit": METRICS[metric],
+            "tier": tier,
+            "points": len(rows),
+            "covered_seconds": rows[-1][0] - first_ts,
+            "min": min(r[1] for r in rows),
+            "avg": sum(avgs) / len(avgs),
+            "max": max(r[3] for r in rows),
+            "p50": _percentile(avgs, 50),
+            "p95": _percentile(avgs, 95),
+            "latest": rows[-1][2],
+            "slope_per_hour": slope * 3600,
+        }
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _slope(xs: List[float], ys: List[float]) -> float:
+    """Least-squares slope (units per second)"""
+    n = len(xs)
+    if n < 2:
+        return 0.0
+    mean_x = sum(xs) / n
+    mean_y = sum(ys) / n
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    if var_x == 0:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x
+
+
+# Global instance, attached to the shared sampler on first use
+_history: Optional[MetricsHistory] = None
+_history_lock = threading.Lock()
+
+
+def get_history() -> MetricsHistory:
+    """Return the shared history, subscribing it to the sampler on first use"""
+    global _history
+
+    if _history is None:
+        with _history_lock:
+            if _history is None:
+                from vyaas_metrics_sampler import get_sampler
+                history = MetricsHistory()
+                get_sampler().add_listener(history.record)
+                _history = history
+                logger.info(f"Metrics history recording ({history.nbytes() / 1024:.0f} KB preallocated)")
+    return _history
@@ -0,0 +1,274 @@
+"""
+VYAAS AI - System Metrics Sampler
+Samples CPU, RAM, disk, network, battery and top processes on a dedicated thread.
+
+psutil.Process handles are kept across ticks, so per-process cpu_percent is a
+real delta between two samples instead of the 0.0 a fresh handle reports.
+Only the top-N processes (bounded heap) get their memory usage read.
+
+Readers never block: each tick builds an immutable SystemSnapshot and swaps the
+reference, so latest() is a plain attribute read from any thread or event loop.
+"""
+
+import heapq
+import logging
+import os
+import threading
+import time
+from typing import Dict, NamedTuple, Optional, Tuple
+
+import termux_compatibility as termux
+
+logger = logging.getLogger("vyaas_metrics_sampler")
+logger.setLevel(logging.INFO)
+
+SAMPLE_INTERVAL = 2.0  # seconds
+TOP_N = 10  # Tools may ask for up to 10; the room broadcast uses the first 5
+
+
+class ProcessSample(NamedTuple):
+    pid: int
+    name: str
+    cpu_percent: float     # Normalized by core count (0-100)
+    memory_percent: float
+
+
+class SystemSnapshot(NamedTuple):
+    seq: int
+    timestamp: float       # time.time() of the sample
+    monotonic: float       # time.monotonic() of the sample, for age()
+    cpu_percent: float
+    cpu_count: int
+    ram_percent: float
+    ram_used: int
+    ram_total: int
+    ram_available: int
+    disk_path: str
+    disk_percent: float
+    disk_used: int
+    disk_total: int
+    disk_free: int
+    net_bytes_sent: int
+    net_bytes_recv: int
+    battery_percent: Optional[float]
+    battery_plugged: Optional[bool]
+    battery_secsleft: Optional[int]
+    top_processes: Tuple[ProcessSample, ...]
+
+    def age(self) -> float:
+        """Seconds since this snapshot was taken"""
+        return time.monotonic() - self.monotonic
+
+
+def default_disk_path() -> str:
+    if termux.is_android():
+        # Check internal storage on Android
+        return '/data/data/com.termux/files/home'
+    if os.name == 'nt':
+        return 'C:/'
+    return '/'
+
+
+class SystemSampler(threading.Thread):
+    """Background sampler thread. Use get_sampler() for the shared instance."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL, top_n: int = TOP_N, disk_path: Optional[str] = None):
+        super().__init__(name="vyaas-metrics-sampler", daemon=True)
+        self.interval = interval
+        self.top_n = top_n
+        self.disk_path = disk_path or default_disk_path()
+
+        # pid -> (Process handle, name); reused across ticks so cpu_percent deltas are valid
+        self._procs: Dict[int, tuple] = {}
+        self._snapshot: Optional[SystemSnapshot] = None
+        self._seq = 0
+        self._stop_event = threading.Event()
+        self._wake = threading.Event()
+        self._first_sample = threading.Event()
+        self._sampled = threading.Condition()
+        self._listeners = []
+
+    # ============== READ API (lock-free) ==============
+
+    def latest(self) -> Optional[SystemSnapshot]:
+        """Most recent snapshot, or None before the first tick completes"""
+        return self._snapshot
+
+    def wait_first(self, timeout: float = 3.0) -> Optional[SystemSnapshot]:
+        """Block (in a worker thread) until the first snapshot exists"""
+        self._first_sample.wait(timeout)
+        return self._snapshot
+
+    def fresh(self, max_age: float, timeout: float = 3.0) -> Optional[SystemSnapshot]:
+        """
+        Block (in a worker thread) until a snapshot at most `max_age` seconds old exists,
+        sampling right away if the current one is older (e.g. at the idle cadence).
+        Returns the newest snapshot, possibly older than max_age if the timeout ran out.
+        """
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.age() <= max_age:
+            return snapshot
+        seq = snapshot.seq if snapshot is not None else 0
+        self._wake.set()
+        with self._sampled:
+            self._sampled.wait_for(lambda: self._snapshot is not None and self._snapshot.seq != seq, timeout)
+        return self._snapshot
+
+    def add_listener(self, callback):
+        """
+        Call callback(snapshot) on the sampler thread after every tick.
+        Listeners must be quick and thread-safe (e.g. append to a buffer).
+        """
+        self._listeners.append(callback)
+
+    # ============== SAMPLER THREAD ==============
+
+    def set_interval(self, interval: float):
+        """
+        Change the sampling cadence (e.g. slow down while nobody watches).
+        Speeding up takes a sample right away instead of finishing the slow wait.
+        """
+        if interval == self.interval:
+            return
+        speeding_up = interval < self.interval
+        self.interval = interval
+        logger.info(f"Sampler interval set to {interval}s")
+        if speeding_up:
+            self._wake.set()
+
+    def stop(self):
+        self._stop_event.set()
+        self._wake.set()
+
+    def run(self):
+        import psutil
+
+        # Prime the system-wide counter; the first real reading comes one interval later
+        psutil.cpu_percent(interval=None)
+        self._refresh_process_handles(psutil)
+
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                snapshot = self._sample(psutil)
+            except Exception as e:
+                logger.error(f"Sampler tick failed: {e}")
+                continue
+            with self._sampled:
+                self._snapshot = snapshot
+                self._sampled.notify_all()
+            self._first_sample.set()
+
+            for callback in self._listeners:
+                try:
+                    callback(snapshot)
+                except Exception as e:
+                    logger.error(f"Sampler listener failed: {e}")
+
+    def _refresh_process_handles(self, psutil):
+        """Drop handles of exited processes and prime handles for new ones"""
+        current = set(psutil.pids())
+        for pid in list(self._procs):
+            if pid not in current:
+                del self._procs[pid]
+
+        for pid in current:
+            if pid in self._procs:
+                continue
+            try:
+                proc = psutil.Process(pid)
+                proc.cpu_percent(interval=None)  # Prime: first call always returns 0.0
+                self._procs[pid] = (proc, proc.name())
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                pass
+
+    def _iter_process_cpu(self, psutil):
+        for pid, (proc, _name) in list(self._procs.items()):
+            try:
+                yield proc.cpu_percent(interval=None), pid
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                self._procs.pop(pid, None)
+
+    def _sample(self, psutil) -> SystemSnapshot:
+        cpu_percent = psutil.cpu_percent(interval=None)
+        cpu_count = psutil.cpu_count() or 1
+        ram = psutil.virtual_memory()
+        disk = psutil.disk_usage(self.disk_path)
+        net = psutil.net_io_counters()
+        try:
+            battery = psutil.sensors_battery()
+        except Exception:
+            battery = None
+
+        # Read CPU deltas from the handles primed last tick, then pick up new processes
+        top = heapq.nlargest(self.top_n, self._iter_process_cpu(psutil))
+        self._refresh_process_handles(psutil)
+
+        top_processes = []
+        for raw_cpu, pid in top:
+            entry = self._procs.get(pid)
+            if entry is None:
+                continue
+            proc, name = entry
+            try:
+                memory_percent = proc.memory_percent()
+            except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
+                continue
+            top_processes.append(ProcessSample(
+                pid=pid,
+                name=name,
+                # Normalize CPU usage by core count to keep it under 100%
+                cpu_percent=round(raw_cpu / cpu_count, 1),
+                memory_percent=round(memory_percent, 1),
+            ))
+
+        self._seq += 1
+        return SystemSnapshot(
+            seq=self._seq,
+            timestamp=time.time(),
+            monotonic=time.monotonic(),
+            cpu_percent=cpu_percent,
+            cpu_count=cpu_count,
+            ram_percent=ram.percent,
+            ram_used=ram.used,
+            ram_total=ram.total,
+            ram_available=ram.available,
+            disk_path=self.disk_path,
+            disk_percent=disk.percent,
+            disk_used=disk.used,
+            disk_total=disk.total,
+            disk_free=disk.free,
+            net_bytes_sent=net.bytes_sent,
+            net_bytes_recv=net.bytes_recv,
+            battery_percent=battery.percent if battery else None,
+            battery_plugged=battery.power_plugged if battery else None,
+            battery_secsleft=battery.secsleft if battery else None,
+            top_processes=tuple(top_processes),
+        )
+
+
+# Global instance (one sampler per worker process)
+_sampler: Optional[SystemSampler] = None
+_sampler_lock = threading.Lock()
+
+
+def get_sampler() -> SystemSampler:
+    """Return the shared sampler, starting it on first use"""
+    global _sampler
+
+    if _sampler is None:
+        with _sampler_lock:
+            if _sampler is None:
+                sampler = SystemSampler()
+                sampler.start()
+                _sampler = sampler
+                logger.info(f"System sampler started (every {sampler.interval}s, disk {sampler.disk_path})")
+    return _sampler
+
+
+def latest_snapshot() -> Optional[SystemSnapshot]:
+    """Lock-free read of the latest snapshot (starts the sampler if needed)"""
+    return get_sampler().latest()
@@ -0,0 +1,106 @@
+"""
+VYAAS AI - Metrics Subscribers
+Tracks which room participants actually consume `system_metrics` packets.
+
+Frontends opt in with a data message on the `metrics_control` topic:
+
+    {"type": "metrics_subscribe"}      # UI visible, start streaming
+    {"type": "metrics_unsubscribe"}    # UI backgrounded / dashboard closed
+
+A participant that leaves the room is dropped automatically, and the desktop
+bridge is never counted. While nobody is subscribed the monitor loop stops
+publishing and the sampler drops to IDLE_INTERVAL, which matters on Termux
+where every wakeup costs battery (tools sample on demand, see
+SystemSampler.fresh).
+
+Frontends that predate metrics_subscribe never send it: until some
+participant in the session does (`negotiated`), metrics stream to the room
+in the v1 format whenever anyone besides the bridge is connected.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional, Set
+
+logger = logging.getLogger("vyaas_metrics_subscribers")
+logger.setLevel(logging.INFO)
+
+CONTROL_TOPIC = "metrics_control"
+
+# Sampling cadence while no frontend is subscribed (seconds)
+IDLE_INTERVAL = float(os.getenv("VYAAS_IDLE_SAMPLE_INTERVAL", "30"))
+
+# Participants that never consume metrics (must match vyaas_desktop_bridge.BRIDGE_IDENTITY)
+IGNORED_IDENTITIES = {"vyaas_desktop_bridge"}
+
+
+class MetricsSubscribers:
+    """Subscriber set for one room. Driven from the event loop (room callbacks + monitor task)."""
+
+    def __init__(self):
+        self._identities: Set[str] = set()
+        self._changed = asyncio.Event()
+        self._new_subscriber = False
+        self.negotiated = False  # Some participant has sent metrics_control
+
+    @property
+    def active(self) -> bool:
+        return bool(self._identities)
+
+    def streaming(self, room) -> bool:
+        """Publish metrics now? Subscribed frontends, or legacy ones until a frontend negotiates."""
+        if self._identities:
+            return True
+        return not self.negotiated and any(
+            p.identity not in IGNORED_IDENTITIES for p in room.remote_participants.values()
+        )
+
+    def participant_joined(self, identity: Optional[str]):
+        """A legacy frontend that just joined needs a keyframe without subscribing"""
+        if not self.negotiated and identity and identity not in IGNORED_IDENTITIES:
+            self._new_subscriber = True
+            self._changed.set()
+
+    def __len__(self) -> int:
+        return len(self._identities)
+
+    def handle_control(self, identity: Optional[str], data: dict) -> bool:
+        """Apply a metrics_control message. Returns False if it was not one."""
+        msg_type = data.get("type")
+        if msg_type == "metrics_subscribe":
+            self.add(identity)
+        elif msg_type == "metrics_unsubscribe":
+            self.remove(identity)
+        else:
+            return False
+        self.negotiated = True
+        return True
+
+    def add(self, identity: Optional[str]):
+        if not identity or identity in IGNORED_IDENTITIES or identity in self._identities:
+            return
+        self._identities.add(identity)
+        self._new_subscriber = True
+        logger.info(f"Metrics subscriber joined: {identity} ({len(self._identities)} active)")
+        self._changed.set()
+
+    def remove(self, identity: Optional[str]):
+        if identity not in self._identities:
+            return
+        self._identities.discard(identity)
+        logger.info(f"Metrics subscriber left: {identity} ({len(self._identities)} active)")
+        self._changed.set()
+
+    def take_new_subscriber(self) -> bool:
+        """True once after someone subscribed (they need a keyframe)"""
+        new, self._new_subscriber = self._new_subscriber, False
+        return new
+
+    async def wait_changed(self, timeout: float):
+        """Sleep up to `timeout` seconds, waking early when the subscriber set changes"""
+        try:
+            await asyncio.wait_for(self._changed.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._changed.clear()
@@ -8,12 +8,16 @@ import subprocess
 import os
 import logging
 from livekit.agents import function_tool
+from vyaas_executor import offload
+from vyaas_tool_scheduler import uses
 import termux_compatibility as termux
 
 logger = logging.getLogger("vyaas_music")
 logger.setLevel(logging.INFO)
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def play_spotify(query: str = "") -> str:
     """
     Open Spotify and optionally search/play something.
@@ -57,6 +61,8 @@ async def play_spotify(query: str = "") -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def play_youtube_music(query: str) -> str:
     """
     Open YouTube Music with a search query.
@@ -90,6 +96,8 @@ async def play_youtube_music(query: str) -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def play_pause_media() -> str:
     """
     Press play/pause media key to control current media.
@@ -117,6 +125,8 @@ async def play_pause_media() -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def next_track() -> str:
     """
     Skip to next track in current media player.
@@ -143,6 +153,8 @@ async def next_track() -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def previous_track() -> str:
     """
     Go to previous track in current media player.
@@ -169,6 +181,8 @@ async def previous_track() -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def stop_media() -> str:
     """
     Stop current media playback.
@@ -195,6 +209,8 @@ async def stop_media() -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def open_music_app(app_name: str = "spotify") -> str:
     """
     Open a specific music application.
@@ -250,6 +266,8 @@ async def open_music_app(app_name: str = "spotify") -> str:
         return f"Error: {str(e)}"
 
 @function_tool()
+@uses("media")
+@offload("subprocess")
 async def search_song(query: str, platform: str = "youtube") -> str:
     """
     Search for a song on specified platform.
@@ -0,0 +1,94 @@
+"""
+VYAAS AI - Cross-Process State Files
+LiveKit runs each job in its own worker process, while the health server runs
+in the main process. Job processes publish small JSON documents here and the
+health server collects them.
+
+    publish("breakers", [...])        # in a job process: <dir>/breakers-<pid>.json
+    collect("breakers")               # in the main process: {pid: [...], ...}
+
+Files are replaced atomically, removed at process exit, and ignored when the
+owning process is gone.
+"""
+
+import atexit
+import json
+import logging
+import os
+import tempfile
+from typing import Dict
+
+logger = logging.getLogger("vyaas_process_state")
+logger.setLevel(logging.INFO)
+
+STATE_DIR = os.getenv("VYAAS_STATE_DIR", os.path.join(tempfile.gettempdir(), "vyaas-state"))
+
+_published = set()
+
+
+def _path(kind: str, pid: int) -> str:
+    return os.path.join(STATE_DIR, f"{kind}-{pid}.json")
+
+
+def _cleanup():
+    for path in _published:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def publish(kind: str, data):
+    """Replace this process's `kind` document"""
+    path = _path(kind, os.getpid())
+    try:
+        os.makedirs(STATE_DIR, exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp, path)
+    except OSError as e:
+        logger.error(f"Could not publish {kind} state: {e}")
+        return
+    if not _published:
+        atexit.register(_cleanup)
+    _published.add(path)
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        import psutil
+        return psutil.pid_exists(pid)
+    except ImportError:
+        return True
+
+
+def collect(kind: str) -> Dict[int, object]:
+    """`kind` documents of every live process, including this one"""
+    out = {}
+    try:
+        names = os.listdir(STATE_DIR)
+    except OSError:
+        return out
+
+    prefix, suffix = f"{kind}-", ".json"
+    for name in names:
+        if not (name.startswith(prefix) and name.endswith(suffix)):
+            continue
+        try:
+            pid = int(name[len(prefix):-len(suffix)])
+        except ValueError:
+            continue
+        path = os.path.join(STATE_DIR, name)
+        if not _pid_alive(pid):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            continue
+        try:
+            with open(path, encoding="utf-8") as f:
+                out[pid] = json.load(f)
+        except (OSError, ValueError):
+            continue
+    return out
@@ -0,0 +1,194 @@
+"""
+VYAAS AI - Sampling Profiler
+On-demand wall-clock profiler for the agent worker, for stutter that only shows up in production.
+
+While active, a thread samples every thread's stack with sys._current_frames()
+every INTERVAL and counts identical stacks. After the requested number of
+seconds it writes, tagged with the session:
+
+    <PROFILE_DIR>/vyaas-profile-<session>-<time>.collapsed   flamegraph.pl / speedscope input
+    <PROFILE_DIR>/vyaas-profile-<session>-<time>.svg         self-contained flamegraph
+
+Stacks are rooted at the thread name, so the event loop thread ("loop") can be
+told apart from executor workers. Triggers:
+
+    VYAAS_PROFILE_SECONDS=30                     profile the first 30 s of every session
+    {"type": "profile_start", "seconds": 30}     data message on PROFILER_TOPIC, during a session,
+                                                 from the desktop bridge or an identity in
+                                                 VYAAS_PROFILE_SENDERS (comma-separated)
+
+Nothing runs unless triggered: when disabled there is no thread, hook or sampling.
+"""
+
+import html
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from typing import Dict, Optional
+
+logger = logging.getLogger("vyaas_profiler")
+logger.setLevel(logging.INFO)
+
+PROFILER_TOPIC = "profiler_control"
+PROFILE_DIR = os.getenv("VYAAS_PROFILE_DIR", os.path.join(tempfile.gettempdir(), "vyaas-profiles"))
+SESSION_SECONDS = float(os.getenv("VYAAS_PROFILE_SECONDS", "0"))
+INTERVAL = float(os.getenv("VYAAS_PROFILE_INTERVAL_MS", "10")) / 1000
+MAX_SECONDS = 300.0
+
+# Participants (besides desktop bridges) allowed to start a profile over the data channel
+TRUSTED_SENDERS = {s.strip() for s in os.getenv("VYAAS_PROFILE_SENDERS", "").split(",") if s.strip()}
+MAX_DEPTH = 64
+
+# Flamegraph layout
+SVG_WIDTH = 1200
+ROW_HEIGHT = 16
+
+
+class SamplingProfiler(threading.Thread):
+    def __init__(self, seconds: float, tag: str, interval: float = INTERVAL):
+        super().__init__(name="vyaas-profiler", daemon=True)
+        self.seconds = seconds
+        self.tag = tag
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.output: Optional[str] = None
+        self._loop_thread_id = threading.get_ident()  # Started from the loop thread
+
+    def run(self):
+        own_id = threading.get_ident()
+        deadline = time.monotonic() + self.seconds
+        while time.monotonic() < deadline:
+            names = {t.ident: t.name for t in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                root = "loop" if thread_id == self._loop_thread_id else names.get(thread_id, f"thread-{thread_id}")
+                self.stacks[self._collapse(root, frame)] += 1
+            del frame
+            self.samples += 1
+            time.sleep(self.interval)
+
+        try:
+            self.output = self._write()
+            logger.info(f"Profile written: {self.output}.{{collapsed,svg}} ({self.samples} samples)")
+        except OSError as e:
+            logger.error(f"Could not write profile: {e}")
+
+    @staticmethod
+    def _collapse(root: str, frame) -> str:
+        names = []
+        while frame is not None and len(names) < MAX_DEPTH:
+            code = frame.f_code
+            names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+            frame = frame.f_back
+        names.append(root)
+        return ";".join(reversed(names))
+
+    def _write(self) -> str:
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe_tag = re.sub(r"[^A-Za-z0-9_.-]+", "_", self.tag)[:64]
+        base = os.path.join(PROFILE_DIR, f"vyaas-profile-{safe_tag}-{time.strftime('%Y%m%d-%H%M%S')}")
+        with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+            for stack, count in self.stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(f"{base}.svg", "w", encoding="utf-8") as f:
+            f.write(render_flamegraph(self.stacks, f"VYAAS {self.tag} ({self.samples} samples, {self.seconds:.0f}s)"))
+        return base
+
+
+# ============== FLAMEGRAPH ==============
+
+def _build_tree(stacks: Counter) -> dict:
+    root = {"count": 0, "children": {}}
+    for stack, count in stacks.items():
+        node = root
+        node["count"] += count
+        for name in stack.split(";"):
+            node = node["children"].setdefault(name, {"count": 0, "children": {}})
+            node["count"] += count
+    return root
+
+
+def _color(name: str) -> str:
+    # Stable warm colour per function, as in classic flamegraphs
+    h = sum(ord(c) for c in name)
+    return f"rgb({205 + h % 50},{(h * 7) % 180},{(h * 13) % 55})"
+
+
+def render_flamegraph(stacks: Counter, title: str) -> str:
+    """Self-contained SVG flamegraph (hover a frame for its sample count)"""
+    tree = _build_tree(stacks)
+    total = tree["count"] or 1
+    rects = []
+    max_depth = 0
+
+    def walk(node: dict, x: float, depth: int):
+        nonlocal max_depth
+        for name, child in sorted(node["children"].items()):
+            width = child["count"] / total * SVG_WIDTH
+            if width >= 0.5:  # Narrower frames would be invisible anyway
+                max_depth = max(max_depth, depth)
+                rects.append((name, child["count"], x, depth, width))
+                walk(child, x, depth + 1)
+            x += width
+
+    walk(tree, 0.0, 0)
+    height = (max_depth + 1) * ROW_HEIGHT + 40
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{SVG_WIDTH}" height="{height}" font-family="monospace" font-size="11">',
+        f'<text x="4" y="16" font-size="14">{html.escape(title)}</text>',
+    ]
+    for name, count, x, depth, width in rects:
+        y = height - (depth + 1) * ROW_HEIGHT
+        label = html.escape(name)
+        text = html.escape(name[:int(width / 7)]) if width > 21 else ""
+        out.append(
+            f'<g><title>{label} ({count} samples, {count / total * 100:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" height="{ROW_HEIGHT - 1}" fill="{_color(name)}"/>'
+            f'<text x="{x + 2:.1f}" y="{y + ROW_HEIGHT - 4}">{text}</text></g>'
+        )
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+# ============== TRIGGERS ==============
+
+_active: Optional[SamplingProfiler] = None
+
+
+def start_profile(seconds: float, tag: str) -> Optional[SamplingProfiler]:
+    """Profile this process for `seconds` (call from the loop thread). None if one is already running."""
+    global _active
+
+    if _active is not None and _active.is_alive():
+        logger.warning("Profiler already running, ignoring request")
+        return None
+    seconds = max(1.0, min(float(seconds), MAX_SECONDS))
+    _active = SamplingProfiler(seconds, tag)
+    _active.start()
+    logger.info(f"Profiling {tag} for {seconds:.0f}s (every {_active.interval * 1000:.0f} ms)")
+    return _active
+
+
+def start_session_profile(tag: str):
+    """Profile the start of the session if VYAAS_PROFILE_SECONDS is set"""
+    if SESSION_SECONDS > 0:
+        start_profile(SESSION_SECONDS, tag)
+
+
+def handle_control(data: Dict, tag: str):
+    """Data-message trigger: {"type": "profile_start", "seconds": N}"""
+    if data.get("type") != "profile_start":
+        return
+    try:
+        seconds = float(data.get("seconds", 30))
+    except (TypeError, ValueError):
+        logger.warning(f"Bad profile request: {data}")
+        return
+    start_profile(seconds, tag)
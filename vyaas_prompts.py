@@ -1,16 +1,33 @@
+"""
+VYAAS AI - Prompt Builder
+Static system prompt plus a per-session dynamic context block.
+
+The static prompt is a plain string available at import time. The date/weather
+block is assembled per session from a TTL cache that is refreshed in the
+background, so importing this module never touches the network.
+"""
+
 import asyncio
+import logging
+import time
+from typing import Optional
+
 from vyaas_google_search import get_current_datetime
-from vyaas_get_weather import get_weather
+from vyaas_get_weather import fetch_weather, is_weather_report
+
+logger = logging.getLogger("vyaas_prompts")
+logger.setLevel(logging.INFO)
 
 # ✅ Fixed City = Kaushambi (no IP detection)
 CITY = "Kaushambi"
 
-async def load_prompts_async():
-    current_datetime = await get_current_datetime()
-    weather = await get_weather(CITY)
+# Seconds a fetched weather report stays fresh before a background refresh is scheduled
+CONTEXT_TTL = 15 * 60
+# Used in the dynamic block until the first weather fetch completes
+WEATHER_PENDING = "abhi update ho raha hai"
 
-    # --- MAHA SYSTEM PROMPT (The Constitution of Vyaas AI) ---
-    instructions_prompt = f'''
+# --- MAHA SYSTEM PROMPT (The Constitution of Vyaas AI) ---
+instructions_prompt = '''
 # VYAAS AI SYSTEM PROMPT - VERSION: ULTIMATE_MAHA_PROTOCOL
 # CREATED BY: THE GENIUS, MAHESHWAR HARI TRIPAATHI
 # TOTAL LINES: 800+ (Simulated Depth)
@@ -271,6 +288,9 @@ async def load_prompts_async():
 # - `lock_pc_local()` - Locks Bhaiya's PC
 # - `shutdown_pc_local(delay)` - Schedules PC shutdown
 # - `cancel_shutdown_local()` - Cancels shutdown
+# - `run_desktop_macro(steps)` - Runs several of the above in ONE call (e.g. open notepad, type, ctrl+s)
+#
+# **MULTI-STEP TASKS:** For 2+ PC actions in a row, use ONE `run_desktop_macro` call, not separate tools.
 #
 # **IMPORTANT:** Always prefer `_local` tools for app opening and automation.
 # If Desktop Bridge is not running, you'll get an error - inform Bhaiya to start it.
@@ -288,16 +308,18 @@ async def load_prompts_async():
 # JAI HIND. 🇮🇳
 
 # --- END OF MAHA SYSTEM PROMPT ---
+'''
 
+_DYNAMIC_CONTEXT_TEMPLATE = '''
 # 🌍 DYNAMIC CONTEXT INJECTION
 # ==============================================================================
 # Date & Time: {current_datetime}
-# Current Location: {CITY}
+# Current Location: {city}
 # Weather Status: {weather}
 # ==============================================================================
 '''
 
-    Reply_prompts = f"""
+_REPLY_TEMPLATE = """
 STRICT INSTRUCTION - DO NOT DEVIATE:
 You have JUST connected to the room. This is your FIRST interaction. 
 DO NOT ask what the user typed. DO NOT ask about dots or messages.
@@ -305,16 +327,101 @@ DO NOT say "kuch kaam hai kya" or "timepass kar rahe ho".
 
 SPEAK THIS EXACT GREETING NOW (word for word, in Hinglish voice):
 
-"Namaste Bhaiya! Main hoon Vyaas — Aapka chhota bhai aur personal AI Assistant! Maheshwar ji ne mujhe banaya hai. Bataiye Bhaiya, aaj kya plan hai? Waise aaj {CITY} mein mausam {weather} hai!"
+"Namaste Bhaiya! Main hoon Vyaas — Aapka chhota bhai aur personal AI Assistant! Maheshwar ji ne mujhe banaya hai. Bataiye Bhaiya, aaj kya plan hai? Waise aaj {city} mein mausam {weather} hai!"
 
 This is a GREETING, not a response to any message. Just say the greeting above.
 """
-    return instructions_prompt, Reply_prompts
 
 
-def load_prompts():
-    return asyncio.run(load_prompts_async())
+# ============== DYNAMIC CONTEXT CACHE ==============
+
+_context = {
+    "weather": None,
+    "fetched_at": 0.0,
+}
+_refresh_task: Optional[asyncio.Task] = None
+
+
+def _is_stale() -> bool:
+    return time.monotonic() - _context["fetched_at"] > CONTEXT_TTL
+
+
+def _store_weather(weather: str) -> None:
+    if not is_weather_report(weather):
+        # Keep the previous report (and its age), so the next session retries
+        logger.warning(f"Weather unavailable for prompt context: {weather}")
+        return
+    _context["weather"] = weather
+    _context["fetched_at"] = time.monotonic()
+    logger.info("Prompt context refreshed")
+
+
+async def refresh_context() -> None:
+    """Fetch weather (shared async HTTP client) and store it in the context cache"""
+    _store_weather(await fetch_weather(CITY))
+
+
+def load_context(timeout: float = 5.0) -> bool:
+    """Blocking variant of warm_context() for worker prewarm, before any event loop runs"""
+    return asyncio.run(warm_context(timeout))
+
+
+def _schedule_refresh() -> None:
+    """Start a background refresh if the cache is stale and none is in flight"""
+    global _refresh_task
+
+    if not _is_stale():
+        return
+    if _refresh_task and not _refresh_task.done():
+        return
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        return  # No loop yet; the next session build will schedule it
+    _refresh_task = loop.create_task(refresh_context())
+    _refresh_task.add_done_callback(_log_refresh_failure)
+
+
+def _log_refresh_failure(task: asyncio.Task) -> None:
+    if not task.cancelled() and task.exception():
+        logger.error(f"Prompt context refresh failed: {task.exception()}")
+
+
+async def warm_context(timeout: float = 5.0) -> bool:
+    """
+    Wait (bounded) for a fresh context, e.g. before the first greeting.
+    Returns True if cached weather is available afterwards.
+    """
+    _schedule_refresh()
+    if _refresh_task and not _refresh_task.done():
+        try:
+            await asyncio.wait_for(asyncio.shield(_refresh_task), timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Prompt context still loading, using cached values")
+        except Exception:
+            pass
+    return is_context_loaded()
+
+
+def is_context_loaded() -> bool:
+    return _context["weather"] is not None
+
+
+def _current_weather() -> str:
+    return _context["weather"] or WEATHER_PENDING
+
 
+def build_instructions() -> str:
+    """Static system prompt plus the current date/weather block. Never blocks."""
+    _schedule_refresh()
+    return instructions_prompt + _DYNAMIC_CONTEXT_TEMPLATE.format(
+        current_datetime=get_current_datetime(),
+        city=CITY,
+        weather=_current_weather(),
+    )
 
-instructions_prompt, Reply_prompts = load_prompts()
 
+def build_reply_prompt() -> str:
+    """Greeting instructions using the cached weather. Never blocks."""
+    _schedule_refresh()
+    return _REPLY_TEMPLATE.format(city=CITY, weather=_current_weather())
@@ -0,0 +1,242 @@
+"""
+VYAAS AI - Data Channel Publisher
+Single outbound queue per room, so telemetry bursts never delay bridge commands.
+
+Every publish goes through the room's RoomPublisher, which drains three
+priority lanes with one sender task:
+
+    CONTROL     local_commands                  always first
+    EVENTS      map_events, system_alert
+    TELEMETRY   system_metrics                  byte budget (TELEMETRY_BYTES_PER_SEC)
+
+TOPIC_POLICY picks each topic's lane and reliable/lossy delivery (callers can
+override reliability per message). A message with a coalesce_key replaces a
+queued, not yet sent message with the same key, so a backed-up lane only ever
+holds the newest metrics. Lanes are bounded; on overflow the oldest message is
+dropped. Queue depth, queue wait, coalesced, dropped and failed publishes are
+exported on /metrics (vyaas_telemetry).
+
+Each message stays one data packet: the frontend and the desktop bridge parse
+one JSON document per packet, so batching means size-budgeted draining rather
+than packing several messages into a packet.
+
+    publisher = get_publisher(room)
+    publisher.submit("system_metrics", payload, coalesce_key="metrics_delta")   # fire and forget
+    await publisher.send("local_commands", payload)                             # raises if not sent
+"""
+
+import asyncio
+import logging
+import os
+import time
+import weakref
+from collections import deque
+from typing import Dict, List, Optional
+
+from vyaas_telemetry import Counter, Gauge, Histogram, count_data, register
+
+logger = logging.getLogger("vyaas_publisher")
+logger.setLevel(logging.INFO)
+
+CONTROL = 0
+EVENTS = 1
+TELEMETRY = 2
+LANE_NAMES = ("control", "events", "telemetry")
+LANE_LIMITS = (256, 256, 64)
+
+# topic -> (lane, reliable)
+TOPIC_POLICY = {
+    "local_commands": (CONTROL, True),
+    "map_events": (EVENTS, True),
+    "system_alert": (EVENTS, True),
+    "system_metrics": (TELEMETRY, False),
+}
+DEFAULT_POLICY = (EVENTS, True)
+
+TELEMETRY_BYTES_PER_SEC = int(os.getenv("VYAAS_TELEMETRY_BYTES_PER_SEC", "16384"))
+MAX_PACKET_BYTES = 15 * 1024  # LiveKit's recommended ceiling for one data packet
+
+QUEUE_DEPTH = register(Gauge("vyaas_publisher_queue_depth", "Messages waiting to be published", ("lane",)))
+QUEUE_WAIT = register(Histogram("vyaas_publisher_wait_seconds", "Time from submit to publish", ("lane",),
+                                buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)))
+COALESCED = register(Counter("vyaas_publisher_coalesced_total", "Queued messages replaced by a newer one", ("topic",)))
+DROPPED = register(Counter("vyaas_publisher_dropped_total", "Messages dropped because their lane was full", ("topic",)))
+FAILED = register(Counter("vyaas_publisher_errors_total", "publish_data failures", ("topic",)))
+
+
+class PublishDropped(Exception):
+    """The message was dropped before it was sent (lane overflow or publisher closed)"""
+
+
+class _Message:
+    __slots__ = ("topic", "data", "reliable", "destinations", "coalesce_key", "lane", "queued_at", "future")
+
+    def __init__(self, topic, data, reliable, destinations, coalesce_key, lane, future):
+        self.topic = topic
+        self.data = data
+        self.reliable = reliable
+        self.destinations = destinations
+        self.coalesce_key = coalesce_key
+        self.lane = lane
+        self.queued_at = time.monotonic()
+        self.future = future
+
+
+class RoomPublisher:
+    def __init__(self, room):
+        self.room = room
+        self._lanes: List[deque] = [deque() for _ in LANE_NAMES]
+        self._wake = asyncio.Event()
+        self._tokens = float(TELEMETRY_BYTES_PER_SEC)
+        self._refilled_at = time.monotonic()
+        self._task: Optional[asyncio.Task] = None
+        self._closed = False
+
+    # ============== SUBMIT ==============
+
+    def submit(self, topic: str, payload, reliable: Optional[bool] = None,
+               coalesce_key: Optional[str] = None, destination_identities: Optional[List[str]] = None) -> asyncio.Future:
+        """Queue a message (call from the room's loop); the future resolves once it is published"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        if self._closed:
+            future.set_exception(PublishDropped("publisher closed"))
+            future.exception()
+            return future
+
+        data = payload.encode("utf-8") if isinstance(payload, str) else payload
+        if len(data) > MAX_PACKET_BYTES:
+            logger.warning(f"{topic} message is {len(data)} bytes, over the {MAX_PACKET_BYTES} byte packet ceiling")
+
+        lane, default_reliable = TOPIC_POLICY.get(topic, DEFAULT_POLICY)
+        message = _Message(topic, data, default_reliable if reliable is None else reliable,
+                           destination_identities or [], coalesce_key, lane, future)
+        queue = self._lanes[lane]
+
+        if coalesce_key is not None:
+            for i, queued in enumerate(queue):
+                if queued.coalesce_key == coalesce_key:
+                    # Keep the old slot (FIFO position), carry the newest content
+                    queue[i] = message
+                    message.queued_at = queued.queued_at
+                    if not queued.future.done():
+                        queued.future.set_result(False)
+                    COALESCED.inc(topic=topic)
+                    return future
+
+        if len(queue) >= LANE_LIMITS[lane]:
+            dropped = queue.popleft()
+            if not dropped.future.done():
+                dropped.future.set_exception(PublishDropped(f"{LANE_NAMES[lane]} lane full"))
+                dropped.future.exception()  # Mark retrieved: fire-and-forget callers never await it
+            DROPPED.inc(topic=dropped.topic)
+        queue.append(message)
+        QUEUE_DEPTH.set(len(queue), lane=LANE_NAMES[lane])
+
+        if self._task is None:
+            self._task = loop.create_task(self._run())
+        self._wake.set()
+        return future
+
+    async def send(self, topic: str, payload, **options) -> bool:
+        """Queue a message and wait until it is published (raises on failure)"""
+        return await self.submit(topic, payload, **options)
+
+    # ============== SENDER ==============
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(float(TELEMETRY_BYTES_PER_SEC), self._tokens + (now - self._refilled_at) * TELEMETRY_BYTES_PER_SEC)
+        self._refilled_at = now
+
+    def _next(self):
+        """(message, 0) for the highest-priority sendable message, or (None, seconds to wait)"""
+        for lane, queue in enumerate(self._lanes):
+            # The sender gave up (e.g. its tool timed out and reported failure): don't publish late
+            while queue and queue[0].future.cancelled():
+                queue.popleft()
+                QUEUE_DEPTH.set(len(queue), lane=LANE_NAMES[lane])
+            if not queue:
+                continue
+            if lane == TELEMETRY:
+                self._refill()
+                size = min(len(queue[0].data), TELEMETRY_BYTES_PER_SEC)
+                if self._tokens < size:
+                    return None, (size - self._tokens) / TELEMETRY_BYTES_PER_SEC
+                self._tokens -= size
+            message = queue.popleft()
+            QUEUE_DEPTH.set(len(queue), lane=LANE_NAMES[lane])
+            return message, 0.0
+        return None, None
+
+    async def _run(self):
+        while True:
+            message, wait = self._next()
+            if message is None:
+                self._wake.clear()
+                try:
+                    # A higher-priority submit wakes us before the telemetry budget refills
+                    await asyncio.wait_for(self._wake.wait(), wait)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            QUEUE_WAIT.observe(time.monotonic() - message.queued_at, lane=LANE_NAMES[message.lane])
+            try:
+                await self.room.local_participant.publish_data(
+                    message.data,
+                    reliable=message.reliable,
+                    topic=message.topic,
+                    destination_identities=message.destinations,
+                )
+            except asyncio.CancelledError:
+                if not message.future.done():
+                    message.future.set_exception(PublishDropped("publisher closed"))
+                raise
+            except Exception as e:
+                FAILED.inc(topic=message.topic)
+                logger.debug(f"Publishing {message.topic} failed: {e}")
+                if not message.future.done():
+                    message.future.set_exception(e)
+                    message.future.exception()
+                continue
+            count_data("out", message.topic, message.data)
+            if not message.future.done():
+                message.future.set_result(True)
+
+    async def close(self):
+        """Stop the sender; queued messages fail with PublishDropped"""
+        self._closed = True
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        for lane, queue in enumerate(self._lanes):
+            while queue:
+                message = queue.popleft()
+                if not message.future.done():
+                    message.future.set_exception(PublishDropped("publisher closed"))
+                    message.future.exception()
+            QUEUE_DEPTH.set(0, lane=LANE_NAMES[lane])
+
+    def stats(self) -> Dict[str, int]:
+        return {LANE_NAMES[lane]: len(queue) for lane, queue in enumerate(self._lanes)}
+
+
+# One publisher per room (a job process serves one room at a time)
+_publishers: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def get_publisher(room) -> RoomPublisher:
+    publisher = _publishers.get(room)
+    if publisher is None or publisher._closed:
+        publisher = _publishers[room] = RoomPublisher(room)
+    return publisher
+
+
+async def close_publisher(room):
+    publisher = _publishers.pop(room, None)
+    if publisher is not None:
+        await publisher.close()
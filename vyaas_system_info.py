@@ -1,14 +1,43 @@
 """
 VYAAS AI - System Info Module
 Get system information like CPU, RAM, Battery, Disk usage
+
+All tools answer from the shared sampler snapshot (vyaas_metrics_sampler)
+instead of querying psutil inline, so they respond instantly and never block
+the event loop. Every answer states how old the numbers are.
 """
 
+import asyncio
 import logging
+from typing import Optional
 from livekit.agents import function_tool
+from vyaas_metrics_sampler import SystemSnapshot, get_sampler
 
 logger = logging.getLogger("vyaas_system_info")
 logger.setLevel(logging.INFO)
 
+# How long a tool may wait for the very first sample after the sampler starts
+FIRST_SAMPLE_TIMEOUT = 3.0
+# Older snapshots (the sampler idles at 30 s while no frontend watches) trigger a fresh sample
+MAX_SNAPSHOT_AGE = 5.0
+
+NO_DATA = "System metrics abhi available nahi hain (sampler starting). Thodi der mein try karo."
+
+
+async def _get_snapshot() -> Optional[SystemSnapshot]:
+    """Latest snapshot; only waits if there is none yet or it is older than MAX_SNAPSHOT_AGE"""
+    import psutil  # Surface a missing psutil as ImportError to the calling tool
+    sampler = get_sampler()
+    snapshot = sampler.latest()
+    if snapshot is None or snapshot.age() > MAX_SNAPSHOT_AGE:
+        snapshot = await asyncio.to_thread(sampler.fresh, MAX_SNAPSHOT_AGE, FIRST_SAMPLE_TIMEOUT)
+    return snapshot
+
+
+def _age(snapshot: SystemSnapshot) -> str:
+    return f"Data age: {snapshot.age():.1f}s"
+
+
 @function_tool()
 async def get_system_info() -> str:
     """
@@ -17,30 +46,28 @@ async def get_system_info() -> str:
         Comprehensive system status report
     """
     try:
-        import psutil
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
         
         # CPU
-        cpu_percent = psutil.cpu_percent(interval=1)
-        cpu_count = psutil.cpu_count()
+        cpu_percent = snapshot.cpu_percent
+        cpu_count = snapshot.cpu_count
         
         # RAM
-        ram = psutil.virtual_memory()
-        ram_used_gb = ram.used / (1024**3)
-        ram_total_gb = ram.total / (1024**3)
-        ram_percent = ram.percent
+        ram_used_gb = snapshot.ram_used / (1024**3)
+        ram_total_gb = snapshot.ram_total / (1024**3)
+        ram_percent = snapshot.ram_percent
         
-        # Disk - Use C: on Windows
-        disk = psutil.disk_usage('C:/')
-        disk_used_gb = disk.used / (1024**3)
-        disk_total_gb = disk.total / (1024**3)
-        disk_percent = disk.percent
+        # Disk
+        disk_used_gb = snapshot.disk_used / (1024**3)
+        disk_total_gb = snapshot.disk_total / (1024**3)
+        disk_percent = snapshot.disk_percent
         
         # Battery
-        battery = psutil.sensors_battery()
-        if battery:
-            battery_percent = battery.percent
-            battery_charging = "Charging" if battery.power_plugged else "Not Charging"
-            battery_info = f"Battery: {battery_percent}% ({battery_charging})"
+        if snapshot.battery_percent is not None:
+            battery_charging = "Charging" if snapshot.battery_plugged else "Not Charging"
+            battery_info = f"Battery: {snapshot.battery_percent}% ({battery_charging})"
         else:
             battery_info = "Battery: Desktop PC (No battery)"
         
@@ -50,6 +77,7 @@ System Status:
 - RAM: {ram_used_gb:.1f}GB / {ram_total_gb:.1f}GB ({ram_percent}%)
 - Disk: {disk_used_gb:.0f}GB / {disk_total_gb:.0f}GB ({disk_percent}%)
 - {battery_info}
+- {_age(snapshot)}
 """
         return report.strip()
     except ImportError:
@@ -66,9 +94,10 @@ async def get_cpu_usage() -> str:
         CPU usage percentage
     """
     try:
-        import psutil
-        cpu_percent = psutil.cpu_percent(interval=1)
-        return f"CPU usage: {cpu_percent}%"
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
+        return f"CPU usage: {snapshot.cpu_percent}% ({_age(snapshot)})"
     except ImportError:
         return "psutil not installed"
     except Exception as e:
@@ -82,12 +111,13 @@ async def get_ram_usage() -> str:
         RAM usage details
     """
     try:
-        import psutil
-        ram = psutil.virtual_memory()
-        used_gb = ram.used / (1024**3)
-        total_gb = ram.total / (1024**3)
-        available_gb = ram.available / (1024**3)
-        return f"RAM: {used_gb:.1f}GB used / {total_gb:.1f}GB total ({ram.percent}%). Available: {available_gb:.1f}GB"
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
+        used_gb = snapshot.ram_used / (1024**3)
+        total_gb = snapshot.ram_total / (1024**3)
+        available_gb = snapshot.ram_available / (1024**3)
+        return f"RAM: {used_gb:.1f}GB used / {total_gb:.1f}GB total ({snapshot.ram_percent}%). Available: {available_gb:.1f}GB ({_age(snapshot)})"
     except ImportError:
         return "psutil not installed"
     except Exception as e:
@@ -101,16 +131,18 @@ async def get_battery_status() -> str:
         Battery percentage and charging status
     """
     try:
-        import psutil
-        battery = psutil.sensors_battery()
-        if battery:
-            status = "Charging ⚡" if battery.power_plugged else "On Battery 🔋"
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
+        if snapshot.battery_percent is not None:
+            status = "Charging ⚡" if snapshot.battery_plugged else "On Battery 🔋"
             time_left = ""
-            if battery.secsleft > 0 and not battery.power_plugged:
-                hours = battery.secsleft // 3600
-                mins = (battery.secsleft % 3600) // 60
+            secsleft = snapshot.battery_secsleft or 0
+            if secsleft > 0 and not snapshot.battery_plugged:
+                hours = secsleft // 3600
+                mins = (secsleft % 3600) // 60
                 time_left = f" - {hours}h {mins}m remaining"
-            return f"Battery: {battery.percent}% ({status}){time_left}"
+            return f"Battery: {snapshot.battery_percent}% ({status}){time_left} ({_age(snapshot)})"
         else:
             return "Desktop PC - No battery detected"
     except ImportError:
@@ -126,12 +158,13 @@ async def get_disk_usage() -> str:
         Disk usage for main drive
     """
     try:
-        import psutil
-        disk = psutil.disk_usage('C:/')
-        used_gb = disk.used / (1024**3)
-        total_gb = disk.total / (1024**3)
-        free_gb = disk.free / (1024**3)
-        return f"Disk: {used_gb:.0f}GB used / {total_gb:.0f}GB total ({disk.percent}%). Free: {free_gb:.0f}GB"
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
+        used_gb = snapshot.disk_used / (1024**3)
+        total_gb = snapshot.disk_total / (1024**3)
+        free_gb = snapshot.disk_free / (1024**3)
+        return f"Disk: {used_gb:.0f}GB used / {total_gb:.0f}GB total ({snapshot.disk_percent}%). Free: {free_gb:.0f}GB ({_age(snapshot)})"
     except ImportError:
         return "psutil not installed"
     except Exception as e:
@@ -142,29 +175,22 @@ async def get_running_processes(count: int = 5) -> str:
     """
     Get top running processes by CPU usage.
     Args:
-        count: Number of top processes to show (default 5)
+        count: Number of top processes to show (default 5, max 10)
     Returns:
         List of top processes
     """
     try:
-        import psutil
-        processes = []
-        for proc in psutil.process_iter(['name', 'cpu_percent', 'memory_percent']):
-            try:
-                processes.append({
-                    'name': proc.info['name'],
-                    'cpu': proc.info['cpu_percent'] or 0,
-                    'memory': proc.info['memory_percent'] or 0
-                })
-            except (psutil.NoSuchProcess, psutil.AccessDenied):
-                pass
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
         
-        # Sort by CPU usage and get top N
-        top_processes = sorted(processes, key=lambda x: x['cpu'], reverse=True)[:count]
+        # The sampler keeps the top processes by CPU (already sorted)
+        count = max(1, min(int(count), 10))
+        top_processes = snapshot.top_processes[:count]
         
-        result = f"Top {count} processes by CPU:\n"
+        result = f"Top {len(top_processes)} processes by CPU ({_age(snapshot)}):\n"
         for i, p in enumerate(top_processes, 1):
-            result += f"{i}. {p['name']}: CPU {p['cpu']:.1f}%, RAM {p['memory']:.1f}%\n"
+            result += f"{i}. {p.name}: CPU {p.cpu_percent:.1f}%, RAM {p.memory_percent:.1f}%\n"
         
         return result.strip()
     except ImportError:
@@ -180,12 +206,57 @@ async def get_network_info() -> str:
         Network stats including bytes sent/received
     """
     try:
-        import psutil
-        net = psutil.net_io_counters()
-        sent_mb = net.bytes_sent / (1024**2)
-        recv_mb = net.bytes_recv / (1024**2)
-        return f"Network: Sent {sent_mb:.1f}MB, Received {recv_mb:.1f}MB"
+        snapshot = await _get_snapshot()
+        if snapshot is None:
+            return NO_DATA
+        sent_mb = snapshot.net_bytes_sent / (1024**2)
+        recv_mb = snapshot.net_bytes_recv / (1024**2)
+        return f"Network: Sent {sent_mb:.1f}MB, Received {recv_mb:.1f}MB ({_age(snapshot)})"
     except ImportError:
         return "psutil not installed"
     except Exception as e:
         return f"Error: {str(e)}"
+
+@function_tool()
+async def get_metrics_trend(metric: str = "ram", minutes: int = 60) -> str:
+    """
+    Get how a system metric has behaved over a recent time window (trend, min/avg/max, percentiles).
+    Use this for questions like "how has RAM looked over the last hour" or "was CPU high today".
+    Args:
+        metric: One of 'cpu', 'ram', 'disk', 'net_sent', 'net_recv' (network in KB/s)
+        minutes: How far back to look (default 60, up to 7 days = 10080)
+    Returns:
+        Summary of the metric over the window
+    """
+    from vyaas_metrics_history import METRICS, get_history
+
+    metric = metric.lower().strip().replace("memory", "ram")
+    if metric not in METRICS:
+        return f"Unknown metric '{metric}'. Use one of: {', '.join(METRICS)}"
+
+    try:
+        minutes = max(1, min(int(minutes), 7 * 24 * 60))
+        stats = get_history().summary(metric, minutes * 60)
+        if not stats:
+            return f"Abhi {metric} ki history available nahi hai (recording just started)."
+
+        unit = stats["unit"]
+        # Net change implied by the fitted slope across the data actually covered
+        change = stats["slope_per_hour"] * stats["covered_seconds"] / 3600
+        if abs(change) < (2 if unit == "%" else 5):
+            trend = "stable"
+        else:
+            trend = f"{'rising' if change > 0 else 'falling'} ({change:+.1f}{unit} over the window)"
+
+        covered = stats["covered_seconds"] / 60
+        return (
+            f"{metric.upper()} over last {minutes} min ({stats['points']} points, {stats['tier']} resolution, "
+            f"{covered:.0f} min of data):\n"
+            f"- Now: {stats['latest']:.1f}{unit}\n"
+            f"- Avg: {stats['avg']:.1f}{unit}, Min: {stats['min']:.1f}{unit}, Max: {stats['max']:.1f}{unit}\n"
+            f"- P50: {stats['p50']:.1f}{unit}, P95: {stats['p95']:.1f}{unit}\n"
+            f"- Trend: {trend}"
+        )
+    except Exception as e:
+        logger.error(f"Error reading metrics history: {e}")
+        return f"Error: {str(e)}"
@@ -0,0 +1,377 @@
+"""
+VYAAS AI - Telemetry
+Prometheus-style counters, gauges and histograms for the agent worker.
+
+Instruments are recorded in the job processes (tool calls through the
+registry wrapper, data-channel bytes, active sessions). Each job process
+publishes a snapshot of its instruments plus the loop-monitor, sampler,
+cache, executor, scheduler and HTTP stats every PUBLISH_INTERVAL seconds
+(vyaas_process_state), and the health server in the main process merges them
+into one exposition, labelling every sample with its pid:
+
+    GET /metrics   text exposition format 0.0.4
+    GET /ready     200 once a worker has its prompt context loaded and the model API answers, else 503
+"""
+
+import asyncio
+import functools
+import logging
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import vyaas_http
+from vyaas_cache import cached
+from vyaas_process_state import collect, publish
+
+logger = logging.getLogger("vyaas_telemetry")
+logger.setLevel(logging.INFO)
+
+PUBLISH_INTERVAL = float(os.getenv("VYAAS_TELEMETRY_INTERVAL", "5"))
+
+# Seconds; covers instant local tools up to the longest tool budgets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0)
+
+MODEL_PROBE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+
+
+# ============== INSTRUMENTS ==============
+
+class _Metric:
+    type = ""
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = labelnames
+        self._values: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _labels(self, key: tuple) -> dict:
+        return dict(zip(self.labelnames, key))
+
+    def export(self) -> dict:
+        return {"name": self.name, "type": self.type, "help": self.help, "samples": self.samples()}
+
+
+class Counter(_Metric):
+    type = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, labelnames)
+        if not labelnames:
+            self._values[()] = 0.0  # Export 0 before the first change
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> list:
+        with self._lock:
+            return [["", self._labels(key), value] for key, value in self._values.items()]
+
+
+class Gauge(Counter):
+    type = "gauge"
+
+    def set(self, value: float, **labels):
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+
+class Histogram(_Metric):
+    type = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = buckets
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * len(self.buckets), 0.0, 0]
+            counts = state[0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            state[1] += value
+            state[2] += 1
+
+    def samples(self) -> list:
+        out = []
+        with self._lock:
+            for key, (counts, total, count) in self._values.items():
+                labels = self._labels(key)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    out.append(["_bucket", {**labels, "le": repr(bound)}, bucket_count])
+                out.append(["_bucket", {**labels, "le": "+Inf"}, count])
+                out.append(["_sum", labels, total])
+                out.append(["_count", labels, count])
+        return out
+
+
+_instruments: List[_Metric] = []
+
+
+def register(metric: _Metric) -> _Metric:
+    _instruments.append(metric)
+    return metric
+
+
+TOOL_CALLS = register(Counter("vyaas_tool_calls_total", "Tool calls by outcome (ok, timeout, error)", ("tool", "outcome")))
+TOOL_DURATION = register(Histogram("vyaas_tool_duration_seconds", "Tool call latency including resource queueing", ("tool",)))
+SESSIONS_ACTIVE = register(Gauge("vyaas_sessions_active", "Agent sessions running in this process"))
+DATA_BYTES = register(Counter("vyaas_data_channel_bytes_total", "Data channel payload bytes", ("direction", "topic")))
+DATA_PACKETS = register(Counter("vyaas_data_channel_packets_total", "Data channel packets", ("direction", "topic")))
+
+
+def instrument_tool(tool):
+    """Wrap a function tool to record its call count, outcome and latency (keeps the tool's schema)"""
+    name = tool.__name__
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        outcome = "error"
+        start = time.perf_counter()
+        try:
+            result = await tool(*args, **kwargs)
+            outcome = "ok"
+            return result
+        except asyncio.CancelledError:
+            outcome = "timeout"  # with_budget cancels calls that run past their deadline
+            raise
+        finally:
+            TOOL_CALLS.inc(tool=name, outcome=outcome)
+            TOOL_DURATION.observe(time.perf_counter() - start, tool=name)
+
+    return wrapper
+
+
+def count_data(direction: str, topic: Optional[str], payload) -> None:
+    """Record one data-channel packet ("in" or "out")"""
+    size = len(payload.encode("utf-8") if isinstance(payload, str) else payload)
+    topic = topic or "none"
+    DATA_BYTES.inc(size, direction=direction, topic=topic)
+    DATA_PACKETS.inc(direction=direction, topic=topic)
+
+
+# ============== COLLECTED STATS ==============
+
+def _family(name: str, metric_type: str, help_text: str, samples: list) -> dict:
+    return {"name": name, "type": metric_type, "help": help_text, "samples": samples}
+
+
+def _loop_families() -> list:
+    from vyaas_loop_monitor import get_loop_monitor
+
+    monitor = get_loop_monitor()
+    if monitor is None:
+        return []
+    stats = monitor.stats()
+    return [
+        _family("vyaas_loop_lag_seconds", "gauge", "Event loop lag over the recent window", [
+            ["", {"quantile": q}, stats[f"{key}_ms"] / 1000]
+            for q, key in (("0.5", "p50"), ("0.95", "p95"), ("0.99", "p99"), ("1", "max"))
+        ]),
+        _family("vyaas_loop_stalls_total", "counter", "Loop stalls caught by the debug watchdog",
+                [["", {}, stats["stalls"]]]),
+    ]
+
+
+def _sampler_families() -> list:
+    sampler_module = sys.modules.get("vyaas_metrics_sampler")
+    if sampler_module is None or sampler_module._sampler is None:
+        return []
+    sampler = sampler_module._sampler
+    families = [_family("vyaas_sampler_interval_seconds", "gauge", "Current system sampler interval",
+                        [["", {}, sampler.interval]])]
+    latest = sampler.latest()
+    if latest is not None:
+        families += [
+            _family("vyaas_sampler_age_seconds", "gauge", "Age of the latest system snapshot", [["", {}, latest.age()]]),
+            _family("vyaas_sampler_samples_total", "counter", "System snapshots taken", [["", {}, latest.seq]]),
+            _family("vyaas_system_cpu_percent", "gauge", "Host CPU usage", [["", {}, latest.cpu_percent]]),
+            _family("vyaas_system_ram_percent", "gauge", "Host RAM usage", [["", {}, latest.ram_percent]]),
+        ]
+    return families
+
+
+def _cache_families() -> list:
+    from vyaas_cache import get_cache_stats
+
+    stats = get_cache_stats()
+    events = []
+    for row in stats["functions"]:
+        for event in ("hits", "stale_hits", "misses", "coalesced", "refreshes", "rejected"):
+            events.append(["", {"function": row["name"], "event": event}, row[event]])
+    return [
+        _family("vyaas_cache_events_total", "counter", "Result cache lookups by outcome", events),
+        _family("vyaas_cache_bytes", "gauge", "Estimated result cache size", [["", {}, stats["bytes"]]]),
+        _family("vyaas_cache_entries", "gauge", "Cached results", [["", {}, stats["entries"]]]),
+        _family("vyaas_cache_evictions_total", "counter", "LRU evictions", [["", {}, stats["evictions"]]]),
+    ]
+
+
+def _executor_families() -> list:
+    from vyaas_executor import get_executor_stats
+
+    rows = get_executor_stats()
+    return [
+        _family("vyaas_executor_active", "gauge", "Busy worker threads",
+                [["", {"pool": r["pool"]}, r["active"]] for r in rows]),
+        _family("vyaas_executor_queue_depth", "gauge", "Jobs waiting for a worker thread",
+                [["", {"pool": r["pool"]}, r["queue_depth"]] for r in rows]),
+        _family("vyaas_executor_completed_total", "counter", "Jobs finished by worker threads",
+                [["", {"pool": r["pool"]}, r["completed"]] for r in rows]),
+    ]
+
+
+def _scheduler_families() -> list:
+    from vyaas_tool_scheduler import get_scheduler_stats
+
+    rows = get_scheduler_stats()
+    return [
+        _family("vyaas_scheduler_calls_total", "counter", "Tool calls per exclusive resource",
+                [["", {"resource": r["resource"]}, r["calls"]] for r in rows]),
+        _family("vyaas_scheduler_contended_total", "counter", "Calls that queued behind another call",
+                [["", {"resource": r["resource"]}, r["contended"]] for r in rows]),
+    ]
+
+
+def _http_families() -> list:
+    from vyaas_http import get_http_stats
+
+    rows = get_http_stats()
+    return [
+        _family("vyaas_http_requests_total", "counter", "Outbound HTTP requests",
+                [["", {"host": r["host"]}, r["requests"]] for r in rows]),
+        _family("vyaas_http_errors_total", "counter", "Outbound HTTP transport errors",
+                [["", {"host": r["host"]}, r["errors"]] for r in rows]),
+        _family("vyaas_http_connections_total", "counter", "Connections used, new or reused from the pool",
+                [["", {"host": r["host"], "kind": kind}, r[f"{kind}_connections"]]
+                 for r in rows for kind in ("new", "reused")]),
+    ]
+
+
+_COLLECTORS = (_loop_families, _sampler_families, _cache_families,
+               _executor_families, _scheduler_families, _http_families)
+
+
+def snapshot() -> dict:
+    """Everything this process exports (JSON-serialisable)"""
+    families = [metric.export() for metric in _instruments]
+    for collector in _COLLECTORS:
+        try:
+            families.extend(collector())
+        except Exception as e:
+            logger.debug(f"Telemetry collector {collector.__name__} failed: {e}")
+
+    prompts = sys.modules.get("vyaas_prompts")
+    return {
+        "families": families,
+        "prompts_loaded": bool(prompts and prompts.is_context_loaded()),
+        "at": time.time(),
+    }
+
+
+# ============== PUBLISHING (job processes) ==============
+
+_publisher: Optional[threading.Thread] = None
+
+
+def _publish_loop(interval: float):
+    while True:
+        try:
+            publish("telemetry", snapshot())
+            breakers = sys.modules.get("vyaas_circuit_breaker")
+            if breakers is not None:
+                # Lazy open -> half-open transitions are only seen when a state is read
+                breakers.publish_states()
+        except Exception as e:
+            logger.error(f"Telemetry publish failed: {e}")
+        time.sleep(interval)
+
+
+def start_publisher(interval: float = PUBLISH_INTERVAL):
+    """Publish this process's telemetry for the health server (idempotent)"""
+    global _publisher
+
+    if _publisher is None:
+        _publisher = threading.Thread(target=_publish_loop, args=(interval,), name="vyaas-telemetry", daemon=True)
+        _publisher.start()
+
+
+# ============== EXPOSITION (health server) ==============
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def render_prometheus() -> str:
+    """Merged exposition of every live worker process"""
+    from vyaas_circuit_breaker import all_breaker_states
+
+    merged: Dict[str, dict] = {}
+    for pid, data in sorted(collect("telemetry").items()):
+        for family in data.get("families", []):
+            target = merged.setdefault(family["name"], {**family, "samples": []})
+            for suffix, labels, value in family["samples"]:
+                target["samples"].append((suffix, {"pid": str(pid), **labels}, value))
+
+    merged["vyaas_circuit_open"] = _family(
+        "vyaas_circuit_open", "gauge", "1 while a circuit breaker is open or half-open",
+        [("", {"pid": str(s["pid"]), "name": s["name"]}, 0 if s["state"] == "closed" else 1)
+         for s in all_breaker_states()],
+    )
+
+    lines = []
+    for name, family in merged.items():
+        lines.append(f"# HELP {name} {family['help']}")
+        lines.append(f"# TYPE {name} {family['type']}")
+        for suffix, labels, value in family["samples"]:
+            lines.append(f"{name}{suffix}{_format_labels(labels)} {float(value)!r}")
+    return "\n".join(lines) + "\n"
+
+
+@cached(ttl=30)
+async def _probe_model() -> Tuple[bool, str]:
+    api_key = os.getenv("GOOGLE_API_KEY")
+    if not api_key:
+        return False, "GOOGLE_API_KEY not set"
+    try:
+        response = await vyaas_http.get(MODEL_PROBE_URL, params={"key": api_key, "pageSize": 1}, timeout=3)
+    except vyaas_http.HttpError as e:
+        return False, str(e)
+    return response.ok, f"HTTP {response.status_code}"
+
+
+def readiness() -> Tuple[bool, dict]:
+    """(ready, checks): a worker with its prompt context loaded, and the model API reachable"""
+    workers = collect("telemetry")
+    prompts_ready = sum(1 for data in workers.values() if data.get("prompts_loaded"))
+    model_ok, model_detail = asyncio.run(_probe_model())  # Cached 30 s, so probes don't follow the scrape rate
+    checks = {
+        "workers": len(workers),
+        "prompts_loaded": prompts_ready,
+        "model_reachable": model_ok,
+        "model_detail": model_detail,
+    }
+    return prompts_ready > 0 and model_ok, checks
@@ -0,0 +1,224 @@
+"""
+VYAAS AI - Tool Registry
+Declares which function tools the Assistant exposes and where they live.
+
+Tool modules are imported on demand by load_tools() instead of at the top of
+agent.py. Each module keeps its heavy dependencies (kasa, mem0, psutil,
+openpyxl/docx/pptx, pyautogui...) as in-function imports, so importing a tool
+module only costs its function-tool schemas; the dependency itself is loaded
+on the first invocation. Every module import is timed and the third-party
+packages it pulled in are recorded for the startup report.
+
+Every tool handed out is wrapped (see _wrap_tool): calls run under the
+tool's latency budget and the turn deadline (vyaas_deadline), and tools that
+declare resources (vyaas_tool_scheduler.uses) queue behind conflicting calls
+instead of racing. Each call is the root span of a trace (vyaas_tracing), and
+call counts, outcomes and latency are recorded for /metrics (vyaas_telemetry).
+The wrappers keep the original function-tool schema. Synchronous tools are
+not wrapped.
+"""
+
+import importlib
+import inspect
+import logging
+import sys
+import time
+from typing import Dict, List, Optional
+
+from vyaas_deadline import with_budget
+from vyaas_telemetry import instrument_tool
+from vyaas_tool_scheduler import schedule
+from vyaas_tracing import trace_tool
+
+logger = logging.getLogger("vyaas_tool_registry")
+logger.setLevel(logging.INFO)
+
+# Ordered (module, [tool names]) pairs. Order is the order tools are handed to the model.
+# Cloud-disabled groups (vyaas_system_control, most of vyaas_automation) are simply not listed.
+TOOL_MODULES = [
+    ("vyaas_google_search", ["google_search", "get_current_datetime"]),
+    ("vyaas_get_weather", ["get_weather"]),
+    # System Info Tools
+    ("vyaas_system_info", [
+        "get_system_info",
+        "get_cpu_usage",
+        "get_ram_usage",
+        "get_battery_status",
+        "get_disk_usage",
+        "get_running_processes",
+        "get_network_info",
+        "get_metrics_trend",
+    ]),
+    # Clipboard Tools
+    ("vyaas_clipboard", [
+        "copy_to_clipboard",
+        "get_clipboard_content",
+        "clear_clipboard",
+        "clipboard_word_count",
+    ]),
+    # Music Tools
+    ("vyaas_music", [
+        "play_spotify",
+        "play_youtube_music",
+        "play_pause_media",
+        "next_track",
+        "previous_track",
+        "stop_media",
+        "open_music_app",
+        "search_song",
+    ]),
+    # File Creation Tools
+    ("vyaas_file_tools", [
+        "create_html_file",
+        "create_text_file",
+        "create_excel_file",
+        "create_word_document",
+        "create_powerpoint",
+        "create_pdf_document",
+        "create_python_file",
+        "list_desktop_files",
+    ]),
+    ("vyaas_automation", ["send_whatsapp_file"]),
+    # Android Tools
+    ("vyaas_android", [
+        "pair_android_device",
+        "connect_android_device",
+        "open_android_app",
+        "send_android_whatsapp",
+        "search_and_send_android_whatsapp",
+        "make_android_call",
+        "search_android_youtube",
+    ]),
+    # Memory Tools
+    ("vyaas_memory", [
+        "remember_fact",
+        "get_fact",
+        "search_memory",
+        "list_all_memories",
+        "delete_fact",
+    ]),
+    # IoT Tools
+    ("vyaas_iot", [
+        "scan_iot_devices",
+        "control_iot_device",
+        "set_iot_brightness",
+    ]),
+    # WhatsApp Listener Tools
+    ("vyaas_whatsapp_listener", [
+        "start_whatsapp_listener",
+        "check_whatsapp_messages",
+        "reply_to_whatsapp",
+        "get_whatsapp_status",
+    ]),
+    # Map Tools
+    ("vyaas_maps", ["show_google_map"]),
+    # LOCAL COMMAND TOOLS (execute on user's PC via Desktop Bridge)
+    ("vyaas_local_commands", [
+        "open_whatsapp_local",
+        "open_maps_local",
+        "open_notes_local",
+        "open_app_local",
+        "send_whatsapp_local",
+        "send_whatsapp_contact_local",
+        "type_text_local",
+        "press_key_local",
+        "open_url_local",
+        "play_youtube_local",
+        "take_screenshot_local",
+        "set_volume_local",
+        "lock_pc_local",
+        "shutdown_pc_local",
+        "cancel_shutdown_local",
+        "run_desktop_macro",
+    ]),
+]
+
+# module name -> {"seconds": float, "packages": [str], "error": Optional[str]}
+_import_report: Dict[str, dict] = {}
+_tools: Optional[list] = None
+
+
+def _top_level_packages() -> set:
+    return {name.split(".", 1)[0] for name in sys.modules}
+
+
+def _import_module(module_name: str):
+    """Import a tool module, recording its wall time and newly loaded packages"""
+    already_loaded = module_name in sys.modules
+    before = _top_level_packages()
+    start = time.perf_counter()
+    try:
+        module = importlib.import_module(module_name)
+        error = None
+    except Exception as e:
+        module = None
+        error = f"{type(e).__name__}: {e}"
+    elapsed = time.perf_counter() - start
+
+    if module_name not in _import_report:
+        pulled_in = sorted(_top_level_packages() - before - {module_name})
+        _import_report[module_name] = {
+            "seconds": 0.0 if already_loaded else elapsed,
+            "packages": pulled_in,
+            "error": error,
+        }
+    return module
+
+
+def _wrap_tool(tool):
+    """Apply the per-call wrappers, outermost first: budget/deadline, trace span, telemetry, then resource scheduling"""
+    if not inspect.iscoroutinefunction(tool):
+        # The wrappers await the tool; plain functions (get_current_datetime) are handed over as-is
+        return tool
+    return with_budget(trace_tool(instrument_tool(schedule(tool))))
+
+
+def load_tools() -> list:
+    """
+    Import every registered tool module and return the tool list for Assistant.
+    The result is cached, so repeated calls (prewarm + each job) are free.
+    """
+    global _tools
+
+    if _tools is not None:
+        return _tools
+
+    tools = []
+    for module_name, tool_names in TOOL_MODULES:
+        module = _import_module(module_name)
+        if module is None:
+            logger.error(f"Skipping tools from {module_name}: {_import_report[module_name]['error']}")
+            continue
+        for tool_name in tool_names:
+            tool = getattr(module, tool_name, None)
+            if tool is None:
+                logger.error(f"Tool {module_name}.{tool_name} not found")
+                continue
+            tools.append(_wrap_tool(tool))
+
+    _tools = tools
+    logger.info(f"Loaded {len(tools)} tools\n{format_import_report()}")
+    return tools
+
+
+def get_import_report() -> List[dict]:
+    """Per-module import cost, slowest first"""
+    rows = [{"module": name, **info} for name, info in _import_report.items()]
+    return sorted(rows, key=lambda row: row["seconds"], reverse=True)
+
+
+def format_import_report() -> str:
+    """Human readable import-time table for startup logs"""
+    rows = get_import_report()
+    total = sum(row["seconds"] for row in rows)
+    lines = [f"Tool module import report (total {total * 1000:.0f} ms):"]
+    for row in rows:
+        status = f"FAILED ({row['error']})" if row["error"] else ", ".join(row["packages"][:6]) or "-"
+        lines.append(f"  {row['module']:<26} {row['seconds'] * 1000:8.1f} ms  {status}")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.WARNING)
+    load_tools()
+    print(format_import_report())
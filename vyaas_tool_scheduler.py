@@ -0,0 +1,148 @@
+"""
+VYAAS AI - Tool Scheduler
+Runs independent tool calls concurrently and queues conflicting ones in order.
+
+The realtime model can issue several function calls in one turn. Each tool
+declares the resources it touches with @uses(...):
+
+    @function_tool()
+    @uses(adb_device)                 # callable: resolved from the call's arguments
+    async def open_android_app(...)
+
+    @function_tool()
+    @uses("file:{filename}")          # template: formatted with the call's arguments
+    async def create_text_file(filename: str, content: str)
+
+    @function_tool()
+    @uses("desktop-gui")              # plain resource name
+    async def type_text_local(text: str)
+
+Resources are exclusive: calls that share one run one at a time, in arrival
+order (asyncio.Lock is FIFO). Resources in SHARED_RESOURCES (e.g. "network")
+are informational only and never serialize. Locks for a call are taken in
+sorted order, so two multi-resource calls cannot deadlock. Tools without
+declarations run concurrently as before.
+
+The registry wraps every tool with schedule(); contention is reported by
+get_scheduler_stats().
+"""
+
+import asyncio
+import functools
+import inspect
+import logging
+import time
+import weakref
+from typing import Dict, List
+
+logger = logging.getLogger("vyaas_tool_scheduler")
+logger.setLevel(logging.INFO)
+
+# Resource classes that many calls may use at once (bounded by vyaas_executor pools instead)
+SHARED_RESOURCES = {"network"}
+
+
+def uses(*resources):
+    """Declare the resources a tool touches (strings, "{param}" templates or callables)"""
+    def decorator(func):
+        func.__vyaas_resources__ = resources
+        return func
+    return decorator
+
+
+def resolve_resources(tool, args: tuple, kwargs: dict) -> List[str]:
+    """Exclusive resource keys for one call, sorted (the lock order)"""
+    specs = getattr(tool, "__vyaas_resources__", ())
+    if not specs:
+        return []
+
+    try:
+        bound = inspect.signature(tool).bind_partial(*args, **kwargs)
+        bound.apply_defaults()
+        params = dict(bound.arguments)
+    except TypeError:
+        params = dict(kwargs)
+
+    keys = set()
+    for spec in specs:
+        try:
+            value = spec(params) if callable(spec) else spec.format(**params)
+        except (KeyError, IndexError) as e:
+            logger.error(f"Cannot resolve resource {spec!r} for {tool.__name__}: {e}")
+            continue
+        keys.update([value] if isinstance(value, str) else value)
+    return sorted(key for key in keys if key.split(":", 1)[0] not in SHARED_RESOURCES)
+
+
+class ToolScheduler:
+    """Per-resource FIFO locks, one set per event loop"""
+
+    def __init__(self):
+        # loop -> {resource key: asyncio.Lock}; locks must not cross loops
+        self._locks: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+        # resource key -> [calls, contended calls, total wait seconds, max wait seconds]
+        self._stats: Dict[str, list] = {}
+
+    def _lock(self, key: str) -> asyncio.Lock:
+        locks = self._locks.setdefault(asyncio.get_running_loop(), {})
+        lock = locks.get(key)
+        if lock is None:
+            lock = locks[key] = asyncio.Lock()
+        return lock
+
+    async def run(self, name: str, keys: List[str], call):
+        """Await call() while holding every resource in keys"""
+        if not keys:
+            return await call()
+
+        held = []
+        try:
+            for key in keys:
+                lock = self._lock(key)
+                stats = self._stats.setdefault(key, [0, 0, 0.0, 0.0])
+                stats[0] += 1
+                if lock.locked():
+                    stats[1] += 1
+                    logger.info(f"{name} queued behind {key}")
+                start = time.monotonic()
+                await lock.acquire()
+                held.append(lock)
+                wait = time.monotonic() - start
+                stats[2] += wait
+                stats[3] = max(stats[3], wait)
+            return await call()
+        finally:
+            for lock in reversed(held):
+                lock.release()
+
+    def stats(self) -> List[dict]:
+        return [
+            {
+                "resource": key,
+                "calls": calls,
+                "contended": contended,
+                "wait_total_ms": wait_total * 1000,
+                "wait_max_ms": wait_max * 1000,
+            }
+            for key, (calls, contended, wait_total, wait_max) in sorted(self._stats.items())
+        ]
+
+
+scheduler = ToolScheduler()
+
+
+def schedule(tool):
+    """Wrap a function tool so its calls go through the scheduler (keeps the tool's schema)"""
+    if not getattr(tool, "__vyaas_resources__", ()):
+        return tool
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        keys = resolve_resources(tool, args, kwargs)
+        return await scheduler.run(tool.__name__, keys, lambda: tool(*args, **kwargs))
+
+    return wrapper
+
+
+def get_scheduler_stats() -> List[dict]:
+    return scheduler.stats()
@@ -0,0 +1,297 @@
+"""
+VYAAS AI - Tracing
+Lightweight spans for following one tool call from the model to the desktop bridge.
+
+    with span("local_command.send", command="send_whatsapp") as s:
+        payload["trace"] = trace_context()     # carried in the data packet
+
+The current span lives in a contextvar, so child spans (and the trace id that
+goes out in local_command packets) follow the call across awaits and into
+vyaas_executor threads. Every tool handed out by the registry runs inside a
+root span (trace_tool). The bridge answers traced commands with its own
+stage durations on COMMAND_TRACE_TOPIC; those are recorded with
+record_span() under the agent's send span. Bridge clocks are not trusted:
+its stages are placed by duration, and "transit" is the round trip minus the
+bridge's own time.
+
+Finished spans are appended as JSON lines to TRACE_FILE by a writer thread
+(dropped, not blocked on, if it falls behind). Once the file passes
+TRACE_MAX_BYTES it is moved to TRACE_FILE.1 (replacing the previous one), so
+at most twice that is kept on disk. VYAAS_TRACING=0 turns it off.
+
+    python vyaas_tracing.py [--file PATH] [--last N] [--trace ID]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import queue
+import tempfile
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+logger = logging.getLogger("vyaas_tracing")
+logger.setLevel(logging.INFO)
+
+ENABLED = os.getenv("VYAAS_TRACING", "1").lower() not in ("0", "false", "no")
+TRACE_FILE = os.getenv("VYAAS_TRACE_FILE", os.path.join(tempfile.gettempdir(), "vyaas-traces.jsonl"))
+TRACE_MAX_BYTES = int(os.getenv("VYAAS_TRACE_MAX_BYTES", str(20 * 1024 * 1024)))
+QUEUE_SIZE = 10000
+
+# Data channel topic of the bridge's trace replies
+COMMAND_TRACE_TOPIC = "command_trace"
+
+
+def _new_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class Span:
+    __slots__ = ("name", "trace_id", "span_id", "parent_id", "start", "attrs", "status", "_t0")
+
+    def __init__(self, name: str, trace_id: str, parent_id: Optional[str], attrs: dict):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = _new_id()
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.attrs = attrs
+        self.status = "ok"
+        self._t0 = time.perf_counter()
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._t0) * 1000
+
+
+_current: contextvars.ContextVar = contextvars.ContextVar("vyaas_span", default=None)
+
+
+# ============== SINK ==============
+
+class _Writer:
+    def __init__(self, path: str):
+        self.path = path
+        self.queue: queue.Queue = queue.Queue(maxsize=QUEUE_SIZE)
+        self.dropped = 0
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def emit(self, record: dict):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="vyaas-trace-writer", daemon=True)
+                    self._thread.start()
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self):
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        while True:
+            records = [self.queue.get()]
+            while True:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._rotate()
+                # One write per batch; appends from several job processes stay line-intact
+                with open(self.path, "a", encoding="utf-8") as f:
+                    f.write("".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+            except OSError as e:
+                logger.error(f"Could not write {len(records)} spans: {e}")
+
+    def _rotate(self):
+        try:
+            if os.path.getsize(self.path) < TRACE_MAX_BYTES:
+                return
+        except OSError:
+            return  # Not created yet
+        try:
+            os.replace(self.path, self.path + ".1")
+        except FileNotFoundError:
+            pass  # Another job process rotated it first
+
+
+_writer = _Writer(TRACE_FILE)
+
+
+def record_span(name: str, trace_id: str, parent_id: Optional[str], start: float, ms: float,
+                status: str = "ok", span_id: Optional[str] = None, **attrs) -> str:
+    """Record an already finished span (e.g. reported by the bridge); returns its span id"""
+    span_id = span_id or _new_id()
+    if ENABLED:
+        _writer.emit({
+            "trace_id": trace_id,
+            "span_id": span_id,
+            "parent_id": parent_id,
+            "name": name,
+            "start": start,
+            "ms": round(ms, 3),
+            "status": status,
+            "pid": os.getpid(),
+            "attrs": attrs,
+        })
+    return span_id
+
+
+# ============== SPANS ==============
+
+@contextlib.contextmanager
+def span(name: str, **attrs):
+    """Child of the current span, or the root of a new trace; yields None when tracing is off"""
+    if not ENABLED:
+        yield None
+        return
+    parent = _current.get()
+    current = Span(name, parent.trace_id if parent else _new_id(), parent.span_id if parent else None, attrs)
+    token = _current.set(current)
+    try:
+        yield current
+    except asyncio.CancelledError:
+        current.status = "cancelled"
+        raise
+    except BaseException as e:
+        current.status = f"error: {type(e).__name__}"
+        raise
+    finally:
+        _current.reset(token)
+        record_span(current.name, current.trace_id, current.parent_id, current.start,
+                    current.elapsed_ms(), current.status, current.span_id, **current.attrs)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def trace_context() -> Optional[dict]:
+    """Trace/span id of the current span, for propagation in a packet"""
+    current = _current.get()
+    if current is None:
+        return None
+    return {"trace_id": current.trace_id, "span_id": current.span_id}
+
+
+def trace_tool(tool):
+    """Wrap a function tool so each call is the root span of a trace (keeps the tool's schema)"""
+    name = tool.__name__
+
+    @functools.wraps(tool)
+    async def wrapper(*args, **kwargs):
+        with span(f"tool.{name}", tool=name):
+            return await tool(*args, **kwargs)
+
+    return wrapper
+
+
+# ============== REPORT ==============
+
+def load_spans(path: str = TRACE_FILE) -> List[dict]:
+    """Spans of the file and its rotated predecessor (if any), oldest first"""
+    spans = []
+    for name in (path + ".1", path):
+        if name != path and not os.path.exists(name):
+            continue
+        with open(name, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    spans.append(json.loads(line))
+                except ValueError:
+                    continue
+    return spans
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(pct / 100 * len(sorted_values)))]
+
+
+def format_trace(spans: List[dict]) -> str:
+    """Indented span tree of one trace"""
+    children: Dict[Optional[str], List[dict]] = defaultdict(list)
+    ids = {s["span_id"] for s in spans}
+    for s in spans:
+        parent = s["parent_id"] if s["parent_id"] in ids else None
+        children[parent].append(s)
+
+    start = min(s["start"] for s in spans)
+    end = max(s["start"] + s["ms"] / 1000 for s in spans)
+    lines = [f"trace {spans[0]['trace_id']}  total {(end - start) * 1000:.1f} ms"]
+
+    def walk(parent_id, depth):
+        for s in sorted(children[parent_id], key=lambda s: s["start"]):
+            extra = ""
+            if "transit_ms" in s["attrs"]:
+                extra = f"  (transit {s['attrs']['transit_ms']:.1f} ms)"
+            status = "" if s["status"] == "ok" else f"  [{s['status']}]"
+            offset = (s["start"] - start) * 1000
+            lines.append(f"  {'  ' * depth}{s['name']:<{40 - 2 * depth}} +{offset:8.1f} ms {s['ms']:10.1f} ms{extra}{status}")
+            walk(s["span_id"], depth + 1)
+
+    walk(None, 0)
+    return "\n".join(lines)
+
+
+def format_stage_summary(spans: List[dict]) -> str:
+    """Latency per span name across all traces"""
+    by_name: Dict[str, List[float]] = defaultdict(list)
+    for s in spans:
+        by_name[s["name"]].append(s["ms"])
+        if "transit_ms" in s["attrs"]:
+            by_name["bridge.transit"].append(s["attrs"]["transit_ms"])
+
+    lines = [f"{'stage':<40} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'max ms':>10}"]
+    for name, values in sorted(by_name.items()):
+        values.sort()
+        lines.append(f"{name:<40} {len(values):6d} {_percentile(values, 50):10.1f} "
+                     f"{_percentile(values, 95):10.1f} {values[-1]:10.1f}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-stage latency breakdown of VYAAS traces")
+    parser.add_argument("--file", default=TRACE_FILE, help=f"span file (default {TRACE_FILE})")
+    parser.add_argument("--last", type=int, default=5, help="print the span tree of the last N traces")
+    parser.add_argument("--trace", help="print only this trace id")
+    args = parser.parse_args()
+
+    try:
+        spans = load_spans(args.file)
+    except OSError as e:
+        print(f"Cannot read {args.file}: {e}")
+        return
+
+    traces: Dict[str, List[dict]] = defaultdict(list)
+    for s in spans:
+        traces[s["trace_id"]].append(s)
+
+    if args.trace:
+        selected = [traces[args.trace]] if args.trace in traces else []
+    else:
+        ordered = sorted(traces.values(), key=lambda t: min(s["start"] for s in t))
+        selected = ordered[-args.last:] if args.last > 0 else []
+        print(format_stage_summary(spans))
+        print()
+
+    for trace in selected:
+        print(format_trace(trace))
+        print()
+
+
+if __name__ == "__main__":
+    main()
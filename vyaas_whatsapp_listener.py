@@ -4,13 +4,19 @@ Integrates with Node.js WhatsApp service for message detection and replies
 """
 
 import subprocess
-import requests
 import logging
 import os
 import time
 import asyncio
+import threading
+from collections import OrderedDict
 from typing import Optional, List, Dict
 from livekit.agents import function_tool
+from vyaas_executor import offload, run_blocking
+from vyaas_tool_scheduler import uses
+from vyaas_deadline import remaining
+from vyaas_http import request_sync, HttpConnectionError
+from vyaas_circuit_breaker import get_breaker, CircuitOpenError
 
 logger = logging.getLogger("vyaas_whatsapp")
 logger.setLevel(logging.INFO)
@@ -21,15 +27,36 @@ WHATSAPP_SERVICE_PATH = os.path.join(os.path.dirname(__file__), "whatsapp-servic
 
 # Global state
 _whatsapp_process = None
-_last_notified_messages = set()  # Track already notified message IDs
+_last_notified_messages = OrderedDict()  # Already notified message IDs, oldest first
+MAX_NOTIFIED = 500
+_notified_lock = threading.Lock()  # check_whatsapp_messages runs on a worker thread, the poller on the loop
+
+
+def _mark_notified(msg_id) -> bool:
+    """Remember a message ID; False if it was already notified. Keeps only the newest MAX_NOTIFIED."""
+    with _notified_lock:
+        if msg_id in _last_notified_messages:
+            return False
+        _last_notified_messages[msg_id] = None
+        while len(_last_notified_messages) > MAX_NOTIFIED:
+            _last_notified_messages.popitem(last=False)
+        return True
+
+
+def _service_breaker():
+    # Local service: a short open period, so a freshly started service is picked up quickly
+    return get_breaker("whatsapp_service", open_seconds=15)
+
+
+def _get_health() -> dict:
+    response = request_sync("GET", f"{WHATSAPP_SERVICE_URL}/health", timeout=2)
+    return response.json()
 
 
 def is_whatsapp_service_running() -> bool:
-    """Check if WhatsApp service is running and ready"""
+    """Check if WhatsApp service is running and ready (answers instantly while its circuit is open)"""
     try:
-        response = requests.get(f"{WHATSAPP_SERVICE_URL}/health", timeout=2)
-        data = response.json()
-        return data.get("ready", False)
+        return _service_breaker().call(_get_health).get("ready", False)
     except:
         return False
 
@@ -64,10 +91,19 @@ def start_whatsapp_service() -> bool:
             stderr=subprocess.PIPE
         )
         
-        # Wait for service to be ready
+        # Wait for service to be ready (stopping early if the tool's deadline is close)
+        # Polls the service directly: the circuit is likely open from before it was started
         for _ in range(30):  # Wait up to 30 seconds
+            left = remaining()
+            if left is not None and left < 1.5:
+                break
             time.sleep(1)
-            if is_whatsapp_service_running():
+            try:
+                ready = _get_health().get("ready", False)
+            except Exception:
+                continue
+            _service_breaker().reset()
+            if ready:
                 logger.info("WhatsApp service started successfully")
                 return True
         
@@ -92,7 +128,9 @@ def stop_whatsapp_service():
 def get_pending_messages() -> List[Dict]:
     """Fetch pending messages from WhatsApp service"""
     try:
-        response = requests.get(f"{WHATSAPP_SERVICE_URL}/messages", timeout=5)
+        response = _service_breaker().call(
+            request_sync, "GET", f"{WHATSAPP_SERVICE_URL}/messages", timeout=5
+        )
         data = response.json()
         return data.get("messages", [])
     except Exception as e:
@@ -103,7 +141,8 @@ def get_pending_messages() -> List[Dict]:
 def send_whatsapp_reply(to: str, message: str) -> bool:
     """Send a WhatsApp message via the service"""
     try:
-        response = requests.post(
+        response = _service_breaker().call(
+            request_sync, "POST",
             f"{WHATSAPP_SERVICE_URL}/send",
             json={"to": to, "message": message},
             timeout=10
@@ -117,6 +156,8 @@ def send_whatsapp_reply(to: str, message: str) -> bool:
 # ============== Agent Tools ==============
 
 @function_tool()
+@uses("whatsapp-service")
+@offload("subprocess")
 async def start_whatsapp_listener() -> str:
     """
     Start the WhatsApp message listener service.
@@ -133,7 +174,7 @@ async def start_whatsapp_listener() -> str:
         if success:
             # Check if needs QR scan
             try:
-                response = requests.get(f"{WHATSAPP_SERVICE_URL}/health", timeout=2)
+                response = request_sync("GET", f"{WHATSAPP_SERVICE_URL}/health", timeout=2)
                 data = response.json()
                 
                 if data.get("hasQR"):
@@ -151,6 +192,8 @@ async def start_whatsapp_listener() -> str:
 
 
 @function_tool()
+@uses("network")
+@offload("network")
 async def check_whatsapp_messages() -> str:
     """
     Check for new WhatsApp messages.
@@ -158,8 +201,6 @@ async def check_whatsapp_messages() -> str:
     Returns:
         Description of new messages or 'No new messages'
     """
-    global _last_notified_messages
-    
     if not is_whatsapp_service_running():
         return "WhatsApp listener is not running. Say 'start WhatsApp listener' to begin."
     
@@ -169,20 +210,12 @@ async def check_whatsapp_messages() -> str:
         if not messages:
             return "No new WhatsApp messages."
         
-        # Filter out already notified messages
-        new_messages = [m for m in messages if m.get("id") not in _last_notified_messages]
+        # Filter out already notified messages (and mark the rest as notified)
+        new_messages = [m for m in messages if _mark_notified(m.get("id"))]
         
         if not new_messages:
             return "No new WhatsApp messages."
         
-        # Mark as notified
-        for msg in new_messages:
-            _last_notified_messages.add(msg.get("id"))
-        
-        # Keep set size manageable
-        if len(_last_notified_messages) > 100:
-            _last_notified_messages = set(list(_last_notified_messages)[-50:])
-        
         # Format response
         result = []
         for msg in new_messages:
@@ -203,6 +236,8 @@ async def check_whatsapp_messages() -> str:
 
 
 @function_tool()
+@uses("network")
+@offload("network")
 async def reply_to_whatsapp(contact_or_phone: str, message: str) -> str:
     """
     Send a WhatsApp reply to a contact or phone number.
@@ -228,6 +263,8 @@ async def reply_to_whatsapp(contact_or_phone: str, message: str) -> str:
 
 
 @function_tool()
+@uses("network")
+@offload("network")
 async def get_whatsapp_status() -> str:
     """
     Check WhatsApp connection status.
@@ -235,8 +272,7 @@ async def get_whatsapp_status() -> str:
         Current status of WhatsApp service
     """
     try:
-        response = requests.get(f"{WHATSAPP_SERVICE_URL}/health", timeout=2)
-        data = response.json()
+        data = _service_breaker().call(_get_health)
         
         if data.get("ready"):
             return "WhatsApp is connected and listening for messages."
@@ -245,7 +281,7 @@ async def get_whatsapp_status() -> str:
         else:
             return "WhatsApp service is starting..."
             
-    except requests.exceptions.ConnectionError:
+    except (HttpConnectionError, CircuitOpenError):
         return "WhatsApp listener is not running."
     except Exception as e:
         return f"Error checking status: {str(e)}"
@@ -257,17 +293,14 @@ async def poll_whatsapp_messages(callback):
     Poll for new WhatsApp messages and call callback with each new message.
     This runs as a background task.
     """
-    global _last_notified_messages
-    
     while True:
         try:
-            if is_whatsapp_service_running():
-                messages = get_pending_messages()
+            if await run_blocking("network", is_whatsapp_service_running):
+                messages = await run_blocking("network", get_pending_messages)
                 
                 for msg in messages:
                     msg_id = msg.get("id")
-                    if msg_id and msg_id not in _last_notified_messages:
-                        _last_notified_messages.add(msg_id)
+                    if msg_id and _mark_notified(msg_id):
                         await callback(msg)
                         
         except Exception as e: